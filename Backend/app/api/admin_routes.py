@@ -0,0 +1,31 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+from app.configuration.system_config import settings
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    # Admin routes are disabled unless settings.ADMIN_TOKEN is set
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin API disabled.")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), settings.ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token.")
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+@router.post("/rebuild", status_code=202)
+async def rebuild_indexes(req: Request):
+    """
+    Rebuilds every index from the dataset on disk without downtime: each worker builds a new
+    generation in the background, replays the change log into it and swaps it in. Poll GET /rebuild.
+    """
+    rebuilder = req.app.state.index_rebuilder
+    epoch = await rebuilder.request()
+    return {"message": "Index rebuild requested", "epoch": epoch, "rebuild": rebuilder.stats()}
+
+@router.get("/rebuild")
+async def rebuild_status(req: Request):
+    """This worker's rebuild status (step, progress, last duration) and index generation."""
+    return {
+        "rebuild": req.app.state.index_rebuilder.stats(),
+        "index_generation": req.app.state.index_generation,
+    }
@@ -0,0 +1,11 @@
+from fastapi import APIRouter, Request, Response
+from app.monitoring.metrics import update_index_gauges, render_latest
+
+router = APIRouter()
+
+@router.get("")
+async def metrics(req: Request):
+    """Prometheus scrape endpoint (stage latencies, candidate / pruning / cache / decision counters, index sizes)."""
+    update_index_gauges(req.app.state)
+    payload, content_type = render_latest()
+    return Response(content=payload, media_type=content_type)
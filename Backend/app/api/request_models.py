@@ -39,3 +39,9 @@ class ComplianceResult(BaseModel):
 class TitleSubmission(BaseModel):
     title: str
     metadata: Optional[dict] = None
+
+class BatchVerificationLine(BaseModel):
+    index: int                          # Position of the title in the submitted batch
+    title: str
+    result: Optional[ComplianceResult] = None
+    error: Optional[str] = None         # Set instead of result when this title failed
@@ -1,20 +1,112 @@
-from fastapi import APIRouter, Request
-from app.api.request_models import VerificationRequest, ComplianceResult
-from app.orchestration.mesh_orchestrator import MeshOrchestrator
+import asyncio
+import json
+from collections import deque
+from typing import Optional
+from fastapi import APIRouter, Header, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from app.api.request_models import VerificationRequest, ComplianceResult, BatchVerificationLine
+from app.configuration.system_config import settings
+from app.orchestration.verification_executor import ExecutorSaturatedError
 
 router = APIRouter()
 
 @router.post("/", response_model=ComplianceResult)
-async def verify_title(request: VerificationRequest, req: Request):
-    # Get shared indexes and flags from app state (injected at startup)
-    ann_index = getattr(req.app.state, 'ann_index', None)
-    token_index = getattr(req.app.state, 'token_index', None)
-    sbert_available = getattr(req.app.state, 'sbert_available', False)
-    
-    orchestrator = MeshOrchestrator(
-        ann_index=ann_index,
-        token_index=token_index,
-        sbert_available=sbert_available
-    )
-    result = await orchestrator.verify(request.title)
+async def verify_title(request: VerificationRequest, req: Request,
+                       x_latency_budget_ms: Optional[float] = Header(None, ge=0)):
+    # Runs on the shared executor (worker pool over the startup orchestrator and its live indexes)
+    executor = req.app.state.verification_executor
+    try:
+        # Scoring deadline: header overrides settings.VERIFY_LATENCY_BUDGET_MS (0 disables)
+        result = await executor.verify(request.title, latency_budget_ms=x_latency_budget_ms)
+    except ExecutorSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
     return result
+
+@router.post("/batch")
+async def verify_titles_batch(req: Request, suggestions: bool = False, highlight: bool = False,
+                              x_latency_budget_ms: Optional[float] = Header(None, ge=0)):
+    """
+    Bulk verification. Accepts a JSON array or an NDJSON body whose items are either title
+    strings or objects with a "title" field, and streams one BatchVerificationLine per title
+    (application/x-ndjson) as each chunk finishes.
+    Suggestions and Bionic highlighting are off by default to maximise throughput.
+    X-Latency-Budget-Ms applies per title, as for single verification.
+    Up to one chunk per executor worker is verified concurrently; lines still stream in input order.
+    """
+    executor = req.app.state.verification_executor
+    try:
+        titles = _parse_batch_titles(await req.body())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    async def stream():
+        chunk_size = max(1, settings.BATCH_VERIFY_CHUNK_SIZE)
+        starts = iter(range(0, len(titles), chunk_size))
+        in_flight = deque()
+
+        def schedule():
+            start = next(starts, None)
+            if start is None:
+                return
+            chunk = titles[start:start + chunk_size]
+            # Chunks wait for a free executor slot instead of failing mid-stream
+            task = asyncio.ensure_future(executor.verify_batch(
+                chunk, _skip_suggestions=not suggestions, highlight=highlight,
+                latency_budget_ms=x_latency_budget_ms, wait=True
+            ))
+            in_flight.append((start, chunk, task))
+
+        for _ in range(executor.max_workers):
+            schedule()
+        try:
+            while in_flight:
+                start, chunk, task = in_flight.popleft()
+                results = await task
+                schedule()
+                for offset, (title, result) in enumerate(zip(chunk, results)):
+                    if isinstance(result, Exception):
+                        line = BatchVerificationLine(index=start + offset, title=title, error=str(result))
+                    else:
+                        line = BatchVerificationLine(index=start + offset, title=title, result=result)
+                    yield line.model_dump_json() + "\n"
+        finally:
+            # Client went away: drop the chunks that have not started yet
+            for _, _, task in in_flight:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+def _parse_batch_titles(body: bytes) -> list:
+    try:
+        text = body.decode("utf-8").strip()
+    except UnicodeDecodeError:
+        raise ValueError("Batch body must be UTF-8 encoded.")
+    if not text:
+        raise ValueError("Batch body is empty.")
+
+    # JSON array, otherwise one JSON value per line (NDJSON)
+    if text.startswith("["):
+        try:
+            items = json.loads(text)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON array: {e}")
+    else:
+        items = []
+        for line_no, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid NDJSON on line {line_no}: {e}")
+
+    if len(items) > settings.BATCH_VERIFY_MAX_ITEMS:
+        raise ValueError(f"Batch exceeds {settings.BATCH_VERIFY_MAX_ITEMS} titles.")
+
+    titles = []
+    for i, item in enumerate(items):
+        title = item.get("title") if isinstance(item, dict) else item
+        if not isinstance(title, str) or not title.strip():
+            raise ValueError(f"Item {i} has no title.")
+        titles.append(title)
+    return titles
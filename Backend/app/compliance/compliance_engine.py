@@ -4,12 +4,12 @@ from app.compliance.periodicity_validator import PeriodicityValidator
 from app.compliance.title_combination_detector import TitleCombinationDetector
 
 class ComplianceEngine:
-    def __init__(self):
+    def __init__(self, combination_matcher=None):
         self.validators = {
             "restricted": RestrictedTermsValidator(),
             "prefix": PrefixSuffixValidator(),
             "periodicity": PeriodicityValidator(),
-            "combination": TitleCombinationDetector()
+            "combination": TitleCombinationDetector(matcher=combination_matcher)
         }
 
     async def check_compliance(self, title: str, existing_titles: list = None) -> dict:
@@ -1,48 +1,47 @@
-import re
+from app.retrieval.title_phrase_matcher import TitlePhraseMatcher
 
 class TitleCombinationDetector:
-    def __init__(self):
-        # In a real system, this would be a trie or a pre-computed token set
-        # For the hackathon Lean 6, we use a simple set-based comparison
-        pass
+    def __init__(self, matcher: TitlePhraseMatcher = None):
+        # Shared catalogue matcher (built at startup, updated on submit).
+        # Without one, a throwaway matcher is built from the titles passed to check().
+        self.matcher = matcher
 
     async def check(self, title: str, existing_titles: list) -> dict:
         """
         Detects if the submitted title is a combination of two or more existing titles.
         Example: "Hindu Indian Express" where "Hindu" and "Indian Express" exist.
-        Using exact substring match for higher precision.
+        Using exact whole-word substring match for higher precision.
         """
         title_lower = title.lower()
-        
+
+        matcher = self.matcher
+        if matcher is None:
+            matcher = TitlePhraseMatcher()
+            matcher.build_index(existing_titles)
+
+        # One pattern-table lookup of the query's word spans finds every existing title it contains (catalogue order)
         found_components = []
-        for existing in existing_titles:
-            existing_title = existing["normalized_title"].lower()
-            
-            # Extremely fast C-level string presence pre-filter (drops 5s latency -> 5ms)
-            if existing_title and len(existing_title) > 2 and existing_title in title_lower:
-                # Only compile and evaluate the word-boundary regex if it is already a confirmed strict substring
-                pattern = rf"\b{re.escape(existing_title)}\b"
-                if re.search(pattern, title_lower):
-                    found_components.append(existing_title)
-                
+        for existing_title in matcher.find_components(title_lower):
+            found_components.append(existing_title)
+
             # Stop if we found a combination of at least 2 distinct existing titles
             if len(found_components) >= 2:
                 # Double check to prevent overlapping matches (e.g. "Indian" and "Indian Express")
                 # We want distinct segments of the title
                 distinct_components = []
                 sorted_components = sorted(found_components, key=len, reverse=True)
-                
+
                 temp_title = title_lower
                 for comp in sorted_components:
                     if comp in temp_title:
                         distinct_components.append(comp)
                         temp_title = temp_title.replace(comp, " ", 1)
-                
+
                 if len(distinct_components) >= 2:
                     return {
                         "reason": f"Title appears to be a combination of existing titles: {', '.join(distinct_components)}",
                         "components": distinct_components,
                         "penalty": 1.0
                     }
-        
+
         return None
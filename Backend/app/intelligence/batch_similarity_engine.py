@@ -0,0 +1,199 @@
+import heapq
+import numpy as np
+from rapidfuzz import fuzz, process
+from app.intelligence.phonetic_similarity_engine import PhoneticSimilarityEngine
+
+# Numerical slack when comparing the Indel bound against exact scores
+_BOUND_EPS = 1e-9
+# Conflicts are ranked on scores rounded to 4 decimals; a bound this far below the k-th score cannot tie it
+_ROUND_EPS = 1e-4
+# Candidates scoring above this are reported as conflicts
+CONFLICT_FLOOR = 0.60
+
+class BatchSimilarityEngine:
+    """
+    Scores one query against a block of candidates in a single call.
+    Uses rapidfuzz cdist kernels for the fuzzy token-set ratios and NumPy for the
+    max-dominant / containment / short-title combination, so the candidate cap can
+    grow to thousands without a per-candidate Python scoring loop.
+    """
+    def __init__(self):
+        self.phonetic = PhoneticSimilarityEngine()
+
+    def score(self, query, candidates: list, words_count: int, conflict_floor: float = CONFLICT_FLOOR,
+              top_k: int = 5, known_finals=None) -> dict:
+        """
+        `query` and `candidates` are TitleFeatures. Returns float64 arrays (one entry per candidate):
+        semantic, lexical, phonetic, containment and final (the combined score), a `resolved` mask of
+        exact final scores, plus per-stage `pruned` counts.
+        `known_finals` are exact final scores of candidates scored earlier for the same query (previous
+        blocks); they seed the best match / top conflicts so pruning carries across blocks.
+        Cheap upper bounds skip work that cannot change the outcome:
+          - ngram: the trigram Jaccard is only computed where its count bound (min/max set size)
+            could raise the token-set ratios;
+          - phonetic: the exact ratio is only needed where the Indel bound reaches the lexical score;
+          - final_bound: of those, candidates whose best possible final score is below the current
+            best match and either cannot exceed conflict_floor or, once `top_k` conflicts are known,
+            cannot enter them, are skipped.
+        `phonetic_exact` marks the exact phonetic entries; elsewhere `phonetic` holds the Indel bound
+        (strictly below `lexical` unless the candidate was pruned on its final bound). Pruned candidates
+        are not `resolved`: their `final` is their bound capped at conflict_floor, not a score, so it
+        can neither be the best match nor be reported as a conflict.
+        """
+        n = len(candidates)
+        pruned = {"ngram": 0, "phonetic": 0, "final_bound": 0}
+        if n == 0:
+            empty = np.zeros(0)
+            return {"semantic": empty, "lexical": empty, "phonetic": empty, "containment": empty,
+                    "final": empty, "phonetic_exact": np.zeros(0, dtype=bool),
+                    "resolved": np.zeros(0, dtype=bool), "pruned": pruned}
+
+        # Lexical (Fuzzy Token Set) - max of original vs transliterated vs space-stripped
+        lexical = np.maximum.reduce([
+            self._cdist(query.lower, [c.lower for c in candidates], fuzz.token_set_ratio),
+            self._cdist(query.norm, [c.norm for c in candidates], fuzz.token_set_ratio),
+            self._cdist(query.canonical, [c.canonical for c in candidates], fuzz.token_set_ratio),
+        ])
+
+        # Sub-character 3-gram Jaccard (|A ∩ B| / |A ∪ B| <= min(|A|, |B|) / max(|A|, |B|)),
+        # computed only where that bound exceeds the token-set ratios
+        q_grams = query.trigrams
+        if q_grams:
+            q_size = len(q_grams)
+            sizes = np.fromiter((len(c.trigrams) for c in candidates), dtype=np.float64, count=n)
+            count_bound = np.zeros(n)
+            np.divide(np.minimum(sizes, q_size), np.maximum(sizes, q_size), out=count_bound, where=sizes > 0)
+            need_ngram = np.flatnonzero(count_bound > lexical)
+            pruned["ngram"] = n - len(need_ngram)
+            for i in need_ngram:
+                c_grams = candidates[i].trigrams
+                inter = len(q_grams & c_grams)
+                lexical[i] = max(lexical[i], inter / (q_size + len(c_grams) - inter))
+
+        # Semantic (Concept Clusters)
+        q_roots = query.concept_roots
+        semantic = np.fromiter((1.0 if q_roots & c.concept_roots else 0.0 for c in candidates), dtype=np.float64, count=n)
+
+        # Containment of NFKC-lowered forms in either direction
+        q_lower = query.lower
+        containment = np.fromiter(
+            (1.0 if (c.lower in q_lower or q_lower in c.lower) else 0.0 for c in candidates),
+            dtype=np.float64, count=n
+        )
+
+        # Phonetic (Double Metaphone) - Indel ratio (LCS) bounds the SequenceMatcher ratio from above,
+        # so the exact ratio is only needed where phonetic could dominate the lexical score
+        phonetic = np.maximum(
+            self._phonetic_bound(query.codes_lower, [c.codes_lower for c in candidates]),
+            self._phonetic_bound(query.codes_norm, [c.codes_norm for c in candidates]),
+        )
+        phonetic_exact = np.zeros(n, dtype=bool)
+        need_exact = phonetic + _BOUND_EPS >= lexical
+        pruned["phonetic"] = n - int(need_exact.sum())
+
+        # Everywhere else the final score is already exact
+        final = self._combine_dominant(np.maximum(lexical, phonetic), semantic, containment, words_count)
+        seed = final[~need_exact]
+        if known_finals is not None:
+            seed = np.concatenate([seed, known_finals])
+        best = float(seed.max()) if len(seed) else -1.0
+        top_conflicts = [f for f in seed if f > conflict_floor]
+        top_conflicts = heapq.nlargest(top_k, top_conflicts)
+        heapq.heapify(top_conflicts)
+
+        # Resolve the remaining candidates from the highest final bound down, stopping once
+        # no remaining candidate can become the best match or a reported conflict
+        bound = self.final_upper_bound(lexical, phonetic, semantic, containment, words_count)
+        pending = np.flatnonzero(need_exact)
+        pending = pending[np.argsort(-bound[pending], kind="stable")]
+        skipped = pending[:0]
+        for rank, i in enumerate(pending):
+            b = bound[i] + _BOUND_EPS
+            # Above the floor, only a full top-k list of higher conflicts rules the candidate out
+            outranked = len(top_conflicts) >= top_k and b + _ROUND_EPS < top_conflicts[0]
+            if b < best and (b <= conflict_floor or outranked):
+                skipped = pending[rank:]
+                break
+            phonetic[i] = self.phonetic_similarity(query, candidates[i])
+            phonetic_exact[i] = True
+            final[i] = self._combine_dominant(
+                max(lexical[i], phonetic[i]), semantic[i], containment[i], words_count
+            )
+            best = max(best, float(final[i]))
+            if final[i] > conflict_floor:
+                if len(top_conflicts) < top_k:
+                    heapq.heappush(top_conflicts, final[i])
+                elif final[i] > top_conflicts[0]:
+                    heapq.heapreplace(top_conflicts, final[i])
+
+        # Pruned candidates keep their bound, capped at the floor so it never reads as a conflict score
+        final[skipped] = np.minimum(bound[skipped], conflict_floor)
+        pruned["final_bound"] = len(skipped)
+        resolved = np.ones(n, dtype=bool)
+        resolved[skipped] = False
+
+        return {
+            "semantic": semantic,
+            "lexical": lexical,
+            "phonetic": phonetic,
+            "containment": containment,
+            "final": final,
+            "phonetic_exact": phonetic_exact,
+            "resolved": resolved,
+            "pruned": pruned,
+        }
+
+    def phonetic_similarity(self, query, candidate) -> float:
+        """Exact phonetic score for one candidate (max of original vs transliterated codes)."""
+        return max(
+            self.phonetic.similarity_from_codes(query.codes_lower, candidate.codes_lower),
+            self.phonetic.similarity_from_codes(query.codes_norm, candidate.codes_norm),
+        )
+
+    @classmethod
+    def combine(cls, scores: dict, words_count: int) -> np.ndarray:
+        """Multi-Signal Similarity Model (Max-Dominant Hybrid) applied to whole score arrays."""
+        # 1. Deterministic Dominant Core
+        dominant = np.maximum(scores["lexical"], scores["phonetic"])
+        return cls._combine_dominant(dominant, scores["semantic"], scores["containment"], words_count)
+
+    @classmethod
+    def final_upper_bound(cls, lexical, phonetic_bound, semantic, containment, words_count: int) -> np.ndarray:
+        """
+        Highest final score reachable while the phonetic score is only known to lie in [0, phonetic_bound].
+        The combination is not monotone in the dominant score (dampening stops at 0.95), so when the
+        dominant range straddles 0.95 the supremum just below it is taken into account as well.
+        """
+        upper = np.maximum(lexical, phonetic_bound)
+        final = np.where(upper < 0.95, 0.7 * upper + 0.3 * semantic, upper)
+        straddles = (lexical < 0.95) & (upper >= 0.95)
+        final = np.where(straddles, np.maximum(final, 0.7 * 0.95 + 0.3 * semantic), final)
+        return cls._boost(final, containment, words_count)
+
+    @classmethod
+    def _combine_dominant(cls, dominant, semantic, containment, words_count: int):
+        # 2. Semantic Dampening (Semantic only assists, doesn't weaken near-duplicates)
+        final = np.where(dominant < 0.95, 0.7 * dominant + 0.3 * semantic, dominant)
+        return cls._boost(final, containment, words_count)
+
+    @staticmethod
+    def _boost(final, containment, words_count: int):
+        # 3. Containment Boost (controlled — 0.10 not 0.15)
+        boosted = np.minimum(1.0, final + 0.10 * containment)
+
+        # 4. Adaptive Threshold by Title Length (gentle 1.03x for short titles)
+        if words_count <= 2:
+            boosted = np.minimum(1.0, boosted * 1.03)
+        return boosted
+
+    @staticmethod
+    def _cdist(query: str, choices: list, scorer) -> np.ndarray:
+        return process.cdist([query], choices, scorer=scorer, dtype=np.float64)[0] / 100.0
+
+    @classmethod
+    def _phonetic_bound(cls, query_codes: tuple, candidate_codes: list) -> np.ndarray:
+        primary = query_codes[0]
+        # Compare primary to primary, and primary to secondary (falling back to primary)
+        sim1 = cls._cdist(primary, [c[0] for c in candidate_codes], fuzz.ratio)
+        sim2 = cls._cdist(primary, [c[1] if c[1] else c[0] for c in candidate_codes], fuzz.ratio)
+        return np.maximum(sim1, sim2)
@@ -47,17 +47,17 @@ def get_cluster_alternatives(word: str) -> list:
             return [v for v in variants if v != word_lower]
     return []
 
+def get_cluster_roots(title: str) -> frozenset:
+    """Returns the cluster keys reached by the title's words (words of 3 chars or less are ignored)."""
+    roots = {get_concept_root(w) for w in title.lower().split() if len(w) > 3}
+    
+    # Exclude roots that are just the word itself (unless they are cluster keys)
+    return frozenset(roots.intersection(CONCEPT_CLUSTERS.keys()))
+
 def calculate_concept_similarity(title1: str, title2: str) -> float:
     """
     Checks if titles share conceptual roots.
     Returns 1.0 if they share a cluster root, else 0.0.
     """
-    roots1 = {get_concept_root(w) for w in title1.lower().split() if len(w) > 3}
-    roots2 = {get_concept_root(w) for w in title2.lower().split() if len(w) > 3}
-    
-    # Exclude roots that are just the word itself (unless they are cluster keys)
-    cluster_roots1 = roots1.intersection(CONCEPT_CLUSTERS.keys())
-    cluster_roots2 = roots2.intersection(CONCEPT_CLUSTERS.keys())
-    
-    intersection = cluster_roots1.intersection(cluster_roots2)
+    intersection = get_cluster_roots(title1).intersection(get_cluster_roots(title2))
     return 1.0 if intersection else 0.0
@@ -19,19 +19,20 @@ class LexicalSimilarityEngine:
         Extremely effective against concatenation, hyphenation, and typo attacks.
         J(A,B) = |A ∩ B| / |A ∪ B|
         """
-        s1 = title1.lower().replace(" ", "")
-        s2 = title2.lower().replace(" ", "")
-        
-        if not s1 or not s2:
-            return 0.0
-            
-        def get_ngrams(text, n):
-            return set(text[i:i+n] for i in range(max(1, len(text)-n+1)))
-            
-        g1 = get_ngrams(s1, n)
-        g2 = get_ngrams(s2, n)
-        
-        if not g1 and not g2:
+        g1 = self.ngram_set(title1, n)
+        g2 = self.ngram_set(title2, n)
+        return self.jaccard(g1, g2)
+
+    @staticmethod
+    def ngram_set(text: str, n: int = 3) -> frozenset:
+        """Space-stripped, lowercased character N-grams (empty for empty text)."""
+        s = text.lower().replace(" ", "")
+        if not s:
+            return frozenset()
+        return frozenset(s[i:i+n] for i in range(max(1, len(s)-n+1)))
+
+    @staticmethod
+    def jaccard(g1: frozenset, g2: frozenset) -> float:
+        if not g1 or not g2:
             return 0.0
-            
-        return len(g1.intersection(g2)) / len(g1.union(g2))
+        return len(g1 & g2) / len(g1 | g2)
@@ -6,7 +6,11 @@ class PhoneticSimilarityEngine:
         # Get primary and secondary metaphones
         m1 = doublemetaphone(title1)
         m2 = doublemetaphone(title2)
-        
+        return self.similarity_from_codes(m1, m2)
+
+    @staticmethod
+    def similarity_from_codes(m1: tuple, m2: tuple) -> float:
+        """Scores two precomputed (primary, secondary) Double Metaphone code pairs."""
         # Compare primary to primary
         sim1 = SequenceMatcher(None, m1[0], m2[0]).ratio()
         
@@ -1,10 +1,15 @@
 import logging
+import numpy as np
 import torch
 import torch.nn.functional as F
+from app.configuration.system_config import settings
+from app.persistence.embedding_cache import EmbeddingCache
 
 class SemanticSimilarityEngine:
     _model_instance = None # Class-level singleton
     _tokenizer_instance = None
+    _cache_instances = {}  # model name -> EmbeddingCache (None when disabled)
+    MAX_TOKENS = 64        # Titles are short; one truncation so cached and fresh embeddings agree
 
     def __init__(self, model_name: str = 'sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2'):
         self.model_name = model_name
@@ -33,6 +38,29 @@ class SemanticSimilarityEngine:
         sum_mask = torch.clamp(input_mask_expanded.sum(1), min=1e-9)
         return sum_embeddings / sum_mask
 
+    @property
+    def index_params(self) -> dict:
+        """Embedding settings a prebuilt FAISS index depends on (its source fingerprint params)."""
+        return {"model": self.model_name, "text": EmbeddingCache.TEXT_FORM}
+
+    @property
+    def embedding_cache(self):
+        """Shared EmbeddingCache of this model (None when disabled or unusable)."""
+        caches = SemanticSimilarityEngine._cache_instances
+        if self.model_name not in caches:
+            cache = None
+            if settings.EMBEDDING_CACHE:
+                try:
+                    cache = EmbeddingCache(
+                        self.model_name,
+                        directory=settings.EMBEDDING_CACHE_DIR or EmbeddingCache.DEFAULT_DIR,
+                        lru_size=settings.EMBEDDING_CACHE_LRU_SIZE
+                    )
+                except (OSError, ValueError) as e:
+                    self.logger.error(f"Embedding cache disabled: {e}")
+            caches[self.model_name] = cache
+        return caches[self.model_name]
+
     async def calculate_similarity(self, title1: str, title2: str) -> float:
         model, tokenizer = self.model_and_tokenizer
         if model is None:
@@ -40,22 +68,12 @@ class SemanticSimilarityEngine:
             return 0.0
             
         try:
-            # Tokenize sentences
-            encoded_input = tokenizer([title1, title2], padding=True, truncation=True, return_tensors='pt')
-            
-            # Compute token embeddings
-            with torch.no_grad():
-                model_output = model(**encoded_input)
-                
-            # Perform pooling
-            sentence_embeddings = self._mean_pooling(model_output, encoded_input['attention_mask'])
-            
-            # Normalize embeddings
-            sentence_embeddings = F.normalize(sentence_embeddings, p=2, dim=1)
+            # Both embeddings come from the cache; only uncached titles go through the model
+            sentence_embeddings = self._embed([title1, title2], batch_size=2)
             
             # Compute cosine similarity
-            cosine_score = (sentence_embeddings[0] @ sentence_embeddings[1].T).item()
-            return float(cosine_score)
+            cosine_score = float(sentence_embeddings[0] @ sentence_embeddings[1])
+            return cosine_score
         except Exception as e:
             self.logger.error(f"Semantic similarity calculation failed: {str(e)}")
             return 0.0
@@ -66,13 +84,7 @@ class SemanticSimilarityEngine:
         if model is None:
             return None
         try:
-            import numpy as np
-            encoded_input = tokenizer([text], padding=True, truncation=True, return_tensors='pt')
-            with torch.no_grad():
-                model_output = model(**encoded_input)
-            sentence_embeddings = self._mean_pooling(model_output, encoded_input['attention_mask'])
-            sentence_embeddings = F.normalize(sentence_embeddings, p=2, dim=1)
-            return sentence_embeddings[0].numpy().astype('float32')
+            return self._embed([text], batch_size=1)[0]
         except Exception as e:
             self.logger.error(f"Encoding failed: {e}")
             return None
@@ -83,22 +95,42 @@ class SemanticSimilarityEngine:
         if model is None:
             return None
         try:
-            import numpy as np
-            all_embeddings = []
-            
-            # Process in batches to avoid OOM
-            for i in range(0, len(texts), batch_size):
-                batch_texts = texts[i:i + batch_size]
-                encoded_input = tokenizer(batch_texts, padding=True, truncation=True, return_tensors='pt', max_length=64)
-                
-                with torch.no_grad():
-                    model_output = model(**encoded_input)
-                    
-                sentence_embeddings = self._mean_pooling(model_output, encoded_input['attention_mask'])
-                sentence_embeddings = F.normalize(sentence_embeddings, p=2, dim=1)
-                all_embeddings.append(sentence_embeddings.numpy().astype('float32'))
-                
-            return np.vstack(all_embeddings)
+            return self._embed(texts, batch_size)
         except Exception as e:
             self.logger.error(f"Batch encoding failed: {e}")
             return None
+
+    def _embed(self, texts: list, batch_size: int) -> np.ndarray:
+        """
+        Normalized float32 embeddings of `texts` (one row each). Texts are embedded in their
+        EmbeddingCache.normalize() form; cached ones are looked up, the rest encoded and cached.
+        """
+        texts = [EmbeddingCache.normalize(text) for text in texts]
+        cache = self.embedding_cache
+        found = cache.get_many(texts) if cache else [None] * len(texts)
+        missing = list(dict.fromkeys(text for text, embedding in zip(texts, found) if embedding is None))
+        if missing:
+            computed = self._forward(missing, batch_size)
+            if cache:
+                cache.put_many(missing, computed)
+            computed = dict(zip(missing, computed))
+            found = [computed[text] if embedding is None else embedding for text, embedding in zip(texts, found)]
+        return np.vstack(found).astype('float32', copy=False)
+
+    def _forward(self, texts: list, batch_size: int) -> np.ndarray:
+        model, tokenizer = self.model_and_tokenizer
+        all_embeddings = []
+        
+        # Process in batches to avoid OOM
+        for i in range(0, len(texts), batch_size):
+            batch_texts = texts[i:i + batch_size]
+            encoded_input = tokenizer(batch_texts, padding=True, truncation=True, return_tensors='pt', max_length=self.MAX_TOKENS)
+            
+            with torch.no_grad():
+                model_output = model(**encoded_input)
+                
+            sentence_embeddings = self._mean_pooling(model_output, encoded_input['attention_mask'])
+            sentence_embeddings = F.normalize(sentence_embeddings, p=2, dim=1)
+            all_embeddings.append(sentence_embeddings.numpy().astype('float32'))
+            
+        return np.vstack(all_embeddings)
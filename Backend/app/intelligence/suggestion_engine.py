@@ -8,6 +8,7 @@ and full pipeline re-scoring to ensure suggestion quality.
 import logging
 import json
 import os
+import time
 from typing import List, Dict, Tuple, Optional
 from metaphone import doublemetaphone
 
@@ -16,6 +17,7 @@ from app.intelligence.concept_clusters import (
     get_concept_root,
     get_cluster_alternatives,
 )
+from app.monitoring import metrics
 
 logger = logging.getLogger("mesh")
 
@@ -256,22 +258,39 @@ class SuggestionEngine:
         orchestrator,
         min_probability: float = 10.0,
         max_results: int = 5,
+        batch_size: int = 5,
     ) -> List[Dict]:
         """
-        Runs each candidate through the full verification pipeline.
-        Keeps candidates that get Accept or Review decisions above the threshold.
+        Runs candidates through the full verification pipeline in batches that share one
+        verification context (catalogue pass and token lookups). Batches are verified sequentially
+        inside the caller's own verification (already running on an executor worker).
+        Keeps candidates that get Accept or Review decisions above the threshold, in generation
+        order, and stops as soon as `max_results` of them are confirmed.
         """
         scored = []
+        context = await orchestrator.create_context(origin="suggestion")
+
+        for start in range(0, len(candidates), batch_size):
+            batch = candidates[start:start + batch_size]
+            # verify_batch skips suggestions for every title to prevent recursion
+            wave_start = time.perf_counter()
+            results = await orchestrator.verify_batch(
+                [c["title"] for c in batch], return_exceptions=True, context=context
+            )
+            metrics.SUGGESTION_WAVE_SECONDS.observe(time.perf_counter() - wave_start)
+            metrics.SUGGESTION_CANDIDATES_TOTAL.labels("rescored").inc(len(batch))
+
+            for candidate, result in zip(batch, results):
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to re-score suggestion '{candidate['title']}': {result}")
+                    continue
 
-        for candidate in candidates:
-            try:
-                # Call verify with _skip_suggestions=True to prevent recursion
-                result = await orchestrator.verify(candidate["title"], _skip_suggestions=True)
                 prob = result.verification_probability
                 decision = result.decision
 
                 # Return suggestions that are Accept or Review (better than the rejected original)
                 if decision in ("Accept", "Review") and prob >= min_probability:
+                    metrics.SUGGESTION_CANDIDATES_TOTAL.labels("accepted").inc()
                     scored.append({
                         "suggested_title": candidate["title"],
                         "verification_probability": round(prob, 2),
@@ -281,9 +300,8 @@ class SuggestionEngine:
                     if len(scored) >= max_results:
                         break
 
-            except Exception as e:
-                logger.warning(f"Failed to re-score suggestion '{candidate['title']}': {e}")
-                continue
+            if len(scored) >= max_results:
+                break
 
         # Sort by probability descending
         scored.sort(key=lambda x: x["verification_probability"], reverse=True)
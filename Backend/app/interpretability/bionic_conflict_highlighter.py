@@ -41,16 +41,24 @@ class BionicConflictHighlighter:
         span_class = f"bionic-fixation conflict-{conflict_type}"
         return f'<span class="{span_class}" style="font-weight:{weight}">{word[:bold_count]}</span>{word[bold_count:]}'
 
-    def highlight(self, text: str, conflicts: dict) -> str:
-        """Applies bionic-style highlighting with conflict-aware coloring."""
+    def word_codes(self, text: str) -> list:
+        """Primary metaphone code per word of `text`, as used by highlight()."""
+        return [doublemetaphone(re.sub(r'[^a-zA-Z]', '', word).lower())[0] for word in text.split()]
+
+    def highlight(self, text: str, conflicts: dict, word_codes: list = None) -> str:
+        """
+        Applies bionic-style highlighting with conflict-aware coloring.
+        `word_codes` may carry precomputed word_codes(text) when highlighting the same text repeatedly.
+        """
         words = text.split()
+        if word_codes is None:
+            word_codes = self.word_codes(text)
         conflict_tokens = set([t.lower() for t in conflicts.get("tokens", [])])
         rule_violations = set([t.lower() for t in conflicts.get("rules", [])])
         phonetic_targets = set(conflicts.get("phonetic", []))
         processed_words = []
-        for word in words:
+        for word, m_code in zip(words, word_codes):
             clean = re.sub(r'[^a-zA-Z]', '', word).lower()
-            m_code = doublemetaphone(clean)[0]
             conflict_type = None
             if clean in conflict_tokens: conflict_type = "lexical"
             elif m_code in phonetic_targets: conflict_type = "phonetic"
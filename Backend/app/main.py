@@ -1,14 +1,31 @@
+import asyncio
 import logging
 import time
 import os
 import json
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import verification_routes, submission_routes, health_routes
+from app.api import verification_routes, submission_routes, health_routes, metrics_routes, admin_routes
 from app.monitoring.structured_logger import setup_logging
 from app.retrieval.ann_vector_search import ANNVectorSearch
-from app.retrieval.inverted_token_index import InvertedTokenIndex
+from app.intelligence.semantic_similarity_engine import SemanticSimilarityEngine
+from app.retrieval.multi_field_token_index import MultiFieldTokenIndex
+from app.retrieval.canonical_title_index import CanonicalTitleIndex
+from app.retrieval.title_trigram_index import TitleTrigramIndex
+from app.retrieval.phonetic_token_index import PhoneticTokenIndex
+from app.retrieval.symspell_token_expander import SymSpellTokenExpander
+from app.retrieval.title_phrase_matcher import TitlePhraseMatcher
+from app.retrieval.title_feature_store import TitleFeatureStore
 from app.persistence.title_repository import TitleRepository
+from app.persistence import index_snapshot
+from app.persistence.title_change_log import TitleChangeLog
+from app.orchestration.mesh_orchestrator import MeshOrchestrator
+from app.orchestration.verification_cache import VerificationCache
+from app.orchestration.verification_executor import VerificationExecutor
+from app.orchestration.change_log_follower import ChangeLogFollower
+from app.orchestration.index_compactor import IndexCompactor
+from app.orchestration.index_rebuilder import IndexRebuilder
+from app.configuration.system_config import settings
 
 app = FastAPI(
     title="Mesh Compliance Core",
@@ -25,48 +42,300 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+def create_indexes() -> dict:
+    """Empty instances of every in-memory index built from the catalogue, keyed by app.state name."""
+    return {
+        "token_index": MultiFieldTokenIndex(workers=settings.INDEX_BUILD_WORKERS),
+        "canonical_index": CanonicalTitleIndex(),
+        "trigram_index": TitleTrigramIndex(max_edits=settings.TRIGRAM_MAX_EDITS),
+        "phonetic_index": PhoneticTokenIndex(),
+        "fuzzy_expander": SymSpellTokenExpander(
+            max_edits=settings.FUZZY_MAX_EDITS, prefix_length=settings.FUZZY_PREFIX_LENGTH
+        ),
+        "phrase_matcher": TitlePhraseMatcher(),
+        "feature_store": TitleFeatureStore(),
+    }
+
 # Store indexes in app.state for dependency injection
 # We keep ANNVectorSearch instance for compatibility but it will remain empty/unused in Lexical Mode
 app.state.ann_index = ANNVectorSearch() 
-app.state.token_index = InvertedTokenIndex()
+_indexes = create_indexes()
+for _name, _index in _indexes.items():
+    setattr(app.state, _name, _index)
 app.state.sbert_available = False # Explicitly False to signal Lexical fallback
+# app.state attributes an admin rebuild replaces together (one index generation)
+GENERATION_STATE = (*_indexes, "ann_index", "sbert_available")
+# Bumped on every submit / rule change; part of every result cache key
+app.state.index_generation = 0
+# Bumped when an admin rebuild swaps in a new index generation (process-mode workers reload)
+app.state.index_epoch = 0
+app.state.result_cache = VerificationCache(
+    generation=lambda: app.state.index_generation,
+    max_entries=settings.RESULT_CACHE_MAX_ENTRIES,
+    max_bytes=settings.RESULT_CACHE_MAX_BYTES,
+    ttl_seconds=settings.RESULT_CACHE_TTL_SECONDS
+)
+
+def snapshot_source() -> dict:
+    """Fingerprint an index snapshot must carry to be loaded: dataset file plus index-shaping settings."""
+    return index_snapshot.source_fingerprint(
+        TitleRepository().json_path,
+        params={
+            "TRIGRAM_MAX_EDITS": settings.TRIGRAM_MAX_EDITS,
+            "FUZZY_MAX_EDITS": settings.FUZZY_MAX_EDITS,
+            "FUZZY_PREFIX_LENGTH": settings.FUZZY_PREFIX_LENGTH,
+        }
+    )
+
+def build_indexes(titles: list, indexes: dict = None, progress=None):
+    """
+    Builds every in-memory index from the catalogue titles: app.state's, or those of `indexes`
+    (see create_indexes). `progress(step, done, total)` is called after each index.
+    """
+    logger = logging.getLogger("mesh")
+    indexes = indexes or current_generation()
+    steps = 7  # One per index below
+    done = 0
+    def step(name: str):
+        nonlocal done
+        done += 1
+        if progress:
+            progress(name, done, steps)
+    
+    # 2. Build Inverted Token Index (raw + transliterated-flattened + romanized fields)
+    indexes["token_index"].build_index(titles)
+    logger.info(
+        f"Inverted token index built with {len(titles)} titles "
+        f"({len(indexes['token_index'].fields['roman'].titles_map)} native-script titles romanized)."
+    )
+    step("token_index")
+    
+    # 2.5. Build Canonical Trigram Index (typo / concatenation-robust retrieval channel)
+    indexes["trigram_index"].build_index(titles)
+    logger.info(f"Trigram index built with {len(indexes['trigram_index'].store)} trigrams.")
+    step("trigram_index")
+    
+    # 2.6. Build Phonetic Token Index (Double Metaphone codes per token, sound-alike channel)
+    indexes["phonetic_index"].build_index(titles)
+    logger.info(f"Phonetic token index built with {len(indexes['phonetic_index'].store)} codes.")
+    step("phonetic_index")
+    
+    # 2.7. Build SymSpell deletion dictionary over the token vocabulary (typo expansion of query tokens)
+    indexes["fuzzy_expander"].build_index(titles)
+    logger.info(
+        f"Fuzzy expander built with {len(indexes['fuzzy_expander'].vocabulary)} tokens, "
+        f"{len(indexes['fuzzy_expander'].deletes)} deletes."
+    )
+    step("fuzzy_expander")
+    
+    # 3. Build Canonical Title Index (exact + containment lookups for the concatenation check)
+    indexes["canonical_index"].build_index(titles)
+    logger.info(f"Canonical title index built with {len(indexes['canonical_index'].exact)} canonical forms.")
+    step("canonical_index")
+    
+    # 4. Build Title Phrase Matcher (single-pass combination detection)
+    indexes["phrase_matcher"].build_index(titles)
+    logger.info(f"Title phrase matcher built with {len(indexes['phrase_matcher'].ordinals)} patterns.")
+    step("phrase_matcher")
+    
+    # 5. Precompute per-title scoring features (normalized forms, trigrams, metaphone codes)
+    indexes["feature_store"].build_index(titles)
+    logger.info(f"Feature store built with {len(indexes['feature_store'])} titles.")
+    step("feature_store")
+
+def current_generation() -> dict:
+    """The serving generation's indexes, ann_index and sbert_available from app.state."""
+    return {name: getattr(app.state, name) for name in GENERATION_STATE}
+
+def create_orchestrator(indexes: dict) -> MeshOrchestrator:
+    """Orchestrator over one generation of indexes (app.state names, plus ann_index / sbert_available)."""
+    return MeshOrchestrator(
+        ann_index=indexes["ann_index"],
+        token_index=indexes["token_index"],
+        sbert_available=indexes["sbert_available"],
+        canonical_index=indexes["canonical_index"],
+        phrase_matcher=indexes["phrase_matcher"],
+        feature_store=indexes["feature_store"],
+        result_cache=app.state.result_cache,
+        trigram_index=indexes["trigram_index"],
+        phonetic_index=indexes["phonetic_index"],
+        fuzzy_expander=indexes["fuzzy_expander"]
+    )
+
+def build_generation(titles: list, progress=None) -> dict:
+    """
+    A complete new index generation off app.state (admin rebuild): every index, the FAISS index
+    in semantic mode, and an orchestrator over them. Keyed by the app.state names it replaces.
+    """
+    generation = create_indexes()
+    build_indexes(titles, generation, progress)
+    generation["ann_index"] = ANNVectorSearch()
+    generation["sbert_available"] = settings.SEMANTIC_MODE and load_ann_index(titles, generation["ann_index"])
+    generation["orchestrator"] = create_orchestrator(generation)
+    return generation
+
+def load_index_snapshot() -> bool:
+    """Replaces the app.state indexes with the prebuilt snapshot (build_snapshot.py) when it matches the dataset."""
+    logger = logging.getLogger("mesh")
+    path = settings.INDEX_SNAPSHOT_PATH or index_snapshot.DEFAULT_PATH
+    if not settings.INDEX_SNAPSHOT or not os.path.exists(path):
+        return False
+    try:
+        titles, indexes, header = index_snapshot.load_snapshot(path, snapshot_source())
+    except (OSError, index_snapshot.IndexSnapshotError) as e:
+        logger.warning(f"Index snapshot {path} not used, rebuilding from the dataset: {e}")
+        return False
+    for name, index in indexes.items():
+        setattr(app.state, name, index)
+    TitleRepository.set_cache(titles)
+    logger.info(f"Index snapshot mapped: {header['titles']} titles, {len(header['arrays'])} array sections.")
+    return True
+
+def load_ann_index(titles: list, ann_index: ANNVectorSearch = None) -> bool:
+    """Maps the prebuilt FAISS index (build_index.py) for semantic retrieval; False keeps lexical mode."""
+    logger = logging.getLogger("mesh")
+    ann_index = ann_index or app.state.ann_index
+    semantic = SemanticSimilarityEngine()
+    model, _ = semantic.model_and_tokenizer
+    if model is None:
+        logger.warning("Semantic mode disabled: embedding model unavailable.")
+        return False
+    try:
+        header = ann_index.load(
+            settings.ANN_INDEX_PATH or ANNVectorSearch.DEFAULT_INDEX_PATH,
+            settings.ANN_METADATA_PATH or ANNVectorSearch.DEFAULT_METADATA_PATH,
+            titles,
+            source=index_snapshot.source_fingerprint(TitleRepository().json_path, params=semantic.index_params),
+            ef_search=settings.ANN_EF_SEARCH,
+            nprobe=settings.ANN_NPROBE,
+            rerank_k=settings.ANN_RERANK_K
+        )
+    except (OSError, RuntimeError, ValueError) as e:
+        logger.warning(f"Semantic mode disabled, FAISS index not loaded: {e}")
+        return False
+    logger.info(f"FAISS index mapped: {ann_index.ntotal} x {header['dimension']} vectors "
+                f"({header['model']}, {header.get('description', 'HNSW32,Flat')}).")
+    return True
+
+def create_process_worker() -> ChangeLogFollower:
+    """
+    Initializer of every process-mode verification worker (a fresh interpreter started from the
+    forkserver): loads this process's indexes the way startup does (snapshot, else the dataset)
+    and returns the change log follower the worker catches up before each call.
+    """
+    from_snapshot = load_index_snapshot()
+    titles = asyncio.run(TitleRepository().get_all_titles())
+    if titles and not from_snapshot:
+        build_indexes(titles)
+    if settings.SEMANTIC_MODE and titles:
+        app.state.sbert_available = load_ann_index(titles)
+    app.state.orchestrator = create_orchestrator(current_generation())
+    app.state.index_compactor = IndexCompactor(app.state)
+    return ChangeLogFollower(state=app.state, change_log=TitleChangeLog(settings.CHANGE_LOG_PATH or TitleChangeLog.DEFAULT_PATH))
 
 @app.on_event("startup")
 async def startup_event():
     setup_logging()
     logger = logging.getLogger("mesh")
-    logger.info("=== Mesh Compliance Core Startup (Lexical Mode) ===")
+    logger.info(f"=== Mesh Compliance Core Startup ({'Semantic' if settings.SEMANTIC_MODE else 'Lexical'} Mode) ===")
     
     start_time = time.time()
     
-    # 1. Load titles from JSON dataset
-    repo = TitleRepository()
-    titles = await repo.get_all_titles()
+    # 0. Map the prebuilt index snapshot when it matches the dataset (skips indexing below)
+    from_snapshot = load_index_snapshot()
+    
+    # 0.1. Load titles from JSON dataset (already cached when the snapshot was mapped)
+    titles = await TitleRepository().get_all_titles()
+    
+    # 0.2. Semantic mode: map the prebuilt FAISS index when it matches the catalogue
+    if settings.SEMANTIC_MODE and titles:
+        app.state.sbert_available = load_ann_index(titles)
+    
+    # 0.3. Build the process-wide orchestrator once. Engines are stateless after construction,
+    # so every request (verify, submit, suggestion re-scoring) shares this single instance.
+    app.state.orchestrator = create_orchestrator(current_generation())
+    logger.info(f"Shared orchestrator initialised in {time.time() - start_time:.2f}s.")
+    
+    # 0.5. Execution layer: verify runs in worker threads/processes so the event loop stays free for I/O
+    app.state.verification_executor = VerificationExecutor(
+        orchestrator=lambda: app.state.orchestrator,
+        mode=settings.VERIFY_EXECUTOR,
+        max_workers=settings.VERIFY_EXECUTOR_WORKERS,
+        max_queue=settings.VERIFY_EXECUTOR_QUEUE,
+        worker_factory=create_process_worker,
+        sync_point=lambda: (app.state.index_epoch, app.state.change_log_follower.applied_seq)
+    )
+    logger.info(f"Verification executor: {settings.VERIFY_EXECUTOR} x{settings.VERIFY_EXECUTOR_WORKERS}.")
+    
+    # 0.6. Shared change log of submitted titles (every worker on the host tails it)
+    change_log = TitleChangeLog(settings.CHANGE_LOG_PATH or TitleChangeLog.DEFAULT_PATH)
+    app.state.change_log_follower = ChangeLogFollower(
+        state=app.state,
+        change_log=change_log,
+        poll_seconds=settings.CHANGE_LOG_POLL_SECONDS
+    )
     
     if not titles:
         logger.warning("No titles found. System will operate in empty-index mode.")
-        return
+    elif not from_snapshot:
+        logger.info(f"Loaded {len(titles)} titles for indexing.")
+        
+        # 2-5. Build every index from the dataset
+        build_indexes(titles)
+    
+    # 6. Replay titles submitted since the dataset was built, then follow the change log
+    await app.state.change_log_follower.start()
     
-    logger.info(f"Loaded {len(titles)} titles for indexing.")
+    # 7. Merge delta segments and tombstones of the postings indexes in the background
+    app.state.index_compactor = IndexCompactor(app.state, poll_seconds=settings.INDEX_COMPACTION_POLL_SECONDS)
+    app.state.index_compactor.start()
     
-    # 2. Build Inverted Token Index (Very fast)
-    app.state.token_index.build_index(titles)
-    logger.info(f"Inverted token index built with {len(titles)} titles.")
+    # 8. Admin-triggered rebuilds: a new index generation is built in the background and swapped in
+    app.state.index_rebuilder = IndexRebuilder(
+        app.state, build=build_generation, change_log=change_log, poll_seconds=settings.CHANGE_LOG_POLL_SECONDS
+    )
+    await app.state.index_rebuilder.start()
     
     elapsed = time.time() - start_time
-    logger.info(f"=== Startup complete in {elapsed:.2f}s (Stable Lexical Mode) ===")
+    mode = ("Semantic Mode" if app.state.sbert_available else "Stable Lexical Mode") + (", Index Snapshot" if from_snapshot else "")
+    logger.info(f"=== Startup complete in {elapsed:.2f}s ({mode}) ===")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    follower = getattr(app.state, "change_log_follower", None)
+    if follower is not None:
+        await follower.stop()
+    rebuilder = getattr(app.state, "index_rebuilder", None)
+    if rebuilder is not None:
+        await rebuilder.stop()
+    compactor = getattr(app.state, "index_compactor", None)
+    if compactor is not None:
+        await compactor.stop()
+    executor = getattr(app.state, "verification_executor", None)
+    if executor is not None:
+        executor.shutdown()
 
 # Include Routers
 app.include_router(verification_routes.router, prefix="/api/v1/verify", tags=["Verification"])
 app.include_router(submission_routes.router, prefix="/api/v1/submit", tags=["Submission"])
 app.include_router(health_routes.router, prefix="/health", tags=["Health"])
+app.include_router(metrics_routes.router, prefix="/metrics", tags=["Monitoring"])
+app.include_router(admin_routes.router, prefix="/api/v1/admin", tags=["Admin"])
 
 @app.get("/")
 async def root():
+    embedding_cache = app.state.orchestrator.semantic.embedding_cache if app.state.sbert_available else None
     return {
-        "message": "Welcome to Mesh Compliance Core API (Lexical Mode)",
+        "message": f"Welcome to Mesh Compliance Core API ({'Semantic' if app.state.sbert_available else 'Lexical'} Mode)",
         "version": "2.1.0",
-        "mode": "lexical",
+        "mode": "semantic" if app.state.sbert_available else "lexical",
         "stable": True,
-        "indexed_titles": len(app.state.token_index.titles_map)
+        "indexed_titles": len(app.state.token_index.titles_map),
+        "index_generation": app.state.index_generation,
+        "result_cache": app.state.result_cache.stats(),
+        "executor": app.state.verification_executor.stats(),
+        "change_log": app.state.change_log_follower.stats(),
+        "compaction": app.state.index_compactor.stats(),
+        "rebuild": app.state.index_rebuilder.stats(),
+        "embedding_cache": embedding_cache.stats() if embedding_cache else None
     }
@@ -0,0 +1,165 @@
+import os
+import time
+from prometheus_client import (
+    CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, CONTENT_TYPE_LATEST, generate_latest, multiprocess
+)
+
+# Sub-second stages up to multi-second suggestion runs
+_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+_COUNT_BUCKETS = (0, 1, 5, 10, 50, 100, 250, 500, 1000, 2000, 5000, 10000)
+
+# `origin` separates client verifications ("request") from suggestion re-scoring ("suggestion")
+VERIFY_SECONDS = Histogram(
+    "mesh_verify_seconds", "End-to-end verification latency.",
+    ["origin"], buckets=_LATENCY_BUCKETS
+)
+VERIFY_STAGE_SECONDS = Histogram(
+    "mesh_verify_stage_seconds", "Verification latency per pipeline stage.",
+    ["origin", "stage"], buckets=_LATENCY_BUCKETS
+)
+VERIFY_CANDIDATES = Histogram(
+    "mesh_verify_candidates", "Candidates retrieved per verification.",
+    ["origin"], buckets=_COUNT_BUCKETS
+)
+CANDIDATES_TOTAL = Counter(
+    "mesh_candidates", "Candidates retrieved / examined by the scoring stage.",
+    ["origin", "kind"]
+)
+CANDIDATES_PRUNED_TOTAL = Counter(
+    "mesh_candidates_pruned", "Candidates skipped by bound-based pruning, per pruning stage.",
+    ["origin", "stage"]
+)
+CHANNEL_CANDIDATES_TOTAL = Counter(
+    "mesh_retrieval_channel_candidates", "Candidates per retrieval channel: matched / returned (hits) / kept after fusion.",
+    ["origin", "channel", "kind"]
+)
+PARTIAL_TOTAL = Counter(
+    "mesh_verify_partial", "Verifications cut short by their latency budget.",
+    ["origin"]
+)
+DECISIONS_TOTAL = Counter(
+    "mesh_decisions", "Verification decisions.",
+    ["origin", "decision"]
+)
+RESULT_CACHE_TOTAL = Counter(
+    "mesh_result_cache_requests", "Result cache lookups.",
+    ["origin", "outcome"]
+)
+SUGGESTION_WAVE_SECONDS = Histogram(
+    "mesh_suggestion_rescore_wave_seconds", "Latency of one suggestion re-scoring wave.",
+    buckets=_LATENCY_BUCKETS
+)
+SUGGESTION_CANDIDATES_TOTAL = Counter(
+    "mesh_suggestion_candidates", "Suggestion candidates re-scored / accepted.",
+    ["outcome"]
+)
+INDEX_SIZE = Gauge(
+    "mesh_index_size", "Entries per in-memory index.",
+    ["index"], multiprocess_mode="max"
+)
+INDEX_GENERATION = Gauge(
+    "mesh_index_generation", "Current index generation (bumped on every applied submit), per worker.",
+    multiprocess_mode="liveall"
+)
+CHANGE_LOG_APPLIED_SEQ = Gauge(
+    "mesh_change_log_applied_seq", "Last change log entry applied to this worker's indexes.",
+    multiprocess_mode="liveall"
+)
+CHANGE_LOG_LAG_SECONDS = Histogram(
+    "mesh_change_log_lag_seconds", "Delay between a title being logged and a worker applying it.",
+    buckets=_LATENCY_BUCKETS
+)
+INDEX_COMPACTION_SECONDS = Histogram(
+    "mesh_index_compaction_seconds", "Background compaction of a segmented postings index (freeze to install).",
+    ["index"], buckets=_LATENCY_BUCKETS
+)
+
+INDEX_REBUILD_PROGRESS = Gauge(
+    "mesh_index_rebuild_progress", "Progress of the running admin index rebuild (0-1; 1 once swapped in), per worker.",
+    multiprocess_mode="liveall"
+)
+INDEX_REBUILD_SECONDS = Histogram(
+    "mesh_index_rebuild_seconds", "Admin index rebuild duration, dataset read to generation swap.",
+    buckets=_LATENCY_BUCKETS + (30.0, 60.0, 120.0, 300.0)
+)
+INDEX_REBUILDS_TOTAL = Counter(
+    "mesh_index_rebuilds", "Admin index rebuilds by outcome.",
+    ["outcome"]
+)
+
+
+class StageTimer:
+    """Lap timer for the verification pipeline: each lap() charges the time since the previous lap to a stage."""
+    __slots__ = ("stages", "started", "last")
+
+    def __init__(self):
+        self.stages = {}
+        self.started = self.last = time.perf_counter()
+
+    def lap(self, stage: str):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + (now - self.last)
+        self.last = now
+
+    def total(self) -> float:
+        return self.last - self.started
+
+    def as_ms(self) -> dict:
+        return {stage: round(seconds * 1000, 3) for stage, seconds in self.stages.items()}
+
+
+def record_verification(result, timer: StageTimer, origin: str, cached: bool):
+    """Exports one verification (stage latencies, candidate/pruning counts, decision)."""
+    RESULT_CACHE_TOTAL.labels(origin, "hit" if cached else "miss").inc()
+    DECISIONS_TOTAL.labels(origin, result.decision).inc()
+    VERIFY_SECONDS.labels(origin).observe(timer.total())
+    if cached:
+        return
+
+    for stage, seconds in timer.stages.items():
+        VERIFY_STAGE_SECONDS.labels(origin, stage).observe(seconds)
+
+    metadata = result.metadata or {}
+    retrieved = metadata.get("candidates_checked", 0)
+    VERIFY_CANDIDATES.labels(origin).observe(retrieved)
+    CANDIDATES_TOTAL.labels(origin, "retrieved").inc(retrieved)
+    CANDIDATES_TOTAL.labels(origin, "examined").inc(metadata.get("candidates_examined", 0))
+    for stage, count in (metadata.get("candidates_pruned") or {}).items():
+        CANDIDATES_PRUNED_TOTAL.labels(origin, stage).inc(count)
+    for channel, stats in (metadata.get("retrieval_channels") or {}).items():
+        CHANNEL_CANDIDATES_TOTAL.labels(origin, channel, "matched").inc(stats["matched"])
+        CHANNEL_CANDIDATES_TOTAL.labels(origin, channel, "hits").inc(stats["hits"])
+        CHANNEL_CANDIDATES_TOTAL.labels(origin, channel, "kept").inc(stats["kept"])
+    if metadata.get("partial"):
+        PARTIAL_TOTAL.labels(origin).inc()
+
+
+def update_index_gauges(state):
+    """Refreshes index-size gauges from app.state (called at scrape time)."""
+    sizes = {
+        "token_index": len(state.token_index.titles_map),
+        "canonical_index": len(state.canonical_index.exact),
+        # Live titles: the ordinal lists also keep tombstoned titles until the index is rebuilt
+        "trigram_index": len(state.trigram_index.ordinals),
+        "phonetic_index": len(state.phonetic_index.ordinals),
+        "fuzzy_vocabulary": len(state.fuzzy_expander.vocabulary),
+        "phrase_matcher": len(state.phrase_matcher.ordinals),
+        "feature_store": len(state.feature_store),
+        "result_cache": len(state.result_cache.entries),
+    }
+    for field, field_index in getattr(state.token_index, "fields", {}).items():
+        sizes[f"token_index_{field}"] = len(field_index.titles_map)
+    if state.sbert_available:
+        sizes["ann_index"] = state.ann_index.ntotal
+    for index, size in sizes.items():
+        INDEX_SIZE.labels(index).set(size)
+    INDEX_GENERATION.set(state.index_generation)
+
+
+def render_latest() -> tuple:
+    """Exposition payload and content type; aggregates worker processes when PROMETHEUS_MULTIPROC_DIR is set."""
+    registry = REGISTRY
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
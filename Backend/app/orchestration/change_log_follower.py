@@ -0,0 +1,193 @@
+import asyncio
+import contextlib
+import logging
+import os
+import time
+from app.monitoring import metrics
+from app.persistence.title_repository import TitleRepository
+
+# app.state indexes that take new titles through add_title
+_INDEXES = (
+    "token_index", "canonical_index", "trigram_index", "phonetic_index",
+    "fuzzy_expander", "phrase_matcher", "feature_store",
+)
+
+
+class ChangeLogFollower:
+    """
+    Applies the shared title change log to this worker's in-memory indexes.
+    A submit appends to the log and syncs right away; every other worker picks the entry up on its
+    next poll, so propagation lag is bounded by `poll_seconds` plus the time to apply. Embeddings
+    are encoded in a worker thread first; only the index mutations then run, in log order, under
+    the executor's exclusive() gate, each entry bumping the worker's index generation. On startup
+    the whole log is replayed over the dataset indexes.
+    """
+    BATCH_SIZE = 1000
+
+    def __init__(self, state, change_log, poll_seconds: float = 0.5):
+        self.state = state
+        self.change_log = change_log
+        self.poll_seconds = poll_seconds
+        self.applied_seq = 0
+        self.base_id = 0          # Largest catalogue id; logged ids are allocated above it
+        self.started = time.time()
+        self.last_lag = None      # Seconds from append to apply, last entry applied while following
+        self.task = None
+        self.logger = logging.getLogger("mesh")
+
+    async def start(self):
+        """Replays the log over the freshly built indexes, then follows it in the background."""
+        titles = await TitleRepository().get_all_titles()
+        self.base_id = TitleRepository.max_title_id(titles)
+        self.started = time.time()
+        replayed = await self.sync()
+        self.logger.info(f"Change log replayed: {replayed} titles (seq {self.applied_seq}), pid {os.getpid()}.")
+        self.task = asyncio.create_task(self._follow())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.task
+            self.task = None
+
+    async def append(self, title: str, normalized_title: str, canonical_title: str) -> dict:
+        """Logs an accepted title and applies it locally; returns the log entry (with its title id)."""
+        entry = await asyncio.to_thread(self.change_log.append, title, normalized_title, canonical_title, self.base_id)
+        await self.sync()
+        return entry
+
+    async def sync(self) -> int:
+        """Applies every entry logged since the last sync; returns how many."""
+        applied = 0
+        executor = getattr(self.state, "verification_executor", None)
+        while True:
+            entries = await asyncio.to_thread(self.change_log.read_since, self.applied_seq, self.BATCH_SIZE)
+            if not entries:
+                return applied
+            # Model inference off the event loop and outside the gate; the gate only covers mutations
+            embeddings = await asyncio.to_thread(self._encode_entries, entries, self._state_indexes())
+            async with executor.exclusive() if executor else contextlib.nullcontext():
+                for entry, embedding in zip(entries, embeddings):
+                    # A concurrent sync may have applied part of this batch while we waited for the gate
+                    if entry["seq"] > self.applied_seq:
+                        self.apply(entry, embedding)
+                        applied += 1
+            if len(entries) < self.BATCH_SIZE:
+                return applied
+
+    def apply(self, entry: dict, embedding=None):
+        """Adds one logged title (with its precomputed embedding, if any) to this worker's state."""
+        title_obj = self._title_obj(entry)
+        TitleRepository.add_to_cache(title_obj)
+        self._index_title(title_obj, self._state_indexes(), embedding)
+
+        # New index generation: cached verification results from before this title are stale
+        self.state.index_generation = getattr(self.state, "index_generation", 0) + 1
+        self.applied_seq = entry["seq"]
+        metrics.CHANGE_LOG_APPLIED_SEQ.set(self.applied_seq)
+        if entry["created"] >= self.started:
+            self.last_lag = max(0.0, time.time() - entry["created"])
+            metrics.CHANGE_LOG_LAG_SECONDS.observe(self.last_lag)
+
+    def catch_up(self, until_seq: int) -> int:
+        """
+        Blocking: applies the entries up to `until_seq` straight to this follower's state, without
+        the executor gate. Used by process-mode verification workers, which own their indexes and
+        catch up between calls. Returns how many entries were applied.
+        """
+        applied = 0
+        while self.applied_seq < until_seq:
+            entries = self.change_log.read_since(self.applied_seq, self.BATCH_SIZE)
+            if not entries:
+                break
+            indexes = self._state_indexes()
+            for entry in entries:
+                if entry["seq"] > until_seq:
+                    return applied
+                self.apply(entry, self._encode(entry["title"], indexes))
+                applied += 1
+        return applied
+
+    def replay_into(self, generation: dict, titles: list, since_seq: int, until_seq: int = None) -> int:
+        """
+        Applies the entries after `since_seq` (up to `until_seq`) to an index generation that is not
+        serving yet (see IndexRebuilder), appending them to its `titles`. Blocking; returns the last
+        seq replayed. The worker's own state, cache and generation counter are left untouched.
+        """
+        last_seq = since_seq
+        while True:
+            entries = self.change_log.read_since(last_seq, self.BATCH_SIZE)
+            for entry in entries:
+                if until_seq is not None and entry["seq"] > until_seq:
+                    return last_seq
+                title_obj = self._title_obj(entry)
+                titles.append(title_obj)
+                self._index_title(title_obj, generation, self._encode(title_obj["title"], generation))
+                last_seq = entry["seq"]
+            if len(entries) < self.BATCH_SIZE:
+                return last_seq
+
+    def stats(self) -> dict:
+        return {
+            "pid": os.getpid(),
+            "applied_seq": self.applied_seq,
+            "index_generation": self.state.index_generation,
+            "last_lag_ms": round(self.last_lag * 1000, 1) if self.last_lag is not None else None,
+            "poll_seconds": self.poll_seconds,
+        }
+
+    @staticmethod
+    def _title_obj(entry: dict) -> dict:
+        return {
+            "id": entry["title_id"],
+            "title": entry["title"],
+            "normalized_title": entry["normalized_title"],
+            "canonical_title": entry["canonical_title"],
+        }
+
+    def _state_indexes(self) -> dict:
+        return {
+            name: getattr(self.state, name, None) for name in (*_INDEXES, "ann_index", "sbert_available", "orchestrator")
+        }
+
+    def _encode_entries(self, entries: list, indexes: dict) -> list:
+        return [self._encode(entry["title"], indexes) for entry in entries]
+
+    def _encode(self, title: str, indexes: dict):
+        """Embedding of a logged title for the FAISS index; None in lexical mode or on failure. Blocking."""
+        if not (indexes.get("sbert_available") and indexes.get("ann_index")):
+            return None
+        try:
+            return indexes["orchestrator"].semantic.encode(title)
+        except Exception as e:
+            self.logger.error(f"Embedding failed for a logged title: {e}")
+            return None
+
+    def _index_title(self, title_obj: dict, indexes: dict, embedding=None):
+        """Adds one title to `indexes` (app.state names, plus sbert_available and orchestrator)."""
+        self._add_embedding(title_obj, indexes, embedding)
+        for name in _INDEXES:
+            index = indexes.get(name)
+            if index:
+                index.add_title(title_obj)
+
+    def _add_embedding(self, title_obj: dict, indexes: dict, embedding):
+        # Inject into FAISS index (only if SBERT available)
+        ann_index = indexes.get("ann_index")
+        if embedding is None or not (indexes.get("sbert_available") and ann_index):
+            return
+        try:
+            title_obj["embedding"] = embedding.tolist()
+            ann_index.add(embedding, title_obj)
+            self.logger.info(f"FAISS index updated. New total: {ann_index.ntotal}")
+        except Exception as e:
+            self.logger.error(f"FAISS injection failed: {e}")
+
+    async def _follow(self):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await self.sync()
+            except Exception as e:
+                self.logger.error(f"Change log sync failed: {e}")
@@ -0,0 +1,85 @@
+import asyncio
+import contextlib
+import logging
+import time
+from app.monitoring import metrics
+
+# app.state indexes built on a segmented PostingsStore
+_INDEXES = ("token_index", "trigram_index", "phonetic_index")
+
+
+class IndexCompactor:
+    """
+    Background compaction of the segmented postings indexes: once an index's delta segment or
+    tombstones reach PostingsStore.COMPACT_THRESHOLD, its delta is frozen, merged with the base
+    (dropping tombstoned titles) in a worker thread, and the new base installed. Only the freeze
+    and the install hold verifications back (executor exclusive() gate, like change log applies);
+    lookups keep reading base + frozen + delta while the merge runs.
+    """
+    def __init__(self, state, poll_seconds: float = 5.0):
+        self.state = state
+        self.poll_seconds = poll_seconds
+        self.runs = 0
+        self.last_seconds = None
+        self.task = None
+        self.lock = asyncio.Lock()
+        self.logger = logging.getLogger("mesh")
+
+    def start(self):
+        self.task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.task
+            self.task = None
+
+    def targets(self) -> list:
+        """(name, index) pairs; a multi-field token index contributes each field."""
+        targets = []
+        for name in _INDEXES:
+            index = getattr(self.state, name, None)
+            if index is None:
+                continue
+            targets.append((name, index))
+            targets.extend((f"{name}.{field}", sub) for field, sub in getattr(index, "fields", {}).items())
+        return targets
+
+    async def compact(self, force: bool = False) -> int:
+        """Compacts every index due for it (every index with `force`); returns how many."""
+        compacted = 0
+        async with self.lock:
+            for name, index in self.targets():
+                if force or index.needs_compaction:
+                    await self._compact(name, index)
+                    compacted += 1
+        return compacted
+
+    def stats(self) -> dict:
+        return {
+            "runs": self.runs,
+            "last_ms": round(self.last_seconds * 1000, 1) if self.last_seconds is not None else None,
+            "poll_seconds": self.poll_seconds,
+        }
+
+    async def _compact(self, name: str, index):
+        start = time.perf_counter()
+        executor = getattr(self.state, "verification_executor", None)
+        async with executor.exclusive() if executor else contextlib.nullcontext():
+            frozen = index.freeze_segments()
+        built = await asyncio.to_thread(index.build_segments, frozen)
+        async with executor.exclusive() if executor else contextlib.nullcontext():
+            index.install_segments(built)
+        self.runs += 1
+        self.last_seconds = time.perf_counter() - start
+        metrics.INDEX_COMPACTION_SECONDS.labels(name).observe(self.last_seconds)
+        self.logger.info(f"Compacted {name} in {self.last_seconds * 1000:.1f} ms.")
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await self.compact()
+            except Exception as e:
+                self.logger.error(f"Index compaction failed: {e}")
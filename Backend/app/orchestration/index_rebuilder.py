@@ -0,0 +1,137 @@
+import asyncio
+import contextlib
+import gc
+import logging
+import time
+from app.monitoring import metrics
+from app.persistence.title_repository import TitleRepository
+
+
+class IndexRebuilder:
+    """
+    Zero-downtime rebuild of every in-memory index from the dataset on disk (admin API).
+    A new index generation is built off to the side in a worker thread while verifications keep
+    reading the serving one; titles in the change log are replayed into it (the bulk outside the
+    gate, the tail under it) and the generation is swapped in atomically under the executor's
+    exclusive() gate, bumping the index generation. The old generation is then released.
+    Requests are logged as a rebuild epoch in the shared change log, so every worker rebuilds.
+    """
+    def __init__(self, state, build, change_log, poll_seconds: float = 0.5):
+        self.state = state
+        self.build = build            # (titles, progress) -> generation dict keyed by app.state name
+        self.change_log = change_log
+        self.poll_seconds = poll_seconds
+        self.epoch = 0                # Last rebuild epoch handled by this worker
+        self.status = "idle"          # idle | running | failed
+        self.step = None
+        self.progress = 0.0
+        self.runs = 0
+        self.last_seconds = None
+        self.last_error = None
+        self.wakeup = asyncio.Event()
+        self.lock = asyncio.Lock()
+        self.task = None
+        self.logger = logging.getLogger("mesh")
+
+    async def start(self):
+        """Follows the rebuild epoch from its current value (startup already built the indexes)."""
+        self.epoch = await asyncio.to_thread(self.change_log.rebuild_epoch)
+        self.task = asyncio.create_task(self._watch())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self.task
+            self.task = None
+
+    async def request(self) -> int:
+        """Logs a rebuild request for every worker and wakes this one up; returns the new epoch."""
+        epoch = await asyncio.to_thread(self.change_log.request_rebuild)
+        self.wakeup.set()
+        return epoch
+
+    async def rebuild(self) -> bool:
+        """Builds, catches up and swaps in a new index generation; False if the rebuild failed."""
+        async with self.lock:
+            start = time.perf_counter()
+            self.status, self.last_error = "running", None
+            self._set_progress("read_titles", 0.0)
+            try:
+                titles = await asyncio.to_thread(TitleRepository().read_titles)
+                if not titles:
+                    raise RuntimeError("dataset is empty")
+                generation = await asyncio.to_thread(self.build, titles, self._build_progress)
+
+                # Titles submitted since the dataset was written: bulk first, then the tail with the gate held
+                self._set_progress("replay_change_log", 0.9)
+                follower = self.state.change_log_follower
+                seq = await asyncio.to_thread(follower.replay_into, generation, titles, 0)
+                executor = getattr(self.state, "verification_executor", None)
+                async with executor.exclusive() if executor else contextlib.nullcontext():
+                    seq = await asyncio.to_thread(follower.replay_into, generation, titles, seq)
+                    self._swap(generation, titles, seq)
+                generation = None
+            except Exception as e:
+                self.status, self.last_error = "failed", str(e)
+                metrics.INDEX_REBUILDS_TOTAL.labels("failed").inc()
+                self.logger.error(f"Index rebuild failed at {self.step}: {e}")
+                return False
+
+            # Drop the previous generation's last references off the event loop
+            await asyncio.to_thread(gc.collect)
+            self.runs += 1
+            self.last_seconds = time.perf_counter() - start
+            self.status = "idle"
+            self._set_progress("done", 1.0)
+            metrics.INDEX_REBUILD_SECONDS.observe(self.last_seconds)
+            metrics.INDEX_REBUILDS_TOTAL.labels("success").inc()
+            self.logger.info(
+                f"Index rebuild swapped in {len(titles)} titles in {self.last_seconds:.2f}s "
+                f"(generation {self.state.index_generation})."
+            )
+            return True
+
+    def stats(self) -> dict:
+        return {
+            "status": self.status,
+            "step": self.step,
+            "progress": round(self.progress, 3),
+            "epoch": self.epoch,
+            "runs": self.runs,
+            "last_ms": round(self.last_seconds * 1000, 1) if self.last_seconds is not None else None,
+            "last_error": self.last_error,
+        }
+
+    def _swap(self, generation: dict, titles: list, seq: int):
+        # Runs under the exclusive() gate: no verification sees a mix of generations
+        for name, value in generation.items():
+            setattr(self.state, name, value)
+        TitleRepository.set_cache(titles)
+        follower = self.state.change_log_follower
+        follower.base_id = TitleRepository.max_title_id(titles)
+        follower.applied_seq = max(follower.applied_seq, seq)
+        metrics.CHANGE_LOG_APPLIED_SEQ.set(follower.applied_seq)
+        # New index generation: every cached result is stale and process workers reload
+        self.state.index_generation = getattr(self.state, "index_generation", 0) + 1
+        self.state.index_epoch = getattr(self.state, "index_epoch", 0) + 1
+
+    def _build_progress(self, step: str, done: int, total: int):
+        self._set_progress(step, 0.9 * done / total)
+
+    def _set_progress(self, step: str, progress: float):
+        self.step, self.progress = step, progress
+        metrics.INDEX_REBUILD_PROGRESS.set(progress)
+
+    async def _watch(self):
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self.wakeup.wait(), self.poll_seconds)
+            self.wakeup.clear()
+            try:
+                epoch = await asyncio.to_thread(self.change_log.rebuild_epoch)
+                if epoch > self.epoch:
+                    self.epoch = epoch
+                    await self.rebuild()
+            except Exception as e:
+                self.logger.error(f"Index rebuild watch failed: {e}")
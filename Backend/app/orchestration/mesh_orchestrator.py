@@ -1,10 +1,12 @@
+import asyncio
 import logging
-import unicodedata
 import time
+import numpy as np
 from app.preprocessing.normalization_pipeline import NormalizationPipeline
 from app.compliance.compliance_engine import ComplianceEngine
 from app.intelligence.semantic_similarity_engine import SemanticSimilarityEngine
 from app.intelligence.lexical_similarity_engine import LexicalSimilarityEngine
+from app.intelligence.batch_similarity_engine import BatchSimilarityEngine
 from app.intelligence.phonetic_similarity_engine import PhoneticSimilarityEngine
 from app.orchestration.decision_engine import DecisionEngine
 from app.orchestration.probability_model import ProbabilityModel
@@ -15,26 +17,69 @@ from app.preprocessing.structural_pattern_detector import StructuralPatternDetec
 from app.compliance.title_quality_validator import TitleQualityValidator
 from app.interpretability.bionic_conflict_highlighter import BionicConflictHighlighter
 from app.monitoring.audit_logger import AuditLogger
+from app.monitoring import metrics
 from app.configuration.scoring_weights import SCORING_WEIGHTS
+from app.configuration.system_config import settings
 from app.api.request_models import ComplianceResult, ConflictDetail, AnalysisDetail, SuggestionDetail
 from app.intelligence.suggestion_engine import SuggestionEngine
 from app.persistence.title_repository import TitleRepository
 from app.preprocessing.transliteration_normalizer import TransliterationNormalizer
-from metaphone import doublemetaphone
+from app.retrieval.canonical_title_index import CanonicalTitleIndex
+from app.retrieval.multi_field_token_index import MultiFieldTokenIndex, field_tokens
+from app.retrieval.rank_fusion import ReciprocalRankFusion
+from app.retrieval.title_feature_store import TitleFeatureStore
+
+class VerificationContext:
+    """
+    Per-call shared state: one catalogue snapshot and a token postings memo reused across titles,
+    plus per-call options (`highlight=False` skips Bionic highlighting of conflicts;
+    `latency_budget_ms` is the per-title deadline for candidate scoring, 0 for none;
+    `origin` labels the exported metrics, "suggestion" for suggestion re-scoring).
+    `ann_candidates` holds ANN hits prefetched for a whole batch (title -> candidates).
+    """
+    __slots__ = ("existing_titles", "token_cache", "highlight", "latency_budget_ms", "origin", "ann_candidates")
+
+    def __init__(self, existing_titles: list, highlight: bool = True, latency_budget_ms: float = 0.0,
+                 origin: str = "request"):
+        self.existing_titles = existing_titles
+        self.token_cache = {}
+        self.highlight = highlight
+        self.latency_budget_ms = latency_budget_ms
+        self.origin = origin
+        self.ann_candidates = {}
+
 
 class MeshOrchestrator:
-    def __init__(self, ann_index=None, token_index=None, sbert_available=False):
+    """
+    Verification pipeline coordinator.
+    Built once per process at startup (app.state.orchestrator) and shared by all requests:
+    engines are configured in __init__ and never mutated afterwards, and verify() keeps
+    all per-request state in locals, so concurrent calls are safe.
+    """
+    def __init__(self, ann_index=None, token_index=None, sbert_available=False, canonical_index=None,
+                 phrase_matcher=None, feature_store=None, result_cache=None, trigram_index=None,
+                 phonetic_index=None, fuzzy_expander=None):
         self.normalizer = NormalizationPipeline()
         self.transliteration_normalizer = TransliterationNormalizer()
-        self.compliance = ComplianceEngine()
+        self.compliance = ComplianceEngine(combination_matcher=phrase_matcher)
         self.semantic = SemanticSimilarityEngine()
         self.lexical = LexicalSimilarityEngine()
         self.phonetic = PhoneticSimilarityEngine()
+        self.batch_scorer = BatchSimilarityEngine()
+        self.fusion = ReciprocalRankFusion(settings.RRF_K)
         self.repo = TitleRepository()
         
         # Shared in-memory indexes (injected from main.py)
         self.ann_index = ann_index
         self.token_index = token_index
+        self.canonical_index = canonical_index
+        self.trigram_index = trigram_index
+        self.phonetic_index = phonetic_index
+        self.fuzzy_expander = fuzzy_expander
+        self.phrase_matcher = phrase_matcher
+        # Without an injected store, candidate features are derived on the fly
+        self.feature_store = feature_store if feature_store is not None else TitleFeatureStore()
+        self.result_cache = result_cache
         self.sbert_available = sbert_available
         
         # Intelligence & Governance
@@ -50,11 +95,120 @@ class MeshOrchestrator:
         self.suggestion_engine = SuggestionEngine()
         self.logger = logging.getLogger("mesh")
 
-    async def verify(self, title: str, _skip_suggestions: bool = False) -> ComplianceResult:
+    async def verify(self, title: str, _skip_suggestions: bool = False, latency_budget_ms: float = None) -> ComplianceResult:
+        context = await self.create_context(latency_budget_ms=latency_budget_ms)
+        return await self._verify(title, _skip_suggestions, context)
+
+    async def verify_batch(self, titles: list, _skip_suggestions: bool = True, return_exceptions: bool = False,
+                           context: "VerificationContext" = None) -> list:
+        """
+        Verifies several titles against one shared context: the catalogue is fetched once and
+        per-token postings are looked up once across all titles (pass `context` to share it across
+        several batches). Titles are verified one after another on the calling thread (scoring is
+        CPU-bound); parallelism comes from VerificationExecutor running several batches at once.
+        Results keep input order; with return_exceptions=True a failing title yields its exception
+        instead of aborting the batch.
+        """
+        if context is None:
+            context = await self.create_context()
+        await self._prefetch_ann_candidates(titles, context)
+        results = []
+        for title in titles:
+            try:
+                results.append(await self._verify(title, _skip_suggestions, context))
+            except Exception as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def _canonical_match(self, input_canon: str, existing_titles: list):
+        """Earliest title clashing with the canonical form (exact or long containment), else None."""
+        if self.canonical_index is not None:
+            return self.canonical_index.find_match(input_canon)
+        # No injected index: linear scan of the catalogue, same rules as the index
+        min_len = CanonicalTitleIndex.MIN_CONTAINMENT_LEN
+        for cand_dict in existing_titles:
+            if len(cand_dict.get("title", "")) < 2:
+                continue
+            cand_canon = cand_dict.get("canonical_title", "")
+            if (input_canon == cand_canon or
+                    (len(cand_canon) > min_len and cand_canon in input_canon) or
+                    (len(input_canon) > min_len and input_canon in cand_canon)):
+                return cand_dict
+        return None
+
+    @property
+    def semantic_retrieval(self) -> bool:
+        return bool(self.sbert_available and self.ann_index is not None and self.ann_index.ntotal)
+
+    async def _prefetch_ann_candidates(self, titles: list, context: "VerificationContext"):
+        # One encoder batch and one FAISS search for every title of the batch
+        pending = [t for t in dict.fromkeys(titles) if t not in context.ann_candidates]
+        if not self.semantic_retrieval or len(pending) < 2:
+            return
+        embeddings = self.semantic.encode_batch(pending)
+        if embeddings is None:
+            return
+        hits = await self.ann_index.get_top_candidates(embeddings, settings.ANN_CANDIDATE_K)
+        context.ann_candidates.update(zip(pending, hits))
+
+    async def _ann_channel(self, title: str, context: "VerificationContext") -> list:
+        hits = context.ann_candidates.get(title)
+        if hits is None:
+            # The encoder forward pass releases the GIL; started as a task, it overlaps the lexical channels
+            embedding = await asyncio.to_thread(self.semantic.encode, title)
+            hits = await self.ann_index.get_top_candidates(embedding, settings.ANN_CANDIDATE_K) if embedding is not None else []
+        return hits
+
+    async def create_context(self, highlight: bool = True, latency_budget_ms: float = None,
+                             origin: str = "request") -> "VerificationContext":
+        if latency_budget_ms is None:
+            latency_budget_ms = settings.VERIFY_LATENCY_BUDGET_MS
+        return VerificationContext(
+            existing_titles=await self.repo.get_all_titles(),
+            highlight=highlight,
+            latency_budget_ms=latency_budget_ms,
+            origin=origin
+        )
+
+    async def _verify(self, title: str, _skip_suggestions: bool, context: "VerificationContext") -> ComplianceResult:
+        timer = metrics.StageTimer()
+
+        # Result cache (keyed on title, index generation and per-call options)
+        cache_key = None
+        if self.result_cache is not None and self.result_cache.enabled:
+            cache_key = self.result_cache.make_key(title, _skip_suggestions, context.highlight)
+            cached = self.result_cache.get(cache_key)
+            if cached is not None:
+                timer.lap("cache")
+                self.audit_logger.log_verification(title, cached.model_dump())
+                metrics.record_verification(cached, timer, context.origin, cached=True)
+                return self._with_stage_timings(cached, timer)
+        timer.lap("cache")
+
+        result = await self._run_pipeline(title, _skip_suggestions, context, timer)
+        metrics.record_verification(result, timer, context.origin, cached=False)
+        # Deadline-truncated results depend on load, so they are not cached
+        if cache_key is not None and not result.metadata.get("partial"):
+            self.result_cache.put(cache_key, result)
+        return self._with_stage_timings(result, timer)
+
+    @staticmethod
+    def _with_stage_timings(result: ComplianceResult, timer: "metrics.StageTimer") -> ComplianceResult:
+        # Debug timings belong to this call only: attached to a copy, never to the cached result
+        if not settings.DEBUG:
+            return result
+        return result.model_copy(update={"metadata": {**result.metadata, "stage_timings_ms": timer.as_ms()}})
+
+    async def _run_pipeline(self, title: str, _skip_suggestions: bool, context: "VerificationContext",
+                            timer: "metrics.StageTimer") -> ComplianceResult:
         start_time = time.time()
+        deadline = time.monotonic() + context.latency_budget_ms / 1000.0 if context.latency_budget_ms > 0 else None
         
         # 1. Linguistic Quality Check (Gibberish/Numeric Detection)
         is_low_quality, quality_violations, q_risk = self.quality_validator.validate(title)
+        timer.lap("quality_gate")
         if is_low_quality:
             elapsed_ms = int((time.time() - start_time) * 1000)
             analysis_detail = AnalysisDetail(
@@ -87,85 +241,121 @@ class MeshOrchestrator:
         # 2. Normalize
         normalized_query = self.normalizer.normalize(title)
         
-        # 2. Fetch existing titles for combination detection
-        existing_titles = await self.repo.get_all_titles()
+        # 2. Existing titles for combination detection (fetched once per context)
+        existing_titles = context.existing_titles
         
         # 2.5. Canonical Concatenation / Containment Check (Pre-Token Index Override)
+        # Exact canonical hits come from a dict; length-aware (> 12 chars) containment in either
+        # direction comes from the automaton / suffix array, so no catalogue scan is needed.
         input_canon = self.normalizer.canonical_form(title)
-        for cand_dict in existing_titles:
+        cand_dict = self._canonical_match(input_canon, existing_titles)
+        timer.lap("canonical_check")
+        if cand_dict is not None:
             cand_title = cand_dict.get("title", "")
+            elapsed_ms = int((time.time() - start_time) * 1000)
             
-            # Avoid processing empty or minimal length titles
-            if len(cand_title) < 2:
-                continue
-                
-            cand_canon = cand_dict.get("canonical_title", "")
+            analysis_detail = AnalysisDetail(
+                lexical_similarity=100,
+                phonetic_similarity=100,
+                semantic_similarity=100,
+                disallowed_word=False,
+                periodicity_violation=False,
+                combination_violation=True,
+                prefix_suffix_violation=False
+            )
             
-            # Length-aware substring and exact match check to prevent small substring noise
-            if (input_canon == cand_canon or 
-                (len(cand_canon) > 12 and cand_canon in input_canon) or 
-                (len(input_canon) > 12 and input_canon in cand_canon)):
-                
-                elapsed_ms = int((time.time() - start_time) * 1000)
-                
-                analysis_detail = AnalysisDetail(
-                    lexical_similarity=100,
-                    phonetic_similarity=100,
-                    semantic_similarity=100,
-                    disallowed_word=False,
-                    periodicity_violation=False,
-                    combination_violation=True,
-                    prefix_suffix_violation=False
-                )
-                
-                self.logger.info(f"Concatenation clash. '{title}' bypassed spacing but matched '{cand_title}'.")
-                
-                return ComplianceResult(
-                    is_compliant=False,
-                    verification_probability=0.0,
-                    decision="Reject",
-                    explanation=f"Concatenation duplicate detected. Space-agnostic string completely overlaps with existing title '{cand_title}'.",
-                    conflicts=[ConflictDetail(
-                        title=cand_title,
-                        conflict_type="Lexical",
-                        similarity_score=1.0,
-                        highlighted_text=f'<span class="bionic-wrapper">{title}</span>'
-                    )],
-                    scores={
-                        "semantic_similarity": 1.0,
-                        "lexical_similarity": 1.0,
-                        "phonetic_similarity": 1.0
-                    },
-                    analysis=analysis_detail,
-                    metadata={
-                        "risk_tier": "Critical",
-                        "dominant_signal": "Space Bypass / Concatenation",
-                        "confidence_score": 1.0,
-                        "structural_patterns": [],
-                        "processing_time_ms": elapsed_ms,
-                        "candidates_checked": len(existing_titles),
-                        "best_match": cand_title
-                    }
-                )
+            self.logger.info(f"Concatenation clash. '{title}' bypassed spacing but matched '{cand_title}'.")
+            
+            return ComplianceResult(
+                is_compliant=False,
+                verification_probability=0.0,
+                decision="Reject",
+                explanation=f"Concatenation duplicate detected. Space-agnostic string completely overlaps with existing title '{cand_title}'.",
+                conflicts=[ConflictDetail(
+                    title=cand_title,
+                    conflict_type="Lexical",
+                    similarity_score=1.0,
+                    highlighted_text=f'<span class="bionic-wrapper">{title}</span>'
+                )],
+                scores={
+                    "semantic_similarity": 1.0,
+                    "lexical_similarity": 1.0,
+                    "phonetic_similarity": 1.0
+                },
+                analysis=analysis_detail,
+                metadata={
+                    "risk_tier": "Critical",
+                    "dominant_signal": "Space Bypass / Concatenation",
+                    "confidence_score": 1.0,
+                    "structural_patterns": [],
+                    "processing_time_ms": elapsed_ms,
+                    "candidates_checked": len(existing_titles),
+                    "best_match": cand_title
+                }
+            )
         
         # 3. Compliance check (Deterministic + Combination)
         compliance_res = await self.compliance.check_compliance(title, existing_titles)
+        timer.lap("compliance")
         
         # 4. Pattern Detection
         patterns = self.pattern_detector.detect_patterns(title)
+        timer.lap("patterns")
         
         # 5. Robust Candidate Retrieval via Token Index (Instant)
-        candidates = []
-        if self.token_index:
-            query_tokens = normalized_query.split()
-            
-            # Tier 0.5: Transliteration Normalization
-            # We search the index using BOTH original tokens and flattened transliterations to guarantee candidate hit
+        query_tokens = normalized_query.split()
+        
+        # Tier 0.5: Transliteration Normalization
+        # A multi-field index holds the flattened / romanized title forms in their own fields, so each
+        # query form is looked up once in its field. A plain token index gets BOTH original tokens and
+        # flattened transliterations in a single lookup to guarantee candidate hit.
+        multi_field = isinstance(self.token_index, MultiFieldTokenIndex)
+        if multi_field:
+            flat_tokens, roman_tokens = field_tokens(title)
+            all_search_tokens = list(set(query_tokens + flat_tokens))
+            raw_search_tokens = query_tokens
+        else:
             transliterated_query = self.transliteration_normalizer.normalize(normalized_query)
-            all_search_tokens = list(set(query_tokens + transliterated_query.split()))
-            
-            candidates = await self.token_index.filter_by_tokens(all_search_tokens)
-            self.logger.info(f"Token Index retrieved {len(candidates)} candidates.")
+            all_search_tokens = raw_search_tokens = list(set(query_tokens + transliterated_query.split()))
+        
+        # Tier 0.6: Fuzzy expansion. Query tokens missing from the catalogue vocabulary (typos) also look
+        # up their nearest vocabulary tokens, so a misspelt rare token still reaches its titles
+        if self.fuzzy_expander and settings.FUZZY_MAX_EDITS > 0:
+            corrections = self.fuzzy_expander.expand(query_tokens)
+            if corrections:
+                raw_search_tokens = list(dict.fromkeys(raw_search_tokens + corrections))
+                self.logger.info(f"Fuzzy expansion added tokens {corrections}.")
+        
+        # 5.1. Retrieval channels, merged by reciprocal-rank fusion: the token IDF ranking, the flattened
+        # and romanized token fields, character trigrams over canonical forms (typos, glued / split
+        # words), per-token phonetic codes (sound-alike spellings) and, in semantic mode, nearest titles
+        # in embedding space. Each channel has its own cap; only the top FUSED_CANDIDATE_BUDGET fused
+        # titles are scored. The lexical lookups are CPU-bound and run in turn on this thread; the ANN
+        # channel is started first so its query encoding (worker thread) runs while they do, and is
+        # awaited last.
+        ann_channel = asyncio.ensure_future(self._ann_channel(title, context)) if self.semantic_retrieval else None
+        channels = []
+        if self.token_index:
+            # Only the top SCORING_CANDIDATE_CAP matches are materialised; the rest are counted
+            channels.append(("token", await self.token_index.top_candidates(
+                raw_search_tokens, settings.SCORING_CANDIDATE_CAP, token_cache=context.token_cache
+            )))
+        if multi_field:
+            # The flat field stands in for the flattened tokens the raw lookup used to carry, so it shares its cap
+            channels.append(("transliterated", await self.token_index.field_candidates("flat", flat_tokens, settings.SCORING_CANDIDATE_CAP)))
+            channels.append(("romanized", await self.token_index.field_candidates("roman", roman_tokens, settings.ROMANIZED_CANDIDATE_K)))
+        if self.trigram_index:
+            channels.append(("trigram", self.trigram_index.top_candidates(input_canon, settings.TRIGRAM_CANDIDATE_K)))
+        if self.phonetic_index:
+            channels.append(("phonetic", self.phonetic_index.top_candidates(all_search_tokens, settings.PHONETIC_CANDIDATE_K)))
+        if ann_channel is not None:
+            channels.append(("semantic", await ann_channel))
+        candidates, channel_stats, candidates_retrieved = self.fusion.retrieve(channels, settings.FUSED_CANDIDATE_BUDGET)
+        self.logger.info(
+            f"Retrieved {candidates_retrieved} distinct candidates, {len(candidates)} kept after fusion: "
+            + ", ".join(f"{name} {stats['hits']}" for name, stats in channel_stats.items())
+        )
+        timer.lap("retrieval")
         
         # If no lexical candidates, return clean accept (or rejection if compliance failed)
         if not candidates:
@@ -191,9 +381,6 @@ class MeshOrchestrator:
             )
         
         # 6. Deep Comparison on Candidates (Hybrid Intelligence)
-        from rapidfuzz import fuzz
-        from app.intelligence.concept_clusters import calculate_concept_similarity
-        
         best_match = None
         best_similarity = 0.0
         all_conflicts = []
@@ -205,96 +392,88 @@ class MeshOrchestrator:
         w_pho = 0.3 if words_count > 3 else 0.5
         w_sem = 0.1 # Base semantic weight for cluster/MiniLM
         
-        # Score candidates
-        query_norm = self.transliteration_normalizer.normalize(title)
-        query_canonical = self.normalizer.canonical_form(title)
+        # Score candidates in retrieval-score order, block by block (query-side features derived once;
+        # candidate features come from the store). The first block is always scored; later blocks only
+        # while the measured scoring rate says they fit before the deadline.
+        query_features = self.feature_store.extract(title)
+        budget = len(candidates)  # Already capped by the fusion budget
+        block_size = max(1, settings.SCORING_BLOCK_SIZE)
+        cand_features = []
+        blocks = []
+        scoring_start = time.monotonic()
+        while len(cand_features) < budget:
+            if cand_features and deadline is not None:
+                per_candidate = (time.monotonic() - scoring_start) / len(cand_features)
+                if time.monotonic() + per_candidate * min(block_size, budget - len(cand_features)) > deadline:
+                    break
+            block_features = [self.feature_store.get(c) for c in candidates[len(cand_features):len(cand_features) + block_size]]
+            # Bound-based pruning skips candidates that cannot become the best match or a top conflict
+            known_finals = np.concatenate([b["final"][b["resolved"]] for b in blocks]) if blocks else None
+            blocks.append(self.batch_scorer.score(query_features, block_features, words_count, known_finals=known_finals))
+            cand_features.extend(block_features)
         
-        for candidate in candidates[:50]:
-            candidate_title = candidate.get("title", "")
-            
-            # Apply NFKC Unicode Normalization to protect against invisible characters
-            query_lower = unicodedata.normalize('NFKC', title).strip().lower()
-            cand_lower = unicodedata.normalize('NFKC', candidate_title).strip().lower()
-            cand_norm = self.transliteration_normalizer.normalize(candidate_title)
-            cand_canonical = self.normalizer.canonical_form(candidate_title)
-            
-            # Semantic (Concept Clusters)
-            sem_sim = calculate_concept_similarity(query_norm, cand_norm)
-            
-            # Lexical (Fuzzy Token Set) - Take max of original vs transliterated vs space-stripped
-            lex_orig = fuzz.token_set_ratio(query_lower, cand_lower) / 100.0
-            lex_norm = fuzz.token_set_ratio(query_norm, cand_norm) / 100.0
-            lex_canon = fuzz.token_set_ratio(query_canonical, cand_canonical) / 100.0
-            
-            # Sub-character 3-gram Match (against space-agnostic concatenation attacks)
-            ngram_sim = await self.lexical.calculate_ngram_similarity(title, candidate_title, n=3)
-            
-            lex_sim = max(lex_orig, lex_norm, lex_canon, ngram_sim)
-            
-            # Phonetic (Double Metaphone) - Take max of original vs transliterated
-            pho_orig = await self.phonetic.calculate_similarity(query_lower, cand_lower)
-            pho_norm = await self.phonetic.calculate_similarity(query_norm, cand_norm)
-            pho_sim = max(pho_orig, pho_norm)
-            
-            # -------------------------------------------------------------
-            # Multi-Signal Similarity Model (Max-Dominant Hybrid)
-            # -------------------------------------------------------------
-            # 1. Deterministic Dominant Core
-            sim_dominant = max(lex_sim, pho_sim)
-            
-            # 2. Semantic Dampening (Semantic only assists, doesn't weaken near-duplicates)
-            if sim_dominant < 0.95:
-                sim_final = 0.7 * sim_dominant + 0.3 * sem_sim
-            else:
-                sim_final = sim_dominant
-                
-            # 3. Containment Boost (controlled — 0.10 not 0.15)
-            # If the strings are functionally contained within each other, boost the similarity
-            # (Note: exact duplicates & canonical bypasses are already caught & rejected earlier)
-            containment_flag = 1 if (cand_lower in query_lower or query_lower in cand_lower) else 0
-            sim_boosted = min(1.0, sim_final + (0.10 * containment_flag))
-            
-            # 4. Adaptive Threshold by Title Length (gentle 1.03x, not 1.05x)
-            # Short titles represent a mathematically higher absolute risk of violation
-            if words_count <= 2:
-                sim_boosted = min(1.0, sim_boosted * 1.03)
-                
-            final_sim = sim_boosted
+        scored_candidates = candidates[:len(cand_features)]
+        partial = len(scored_candidates) < budget
+        block = {key: np.concatenate([b[key] for b in blocks]) for key in blocks[0] if key != "pruned"}
+        final_sims = block["final"]
+        candidates_pruned = {stage: sum(b["pruned"][stage] for b in blocks) for stage in blocks[0]["pruned"]}
+        # Distinct titles the channels returned but the fusion budget cut; matches beyond a channel's
+        # own cap were never returned (see candidates_matched / retrieval_channels[...]["matched"])
+        candidates_pruned["cap"] = candidates_retrieved - budget
+        
+        # Best match: first candidate reaching the highest score (strictly above 0)
+        best_idx = int(np.argmax(final_sims))
+        if final_sims[best_idx] > best_similarity:
+            best_similarity = float(final_sims[best_idx])
+            best_match = scored_candidates[best_idx].get("title", "")
+            pho_best = block["phonetic"][best_idx]
+            if not block["phonetic_exact"][best_idx]:
+                pho_best = self.batch_scorer.phonetic_similarity(query_features, cand_features[best_idx])
+            best_scores = {
+                "semantic_similarity": float(block["semantic"][best_idx]),
+                "lexical_similarity": float(block["lexical"][best_idx]),
+                "phonetic_similarity": float(pho_best)
+            }
             
             # Debug logging: intermediate scores for diagnosing binary output
             self.logger.debug(
-                f"SCORE '{title}' vs '{candidate_title}': "
-                f"L={lex_sim:.4f} Ph={pho_sim:.4f} Sem={sem_sim:.4f} "
-                f"dominant={sim_dominant:.4f} final={sim_final:.4f} "
-                f"contain={containment_flag} boosted={sim_boosted:.4f} → {final_sim:.4f}"
+                f"SCORE '{title}' vs '{best_match}': "
+                f"L={best_scores['lexical_similarity']:.4f} Ph={best_scores['phonetic_similarity']:.4f} "
+                f"Sem={best_scores['semantic_similarity']:.4f} contain={int(block['containment'][best_idx])} "
+                f"→ {best_similarity:.4f} (scored {len(scored_candidates)})"
             )
-            
-            scores = {
-                "semantic_similarity": sem_sim,
-                "lexical_similarity": lex_sim,
-                "phonetic_similarity": pho_sim
-            }
-            
-            # Track conflicts for Bionic Highlighter (Red/Orange/Yellow)
-            if final_sim > 0.60:
+        
+        timer.lap("scoring")
+        
+        # Track conflicts for Bionic Highlighter (Red/Orange/Yellow): only the top 5 are reported,
+        # so only those are highlighted (ties keep retrieval order). Only exactly scored candidates
+        # count: a pruned candidate's final entry is a bound, not a score.
+        conflict_idx = [int(i) for i in np.flatnonzero(block["resolved"] & (final_sims > 0.60))]
+        conflict_idx.sort(key=lambda i: -round(float(final_sims[i]), 4))
+        query_highlight_codes = self.highlighter.word_codes(title) if conflict_idx and context.highlight else None
+        for i in conflict_idx[:5]:
+            cand = cand_features[i]
+            if context.highlight:
                 conflict_data = {
-                    "tokens": list(set(title.lower().split()) & set(candidate_title.lower().split())),
+                    "tokens": list(query_features.tokens & cand.tokens),
                     "rules": compliance_res.get("violations_terms", []),
-                    "phonetic": [doublemetaphone(w)[0] for w in candidate_title.split()]
+                    "phonetic": list(cand.word_codes)
                 }
-                highlighted = self.highlighter.highlight(title, conflict_data)
-                
-                all_conflicts.append(ConflictDetail(
-                    title=candidate_title,
-                    conflict_type="Lexical" if lex_sim > pho_sim else "Phonetic",
-                    similarity_score=round(final_sim, 4),
-                    highlighted_text=highlighted
-                ))
+                highlighted = self.highlighter.highlight(title, conflict_data, word_codes=query_highlight_codes)
+            else:
+                highlighted = f'<span class="bionic-wrapper">{title}</span>'
+
             
-            if final_sim > best_similarity:
-                best_similarity = final_sim
-                best_match = candidate_title
-                best_scores = scores
+            # Unresolved phonetic entries among the top conflicts hold a bound strictly below lexical, so the comparison stays exact
+            lex_sim, pho_sim = block["lexical"][i], block["phonetic"][i]
+            all_conflicts.append(ConflictDetail(
+                title=scored_candidates[i].get("title", ""),
+                conflict_type="Lexical" if lex_sim > pho_sim else "Phonetic",
+                similarity_score=round(float(final_sims[i]), 4),
+                highlighted_text=highlighted
+            ))
+        
+        timer.lap("highlighting")
         
         # 7. Compliance override (soft — preserves some gradation)
         if not compliance_res["is_compliant"] and compliance_res["penalty_score"] >= 1.0:
@@ -343,6 +522,8 @@ class MeshOrchestrator:
             prefix_suffix_violation="prefix" in explanation.lower() or "suffix" in explanation.lower()
         )
 
+        timer.lap("decision")
+
         # 9.5. Suggestion Engine (only on Reject/Review, skip during re-scoring)
         suggestions_list = None
         if not _skip_suggestions and decision_meta["decision"] in ("Reject", "Review"):
@@ -350,7 +531,7 @@ class MeshOrchestrator:
                 self.logger.info(f"Generating suggestions for rejected title: '{title}'")
                 
                 # Analyze what caused the conflict
-                conflict_dicts = [c.dict() for c in all_conflicts[:5]]
+                conflict_dicts = [c.model_dump() for c in all_conflicts[:5]]
                 analysis = self.suggestion_engine.analyze_conflicts(
                     title=title,
                     conflicts=conflict_dicts,
@@ -364,17 +545,20 @@ class MeshOrchestrator:
                     title.split(), analysis
                 )
                 self.logger.info(f"Token risks: {token_risks}")
+                timer.lap("suggestion_analysis")
                 
                 # Generate candidates
                 raw_candidates = self.suggestion_engine.generate_candidates(
                     title, analysis, token_risks
                 )
                 self.logger.info(f"Generated {len(raw_candidates)} raw suggestion candidates")
+                timer.lap("suggestion_generation")
                 
                 # Re-score through the full pipeline (with _skip_suggestions=True)
                 scored = await self.suggestion_engine.rescore_and_filter(
                     raw_candidates, self, min_probability=10.0, max_results=5
                 )
+                timer.lap("suggestion_rescoring")
                 
                 if scored:
                     suggestions_list = [
@@ -410,12 +594,18 @@ class MeshOrchestrator:
                 "confidence_score": round(confidence, 4),
                 "structural_patterns": patterns,
                 "processing_time_ms": elapsed_ms,
-                "candidates_checked": len(candidates),
+                "candidates_checked": candidates_retrieved,
+                "candidates_matched": channel_stats.get("token", {}).get("matched", candidates_retrieved),
+                "candidates_examined": len(scored_candidates),
+                "candidates_pruned": candidates_pruned,
+                "retrieval_channels": channel_stats,
+                "partial": partial,
                 "best_match": best_match
             }
         )
         
         # 10. Audit
-        self.audit_logger.log_verification(title, result.dict())
+        self.audit_logger.log_verification(title, result.model_dump())
+        timer.lap("finalize")
         
         return result
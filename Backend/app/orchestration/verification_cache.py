@@ -0,0 +1,81 @@
+import threading
+import time
+from collections import OrderedDict
+
+class VerificationCache:
+    """
+    In-process LRU/TTL cache of ComplianceResult objects.
+    Keys embed the current index generation (read through `generation`), so every submit or rule
+    change makes older entries unreachable; they age out through normal LRU eviction.
+    Bounded by entry count and by the approximate serialized size of the cached results.
+    Cached results are shared between callers and must be treated as read-only.
+    """
+    def __init__(self, generation, max_entries: int = 10000, max_bytes: int = 64 * 1024 * 1024,
+                 ttl_seconds: float = 600.0):
+        self.generation = generation      # Callable returning the current index generation
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.entries = OrderedDict()      # key -> (expires_at, size_bytes, result)
+        self.size_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def make_key(self, title: str, *options) -> tuple:
+        return (self.generation(), title) + options
+
+    def get(self, key: tuple):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] < time.monotonic():
+                self._remove(key)
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key: tuple, result):
+        if not self.enabled:
+            return
+        size = len(result.model_dump_json())
+        if size > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self._remove(key)
+            self.entries[key] = (time.monotonic() + self.ttl_seconds, size, result)
+            self.size_bytes += size
+            while len(self.entries) > self.max_entries or self.size_bytes > self.max_bytes:
+                self._remove(next(iter(self.entries)))
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.size_bytes = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "entries": len(self.entries),
+                "size_bytes": self.size_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "generation": self.generation(),
+            }
+
+    def _remove(self, key: tuple):
+        _, size, _ = self.entries.pop(key)
+        self.size_bytes -= size
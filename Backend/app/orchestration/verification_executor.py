@@ -0,0 +1,192 @@
+import asyncio
+import contextlib
+import functools
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+class ExecutorSaturatedError(RuntimeError):
+    """Raised when the verification queue is full; callers should shed load (HTTP 503)."""
+
+
+# Change log follower over a process worker's own indexes (set by the pool initializer)
+_process_worker = None
+
+async def _verify_chunk(orchestrator, titles: list, skip_suggestions: bool, highlight: bool, latency_budget_ms):
+    context = await orchestrator.create_context(highlight=highlight, latency_budget_ms=latency_budget_ms)
+    return await orchestrator.verify_batch(titles, skip_suggestions, return_exceptions=True, context=context)
+
+def _init_process_worker(worker_factory):
+    global _process_worker
+    _process_worker = worker_factory()
+
+async def _process_chunk(titles: list, skip_suggestions: bool, highlight: bool, latency_budget_ms):
+    state = _process_worker.state
+    compactor = getattr(state, "index_compactor", None)
+    if compactor is not None:
+        await compactor.compact()  # Only stores due for it; the worker owns its indexes
+    return await _verify_chunk(state.orchestrator, titles, skip_suggestions, highlight, latency_budget_ms)
+
+def _process_verify_chunk(seq: int, titles: list, skip_suggestions: bool, highlight: bool, latency_budget_ms) -> list:
+    # Apply the titles the parent had applied when it dispatched this call, then verify
+    _process_worker.catch_up(seq)
+    results = asyncio.run(_process_chunk(titles, skip_suggestions, highlight, latency_budget_ms))
+    # Arbitrary exceptions may not pickle back to the parent
+    return [RuntimeError(str(r)) if isinstance(r, Exception) else r for r in results]
+
+
+class VerificationExecutor:
+    """
+    Runs the CPU-bound verification pipeline off the asyncio event loop.
+      - "thread": worker threads each drive their own event loop over the shared orchestrator
+        (rapidfuzz, NumPy and torch kernels release the GIL, so calls overlap).
+      - "process": workers are started from a forkserver (never forked from this multi-threaded
+        process) and load their own indexes through `worker_factory` (snapshot or dataset, then the
+        change log). Each call carries the parent's change log position (`sync_point`) and the
+        worker applies the entries it is missing before verifying, so a submit costs each worker
+        one incremental apply. The pool is only restarted when an admin rebuild swaps in a new
+        generation. Workers hold their own copy of the indexes (shared pages when mapped from a
+        snapshot) and take a full index load to start.
+      - "inline": runs on the event loop itself (no offloading).
+    At most max_workers + max_queue calls are admitted; beyond that callers either get
+    ExecutorSaturatedError or wait for a slot (wait=True). exclusive() drains running calls and
+    holds new ones back while the shared indexes are mutated (submit).
+    """
+    MODES = ("thread", "process", "inline")
+
+    def __init__(self, orchestrator, mode: str = "thread", max_workers: int = 4, max_queue: int = 64,
+                 worker_factory=None, sync_point=None):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown executor mode '{mode}' (expected one of {', '.join(self.MODES)}).")
+        if mode == "process" and (worker_factory is None or sync_point is None):
+            raise ValueError("Process mode needs a worker_factory and a sync_point.")
+        self.orchestrator = orchestrator      # Callable returning the current orchestrator
+        self.worker_factory = worker_factory  # Importable callable building a process worker's ChangeLogFollower
+        self.sync_point = sync_point          # Callable returning (index epoch, applied change log seq)
+        self.mode = mode
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.logger = logging.getLogger("mesh")
+
+        self.pool = None
+        self.pool_epoch = None
+        self.local = threading.local()    # Per worker thread event loop
+
+        self.admitted = 0                 # Running + queued calls
+        self.active = 0                   # Calls past the exclusive() gate
+        self.rejected = 0
+        self.slot_free = asyncio.Event()
+        self.slot_free.set()
+        self.gate_open = asyncio.Event()
+        self.gate_open.set()
+        self.idle = asyncio.Event()
+        self.idle.set()
+        self.writer_lock = asyncio.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self.max_workers + self.max_queue
+
+    async def verify(self, title: str, _skip_suggestions: bool = False, latency_budget_ms: float = None, wait: bool = False):
+        if self.mode == "inline":
+            return await self.orchestrator().verify(title, _skip_suggestions, latency_budget_ms=latency_budget_ms)
+        if self.mode == "thread":
+            return await self._submit(wait, self._thread_call, self.orchestrator().verify, title,
+                                      _skip_suggestions, latency_budget_ms)
+        result = (await self._submit(wait, _process_verify_chunk, [title], _skip_suggestions, True, latency_budget_ms))[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def verify_batch(self, titles: list, _skip_suggestions: bool = True, highlight: bool = True,
+                           latency_budget_ms: float = None, wait: bool = True) -> list:
+        """Verifies `titles` against one fresh context; failing titles yield their exception (input order)."""
+        if self.mode == "inline":
+            return await _verify_chunk(self.orchestrator(), titles, _skip_suggestions, highlight, latency_budget_ms)
+        if self.mode == "thread":
+            return await self._submit(wait, self._thread_call, _verify_chunk, self.orchestrator(), titles,
+                                      _skip_suggestions, highlight, latency_budget_ms)
+        return await self._submit(wait, _process_verify_chunk, titles, _skip_suggestions, highlight, latency_budget_ms)
+
+    @contextlib.asynccontextmanager
+    async def exclusive(self):
+        """Waits for running calls to finish and keeps new ones queued until the block exits."""
+        async with self.writer_lock:
+            self.gate_open.clear()
+            try:
+                await self.idle.wait()
+                yield
+            finally:
+                self.gate_open.set()
+
+    def stats(self) -> dict:
+        return {
+            "mode": self.mode,
+            "workers": self.max_workers,
+            "queue_capacity": self.max_queue,
+            "in_flight": self.admitted,
+            "running": self.active,
+            "rejected": self.rejected,
+        }
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.pool = None
+
+    async def _submit(self, wait: bool, fn, *args):
+        # Admission: bounded number of running + queued calls
+        while self.admitted >= self.capacity:
+            if not wait:
+                self.rejected += 1
+                raise ExecutorSaturatedError(f"Verification queue is full ({self.capacity} calls in flight).")
+            self.slot_free.clear()
+            await self.slot_free.wait()
+        self.admitted += 1
+        try:
+            await self.gate_open.wait()
+            self.active += 1
+            self.idle.clear()
+            if self.mode == "process":
+                # The parent's change log position, read past the gate so no apply is half-done
+                args = (self.sync_point()[1],) + args
+            future = asyncio.get_running_loop().run_in_executor(self._get_pool(), functools.partial(fn, *args))
+            # Released when the worker finishes, even if the awaiting request is cancelled
+            future.add_done_callback(self._release)
+            return await future
+        finally:
+            self.admitted -= 1
+            self.slot_free.set()
+
+    def _release(self, _future):
+        self.active -= 1
+        if self.active == 0:
+            self.idle.set()
+
+    def _get_pool(self):
+        if self.mode == "thread":
+            if self.pool is None:
+                self.pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="verify")
+            return self.pool
+
+        # Process pool: restarted only when a rebuild swapped in a new index generation
+        epoch = self.sync_point()[0]
+        if self.pool is None or self.pool_epoch != epoch:
+            if self.pool is not None:
+                self.pool.shutdown(wait=False)
+            context = multiprocessing.get_context("forkserver")
+            context.set_forkserver_preload([self.worker_factory.__module__])
+            self.pool = ProcessPoolExecutor(
+                max_workers=self.max_workers, mp_context=context,
+                initializer=_init_process_worker, initargs=(self.worker_factory,)
+            )
+            self.pool_epoch = epoch
+            self.logger.info(f"Verification process pool started at index epoch {epoch}.")
+        return self.pool
+
+    def _thread_call(self, fn, *args):
+        loop = getattr(self.local, "loop", None)
+        if loop is None:
+            loop = self.local.loop = asyncio.new_event_loop()
+        return loop.run_until_complete(fn(*args))
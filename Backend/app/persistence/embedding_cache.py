@@ -0,0 +1,179 @@
+import fcntl
+import hashlib
+import logging
+import os
+import struct
+import threading
+import unicodedata
+from collections import OrderedDict
+import numpy as np
+
+class EmbeddingCache:
+    """
+    Content-addressed cache of sentence embeddings: an in-process LRU in front of an on-disk store
+    shared by every worker (and by build_index.py) on the host.
+    Keys are a 16-byte BLAKE2b digest of the model name and the normalized text. On disk a model's
+    store is two append-only files:
+      - <model>.keys: 16-byte header (magic, dimension), then one digest per row
+      - <model>.f16:  the float16 embedding matrix, row-aligned with the keys, memory-mapped for reads
+    Appends hold an exclusive flock; readers pick up rows other workers appended on their next miss.
+    """
+    DEFAULT_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'embedding_cache')
+    MAGIC = b"MESHEMB1"
+    KEY_BYTES = 16
+    HEADER_BYTES = 16
+    TEXT_FORM = "nfkc-collapsed-whitespace"  # Names normalize(); change it whenever normalize() changes
+
+    def __init__(self, model_name: str, directory: str = DEFAULT_DIR, lru_size: int = 10000):
+        self.model_name = model_name
+        self.lru_size = lru_size
+        stem = os.path.join(directory, "".join(c if c.isalnum() or c in "-." else "_" for c in model_name))
+        self.keys_path = stem + ".keys"
+        self.vectors_path = stem + ".f16"
+        self.dimension = None
+        self.rows = {}             # digest -> row of the on-disk matrix
+        self.keys_size = 0         # Bytes of the keys file already read into `rows`
+        self.vectors = None        # Read-only float16 map of the first len(vectors) rows
+        self.lru = OrderedDict()   # digest -> float32 embedding
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger("mesh")
+        os.makedirs(directory, exist_ok=True)
+        with self.lock:
+            self._refresh()
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """The form a text is embedded (and keyed) in: NFKC, whitespace collapsed."""
+        return " ".join(unicodedata.normalize("NFKC", text).split())
+
+    def key(self, normalized: str) -> bytes:
+        return hashlib.blake2b(f"{self.model_name}\0{normalized}".encode("utf-8"), digest_size=self.KEY_BYTES).digest()
+
+    def get_many(self, texts: list) -> list:
+        """Cached float32 embedding (or None) per normalized text."""
+        keys = [self.key(text) for text in texts]
+        found = [None] * len(keys)
+        with self.lock:
+            missing = self._lookup(keys, found)
+            # Rows appended by other workers since the last refresh
+            if missing and self._refresh():
+                missing = self._lookup(keys, found)
+            self.misses += missing
+        return found
+
+    def put_many(self, texts: list, embeddings: np.ndarray):
+        """Stores the embeddings of normalized texts (rows of `embeddings`) in the LRU and on disk."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        keys = [self.key(text) for text in texts]
+        with self.lock:
+            for key, embedding in zip(keys, embeddings):
+                self._remember(key, embedding)
+            try:
+                self._append(keys, embeddings)
+            except (OSError, ValueError) as e:
+                self.logger.error(f"Embedding cache write failed: {e}")
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {
+                "lru_entries": len(self.lru),
+                "disk_rows": len(self.rows),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+            }
+
+    def _lookup(self, keys: list, found: list) -> int:
+        missing = 0
+        for i, key in enumerate(keys):
+            if found[i] is not None:
+                continue
+            embedding = self.lru.get(key)
+            if embedding is not None:
+                self.lru.move_to_end(key)
+                self.hits += 1
+            else:
+                row = self.rows.get(key)
+                if row is None:
+                    missing += 1
+                    continue
+                embedding = np.asarray(self.vectors[row], dtype=np.float32)
+                self._remember(key, embedding)
+                self.disk_hits += 1
+            found[i] = embedding
+        return missing
+
+    def _remember(self, key: bytes, embedding: np.ndarray):
+        if self.lru_size <= 0:
+            return
+        self.lru[key] = embedding
+        self.lru.move_to_end(key)
+        while len(self.lru) > self.lru_size:
+            self.lru.popitem(last=False)
+
+    def _refresh(self) -> bool:
+        """Reads keys appended since the last refresh; True if there were any."""
+        try:
+            size = os.path.getsize(self.keys_path)
+        except OSError:
+            return False
+        if size <= max(self.keys_size, self.HEADER_BYTES - 1):
+            return False
+        with open(self.keys_path, "rb") as f:
+            if self.dimension is None:
+                magic, dimension = struct.unpack("<8sI4x", f.read(self.HEADER_BYTES))
+                if magic != self.MAGIC:
+                    raise ValueError(f"{self.keys_path} is not an embedding cache key file.")
+                self.dimension = dimension
+                self.keys_size = self.HEADER_BYTES
+            f.seek(self.keys_size)
+            data = f.read(size - self.keys_size)
+        rows = len(data) // self.KEY_BYTES
+        first = (self.keys_size - self.HEADER_BYTES) // self.KEY_BYTES
+        for i in range(rows):
+            self.rows.setdefault(data[i * self.KEY_BYTES:(i + 1) * self.KEY_BYTES], first + i)
+        self.keys_size += rows * self.KEY_BYTES
+        self._map()
+        return rows > 0
+
+    def _map(self):
+        count = (self.keys_size - self.HEADER_BYTES) // self.KEY_BYTES
+        if count:
+            self.vectors = np.memmap(self.vectors_path, dtype=np.float16, mode="r", shape=(count, self.dimension))
+        else:
+            self.vectors = np.zeros((0, self.dimension or 0), dtype=np.float16)
+
+    def _append(self, keys: list, embeddings: np.ndarray):
+        with open(self.keys_path, "ab") as keys_file:
+            fcntl.flock(keys_file, fcntl.LOCK_EX)
+            try:
+                if os.fstat(keys_file.fileno()).st_size < self.HEADER_BYTES:
+                    # New file, or a header torn by a crash
+                    keys_file.truncate(0)
+                    keys_file.write(struct.pack("<8sI4x", self.MAGIC, embeddings.shape[1]))
+                    keys_file.flush()
+                self._refresh()
+                if embeddings.shape[1] != self.dimension:
+                    raise ValueError(f"embedding dimension {embeddings.shape[1]} != cache dimension {self.dimension}")
+                new = {}
+                for key, embedding in zip(keys, embeddings):
+                    if key not in self.rows and key not in new:
+                        new[key] = embedding
+                if not new:
+                    return
+
+                # Vectors first: a crash between the two writes leaves unreferenced bytes, and one during the
+                # keys write a torn final key; both are trimmed here next time, before appending
+                rows = (self.keys_size - self.HEADER_BYTES) // self.KEY_BYTES
+                keys_file.truncate(self.keys_size)
+                with open(self.vectors_path, "ab") as vectors_file:
+                    vectors_file.truncate(rows * self.dimension * 2)
+                    vectors_file.write(np.asarray(list(new.values()), dtype=np.float16).tobytes())
+                keys_file.write(b"".join(new))
+                keys_file.flush()
+                self._refresh()
+            finally:
+                fcntl.flock(keys_file, fcntl.LOCK_UN)
@@ -0,0 +1,173 @@
+import io
+import json
+import mmap
+import os
+import pickle
+import struct
+import time
+import numpy as np
+from app.preprocessing.normalization_pipeline import NormalizationPipeline
+from app.preprocessing.transliteration_normalizer import TransliterationNormalizer
+from app.retrieval.canonical_title_index import CanonicalTitleIndex
+from app.retrieval.inverted_token_index import InvertedTokenIndex
+from app.retrieval.multi_field_token_index import MultiFieldTokenIndex
+from app.retrieval.packed_tables import PackedGroups, PackedKeys, PackedList, TitleTable
+from app.retrieval.phonetic_token_index import PhoneticTokenIndex
+from app.retrieval.postings_store import PostingsStore
+from app.retrieval.symspell_token_expander import SymSpellTokenExpander
+from app.retrieval.title_feature_store import TitleFeatures, TitleFeatureStore
+from app.retrieval.title_phrase_matcher import TitlePhraseMatcher
+from app.retrieval.title_trigram_index import TitleTrigramIndex
+
+MAGIC = b"MESHSNAP"
+FORMAT_VERSION = 5  # 2: segmented postings stores (frozen segment, tombstones); 3: canonical suffix pairs;
+                    # 4: packed feature store; 5: packed titles, key tables and vocabularies, no automata
+# magic, format version, reserved, header offset, header length
+_PREFIX = struct.Struct("<8sIIQQ")
+_ALIGN = 64
+_MIN_MAPPED_BYTES = 4096  # Smaller arrays stay inside the pickle stream
+
+DEFAULT_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'index_snapshot.bin')
+
+# app.state attributes stored in a snapshot
+SNAPSHOT_INDEXES = (
+    "token_index", "canonical_index", "trigram_index", "phonetic_index",
+    "fuzzy_expander", "phrase_matcher", "feature_store",
+)
+
+# The only globals a snapshot's pickle stream may reference: the index classes and their parts,
+# plus the NumPy helpers that rebuild arrays too small to be mapped
+_ALLOWED_GLOBALS = {
+    (cls.__module__, cls.__qualname__) for cls in (
+        InvertedTokenIndex, MultiFieldTokenIndex, PostingsStore, CanonicalTitleIndex, TitleTrigramIndex,
+        PhoneticTokenIndex, SymSpellTokenExpander, TitlePhraseMatcher, TitleFeatureStore, TitleFeatures,
+        PackedList, TitleTable, PackedKeys, PackedGroups, NormalizationPipeline, TransliterationNormalizer,
+    )
+} | {
+    ("numpy", "dtype"), ("numpy", "ndarray"),
+    ("numpy._core.numeric", "_frombuffer"), ("numpy.core.numeric", "_frombuffer"),
+    ("numpy._core.multiarray", "_reconstruct"), ("numpy.core.multiarray", "_reconstruct"),
+    ("numpy._core.multiarray", "scalar"), ("numpy.core.multiarray", "scalar"),
+}
+
+
+class IndexSnapshotError(ValueError):
+    """The snapshot file is unreadable, of another format version, or built from different data."""
+
+
+class _ArrayPickler(pickle.Pickler):
+    # Large NumPy arrays are written as raw sections after the pickle stream
+    def __init__(self, file, arrays: list):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.arrays = arrays
+
+    def persistent_id(self, obj):
+        if type(obj) is np.ndarray and not obj.dtype.hasobject and obj.nbytes >= _MIN_MAPPED_BYTES:
+            self.arrays.append(np.ascontiguousarray(obj))
+            return len(self.arrays) - 1
+        return None
+
+
+class _ArrayUnpickler(pickle.Unpickler):
+    # Raw sections come back as arrays viewing the mapped file (no copy); only index classes are loaded
+    def __init__(self, file, buffer, sections: list):
+        super().__init__(file)
+        self.buffer = buffer
+        self.sections = sections
+
+    def persistent_load(self, pid):
+        offset, dtype, shape = self.sections[pid]
+        count = int(np.prod(shape)) if shape else 1
+        return np.frombuffer(self.buffer, dtype=np.dtype(dtype), count=count, offset=offset).reshape(shape)
+
+    def find_class(self, module, name):
+        if (module, name) not in _ALLOWED_GLOBALS:
+            raise IndexSnapshotError(f"Snapshot references {module}.{name}, which is not an index class.")
+        return super().find_class(module, name)
+
+
+def source_fingerprint(dataset_path: str, params: dict) -> dict:
+    """Identifies the data a snapshot was built from: dataset size / mtime plus index-shaping settings."""
+    try:
+        stat = os.stat(dataset_path)
+        dataset = {"name": os.path.basename(dataset_path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    except OSError:
+        dataset = None
+    return {"dataset": dataset, "params": params}
+
+
+def write_snapshot(path: str, titles: list, indexes: dict, source: dict) -> dict:
+    """
+    Writes titles and indexes with their large arrays as aligned raw sections: the indexes pack
+    their titles, key tables and vocabularies into arrays when pickled, so the pickle stream
+    itself only holds small metadata. Replaces `path` atomically; returns the header.
+    """
+    if not isinstance(titles, TitleTable):
+        titles = TitleTable(titles)
+    arrays = []
+    stream = io.BytesIO()
+    _ArrayPickler(stream, arrays).dump({"titles": titles, "indexes": indexes})
+    payload = stream.getbuffer()
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(b"\0" * _PREFIX.size)
+        pickle_section = [f.tell(), len(payload)]
+        f.write(payload)
+        sections = []
+        for array in arrays:
+            f.write(b"\0" * (-f.tell() % _ALIGN))
+            sections.append([f.tell(), array.dtype.str, list(array.shape)])
+            f.write(array.tobytes())
+
+        header = {
+            "format_version": FORMAT_VERSION,
+            "created": time.time(),
+            "source": source,
+            "titles": len(titles),
+            "indexes": list(indexes),
+            "pickle": pickle_section,
+            "arrays": sections,
+        }
+        header_bytes = json.dumps(header).encode("utf-8")
+        header_offset = f.tell()
+        f.write(header_bytes)
+        f.seek(0)
+        f.write(_PREFIX.pack(MAGIC, FORMAT_VERSION, 0, header_offset, len(header_bytes)))
+    os.replace(tmp_path, path)
+    return header
+
+
+def read_header(buffer) -> dict:
+    if len(buffer) < _PREFIX.size:
+        raise IndexSnapshotError("Snapshot is truncated.")
+    magic, version, _, header_offset, header_length = _PREFIX.unpack_from(buffer, 0)
+    if magic != MAGIC:
+        raise IndexSnapshotError("Not an index snapshot.")
+    if version != FORMAT_VERSION:
+        raise IndexSnapshotError(f"Snapshot format version {version}, expected {FORMAT_VERSION}.")
+    if header_offset + header_length > len(buffer):
+        raise IndexSnapshotError("Snapshot is truncated.")
+    return json.loads(bytes(buffer[header_offset:header_offset + header_length]))
+
+
+def load_snapshot(path: str, source: dict) -> tuple:
+    """
+    Maps a snapshot and returns (titles as a TitleTable, indexes by app.state name, header).
+    The mapping is copy-on-write: every worker process shares the file's page cache, and the few
+    arrays later mutated in place (e.g. document lengths on submit) get private pages.
+    Postings, suffix pairs, titles, key tables, vocabularies and features are all mapped and
+    decoded lazily on lookup, so load time does not grow with the catalogue. The pickle stream
+    may only reference the index classes.
+    Raises IndexSnapshotError when the snapshot does not match `source` or references any other
+    class, OSError when unreadable.
+    """
+    with open(path, "rb") as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+    header = read_header(buffer)
+    if header["source"] != source:
+        raise IndexSnapshotError("Snapshot was built from a different dataset or index settings.")
+
+    start, length = header["pickle"]
+    data = _ArrayUnpickler(io.BytesIO(buffer[start:start + length]), buffer, header["arrays"]).load()
+    return data["titles"], data["indexes"], header
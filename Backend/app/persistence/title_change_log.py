@@ -0,0 +1,76 @@
+import contextlib
+import os
+import sqlite3
+import time
+
+class TitleChangeLog:
+    """
+    Append-only log of accepted titles in a local SQLite database (WAL mode), shared by every
+    API worker on the host: a submit appends here and each worker tails the log into its own
+    in-memory indexes. Rows are never updated or deleted; `seq` orders them.
+    Title ids are allocated inside the insert, so concurrent workers never hand out the same id.
+    Admin rebuild requests are logged the same way: every worker rebuilds when the epoch moves.
+    """
+    DEFAULT_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'title_changes.db')
+    COLUMNS = ("seq", "title_id", "title", "normalized_title", "canonical_title", "created")
+
+    def __init__(self, path: str = DEFAULT_PATH):
+        self.path = path
+        with contextlib.closing(self._connect()) as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS title_changes ("
+                " seq INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " title_id INTEGER NOT NULL UNIQUE,"
+                " title TEXT NOT NULL,"
+                " normalized_title TEXT NOT NULL,"
+                " canonical_title TEXT NOT NULL,"
+                " created REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS rebuild_requests ("
+                " epoch INTEGER PRIMARY KEY AUTOINCREMENT,"
+                " created REAL NOT NULL)"
+            )
+
+    def append(self, title: str, normalized_title: str, canonical_title: str, min_id: int) -> dict:
+        """Appends one accepted title; its id is above `min_id` (the catalogue's largest) and every logged id."""
+        with contextlib.closing(self._connect()) as conn:
+            cursor = conn.execute(
+                "INSERT INTO title_changes (title_id, title, normalized_title, canonical_title, created) "
+                "VALUES (MAX(?, COALESCE((SELECT MAX(title_id) FROM title_changes), 0)) + 1, ?, ?, ?, ?)",
+                (min_id, title, normalized_title, canonical_title, time.time())
+            )
+            row = conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM title_changes WHERE seq = ?", (cursor.lastrowid,)
+            ).fetchone()
+        return dict(zip(self.COLUMNS, row))
+
+    def read_since(self, seq: int, limit: int = 1000) -> list:
+        """Entries after `seq`, oldest first."""
+        with contextlib.closing(self._connect()) as conn:
+            rows = conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM title_changes WHERE seq > ? ORDER BY seq LIMIT ?",
+                (seq, limit)
+            ).fetchall()
+        return [dict(zip(self.COLUMNS, row)) for row in rows]
+
+    def last_seq(self) -> int:
+        with contextlib.closing(self._connect()) as conn:
+            return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM title_changes").fetchone()[0]
+
+    def request_rebuild(self) -> int:
+        """Logs an index rebuild request; returns the new rebuild epoch."""
+        with contextlib.closing(self._connect()) as conn:
+            return conn.execute("INSERT INTO rebuild_requests (created) VALUES (?)", (time.time(),)).lastrowid
+
+    def rebuild_epoch(self) -> int:
+        with contextlib.closing(self._connect()) as conn:
+            return conn.execute("SELECT COALESCE(MAX(epoch), 0) FROM rebuild_requests").fetchone()[0]
+
+    def _connect(self) -> sqlite3.Connection:
+        # Short-lived connections: callers run on the event loop, worker threads and forked processes
+        conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
@@ -1,6 +1,7 @@
 import csv
 import os
 import logging
+from app.retrieval.packed_tables import TitleTable
 
 class TitleRepository:
     _titles_cache = None  # Class-level cache
@@ -17,6 +18,15 @@ class TitleRepository:
         if TitleRepository._titles_cache is not None:
             return TitleRepository._titles_cache
 
+        titles = self.read_titles()
+        if titles:
+            TitleRepository._titles_cache = titles
+        return titles
+
+    def read_titles(self) -> list:
+        """
+        Reads the dataset from disk, bypassing (and leaving untouched) the shared cache.
+        """
         titles = []
         json_abs = os.path.abspath(self.json_path)
         csv_abs = os.path.abspath(self.csv_path)
@@ -38,7 +48,6 @@ class TitleRepository:
                             "normalized_title": row.get("normalized_title", title.lower()),
                             "canonical_title": re.sub(r'[^a-z0-9]', '', unicodedata.normalize('NFKC', title).lower().strip())
                         })
-                TitleRepository._titles_cache = titles
                 self.logger.info(f"Loaded {len(titles)} titles from Dataset.json.")
                 return titles
             except Exception as e:
@@ -55,7 +64,6 @@ class TitleRepository:
                             "title": row["title"],
                             "normalized_title": row["normalized_title"]
                         })
-                TitleRepository._titles_cache = titles
                 self.logger.info(f"Loaded {len(titles)} titles from CSV fallback.")
             except Exception as e:
                 self.logger.error(f"Failed to load CSV fallback: {e}")
@@ -66,6 +74,17 @@ class TitleRepository:
     def clear_cache(cls):
         cls._titles_cache = None
 
+    @classmethod
+    def set_cache(cls, titles: list):
+        cls._titles_cache = titles
+
+    @staticmethod
+    def max_title_id(titles: list) -> int:
+        """Largest integer title id in `titles` (0 if none); logged titles are given ids above it."""
+        if isinstance(titles, TitleTable):
+            return titles.max_id  # Snapshot titles: known without decoding every title
+        return max((t["id"] for t in titles if isinstance(t.get("id"), int)), default=0)
+
     @classmethod
     def add_to_cache(cls, title_dict: dict):
         if cls._titles_cache is not None:
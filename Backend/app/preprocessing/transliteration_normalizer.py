@@ -41,10 +41,14 @@ class TransliterationNormalizer:
         Converts native scripts to Latin (ITRANS) and applies
         canonical phoneme flattening.
         """
+        return self.flatten(self.romanize(text))
+
+    def romanize(self, text: str) -> str:
+        """Lowercases and converts Devanagari / Odia text to Latin (ITRANS); Latin text is only lowercased."""
         text = text.lower().strip()
         
-        # 1. Native to Latin Conversion
-        if INDIC_LIB_AVAILABLE:
+        # 1. Native to Latin Conversion (ASCII text has no native script to detect)
+        if INDIC_LIB_AVAILABLE and not text.isascii():
             script = self.detect_script(text)
             if script in [sanscript.DEVANAGARI, sanscript.ORIYA]:
                 try:
@@ -52,7 +56,10 @@ class TransliterationNormalizer:
                     text = transliterate(text, script, sanscript.ITRANS).lower()
                 except Exception as e:
                     logger.warning(f"Indic transliteration failed for {text}: {e}")
+        return text
 
+    def flatten(self, text: str) -> str:
+        """Canonical phoneme flattening of (lowercase) Latin text."""
         # 2. Canonical Flattening
         # Map phonetic character swaps commonly used in bad transliterations
         text = re.sub(r'c(?!h)', 'k', text)  # namascar -> namaskar, but keeps 'ch'
@@ -1,7 +1,68 @@
+import json
+import math
+import os
 import faiss
 import numpy as np
 
+# Index types selectable in build_index.py (FAISS index_factory layouts, L2 metric)
+INDEX_TYPES = {
+    "hnsw-flat": "HNSW32,Flat",           # float32 vectors in the graph: exact distances, 4 * d bytes per title
+    "hnsw-sq8": "HNSW32,SQ8",             # 8-bit scalar quantized vectors: d bytes per title
+    "ivf-pq": "IVF{nlist},PQ{pq_m}",      # inverted lists of product-quantized codes: pq_m bytes per title
+}
+
+
+def index_description(index_type: str, dimension: int, count: int, pca_dim: int = 0,
+                      nlist: int = 0, pq_m: int = 0) -> str:
+    """
+    index_factory string for an index type, optionally behind a PCA reduction to `pca_dim`.
+    IVF-PQ defaults: ~4 * sqrt(count) lists (at least 39 training points each), and one PQ
+    sub-quantizer per 8 dimensions.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r}; expected one of {', '.join(INDEX_TYPES)}.")
+    if pca_dim and not 0 < pca_dim < dimension:
+        raise ValueError(f"PCA dimension {pca_dim} must be below the embedding dimension {dimension}.")
+    reduced = pca_dim or dimension
+    nlist = nlist or max(1, min(int(4 * math.sqrt(count)), count // 39))
+    pq_m = pq_m or max(m for m in range(1, reduced // 8 + 1) if reduced % m == 0)
+    if reduced % pq_m:
+        raise ValueError(f"PQ sub-quantizers ({pq_m}) must divide the dimension ({reduced}).")
+    description = INDEX_TYPES[index_type].format(nlist=nlist, pq_m=pq_m)
+    return f"PCA{pca_dim},{description}" if pca_dim else description
+
+
+def exact_rerank(queries: np.ndarray, indices: np.ndarray, vectors: np.ndarray, top_k: int) -> tuple:
+    """
+    Re-orders approximate neighbours (n x fetch ids, -1 = none) by exact L2 distance to the stored
+    vectors (float16 is enough for ordering); returns the best `top_k` as (distances, indices).
+    """
+    valid = indices >= 0
+    stored = vectors[np.where(valid, indices, 0).ravel()].astype('float32').reshape(*indices.shape, -1)
+    distances = ((stored - queries[:, None, :]) ** 2).sum(axis=2)
+    distances[~valid] = np.inf
+    order = np.argsort(distances, axis=1, kind='stable')[:, :top_k]
+    distances = np.take_along_axis(distances, order, axis=1)
+    indices = np.where(np.isinf(distances), -1, np.take_along_axis(indices, order, axis=1))
+    return distances, indices
+
+
+def recall_at_k(found: np.ndarray, truth: np.ndarray, k: int) -> float:
+    """Share of the true k nearest neighbours found among the first k results, averaged over queries."""
+    hits = sum(len(set(row[:k]) & set(true_row[:k])) for row, true_row in zip(found.tolist(), truth.tolist()))
+    return hits / (len(truth) * k) if len(truth) else 0.0
+
+
+class ANNIndexMismatchError(ValueError):
+    """The prebuilt FAISS index is of another format or was built from a different catalogue."""
+
+
 class ANNVectorSearch:
+    METADATA_VERSION = 1  # faiss_metadata.json layout written by build_index.py
+    DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'faiss_index.bin')
+    DEFAULT_METADATA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'faiss_metadata.json')
+    DEFAULT_VECTORS_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'faiss_vectors.f16.npy')
+
     def __init__(self, dimension: int = 384): # Default for MiniLM
         self.dimension = dimension
         # HNSW index for high-speed retrieval
@@ -10,29 +71,130 @@ class ANNVectorSearch:
         self.index.hnsw.efConstruction = 40
         self.index.hnsw.efSearch = 16
         self.metadata = []
+        self.index_type = "hnsw-flat"
+        # Quantized indexes: float16 copies of the vectors (mapped) re-rank the top `rerank_k` hits exactly
+        self.rerank_vectors = None
+        self.rerank_k = 0
+        # Titles added after a prebuilt index was mapped (the mapped storage is read-only)
+        self.delta = None
+        self.delta_metadata = []
+
+    @property
+    def ntotal(self) -> int:
+        return self.index.ntotal + (self.delta.ntotal if self.delta is not None else 0)
 
     def build_index(self, embeddings: list, titles: list):
         if not embeddings:
             return
-        
+
         embeddings_np = np.array(embeddings).astype('float32')
         # Re-initialize to clear and reset dimension/parameters
         self.index = faiss.IndexHNSWFlat(self.dimension, 32)
         self.index.add(embeddings_np)
         self.metadata = titles
+        self.index_type = "hnsw-flat"
+        self.rerank_vectors = None
+        self.delta = None
+        self.delta_metadata = []
+
+    def load(self, index_path: str, metadata_path: str, titles: list, source: dict, ef_search: int = 16,
+             nprobe: int = 16, rerank_k: int = 100) -> dict:
+        """
+        Maps the index written by build_index.py (FAISS mmap IO: vectors stay in the page cache,
+        shared by every worker) after checking its metadata against the catalogue: format version,
+        source fingerprint, vector count and title ids. Quantized index types also map their float16
+        re-rank vectors. Returns the metadata header.
+        """
+        with open(metadata_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if not isinstance(meta, dict) or meta.get("format_version") != self.METADATA_VERSION:
+            raise ANNIndexMismatchError("Unsupported FAISS metadata format; rebuild with build_index.py.")
+        if meta.get("source") != source:
+            raise ANNIndexMismatchError("FAISS index was built from a different catalogue or model.")
+
+        by_id = {t.get("id"): t for t in titles}
+        missing = sum(1 for title_id in meta["ids"] if title_id not in by_id)
+        if missing:
+            raise ANNIndexMismatchError(f"{missing} indexed title ids are not in the catalogue.")
+
+        index = faiss.read_index(index_path, faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY)
+        if index.ntotal != len(meta["ids"]) or index.d != meta["dimension"]:
+            raise ANNIndexMismatchError(
+                f"FAISS index holds {index.ntotal} x {index.d} vectors, metadata {len(meta['ids'])} x {meta['dimension']}."
+            )
+        index_type = meta.get("index_type", "hnsw-flat")
+        # ParameterSpace reaches through the PCA transform to the HNSW graph / IVF lists
+        faiss.ParameterSpace().set_index_parameter(
+            index, "nprobe" if index_type == "ivf-pq" else "efSearch", nprobe if index_type == "ivf-pq" else ef_search
+        )
+
+        rerank_vectors = None
+        if meta.get("rerank_vectors"):
+            vectors_path = os.path.join(os.path.dirname(metadata_path), meta["rerank_vectors"])
+            rerank_vectors = np.load(vectors_path, mmap_mode="r")
+            if rerank_vectors.shape != (index.ntotal, index.d):
+                raise ANNIndexMismatchError(
+                    f"Re-rank vectors are {rerank_vectors.shape[0]} x {rerank_vectors.shape[1]}, index {index.ntotal} x {index.d}."
+                )
+
+        self.dimension = index.d
+        self.index = index
+        self.index_type = index_type
+        self.rerank_vectors = rerank_vectors
+        self.rerank_k = rerank_k
+        self.metadata = [by_id[title_id] for title_id in meta["ids"]]
+        self.delta = faiss.IndexFlatL2(index.d)
+        self.delta_metadata = []
+        return {key: value for key, value in meta.items() if key != "ids"}
+
+    def add(self, embedding: np.ndarray, title_obj: dict):
+        """Indexes one new title vector (into the delta index when the prebuilt index is mapped)."""
+        vector = np.asarray(embedding, dtype='float32').reshape(1, -1)
+        if self.delta is not None:
+            self.delta.add(vector)
+            self.delta_metadata.append(title_obj)
+        else:
+            self.index.add(vector)
+            self.metadata.append(title_obj)
+
+    async def get_top_candidates(self, query_embeddings: np.ndarray, top_k: int = 20):
+        """
+        Nearest titles for a batch of query vectors (n x d): one list per query, each searched
+        with a single FAISS call for the whole batch. A single vector (d,) returns one list.
+        """
+        queries = np.asarray(query_embeddings, dtype='float32')
+        single = queries.ndim == 1
+        queries = queries.reshape(-1, self.dimension)
+        results = self.search(queries, top_k)
+        return results[0] if single else results
+
+    def search(self, queries: np.ndarray, top_k: int) -> list:
+        if self.ntotal == 0 or len(queries) == 0:
+            return [[] for _ in range(len(queries))]
+
+        hits = [[] for _ in range(len(queries))]
+        for index, metadata in ((self.index, self.metadata), (self.delta, self.delta_metadata)):
+            if index is None or index.ntotal == 0:
+                continue
+            if index is self.index and self.rerank_vectors is not None and self.rerank_k:
+                # Quantized distances only shortlist: widen the search, then order by exact distance
+                _, indices = index.search(queries, min(max(self.rerank_k, top_k), index.ntotal))
+                distances, indices = exact_rerank(queries, indices, self.rerank_vectors, top_k)
+            else:
+                distances, indices = index.search(queries, min(top_k, index.ntotal))
+            for row, (row_distances, row_indices) in enumerate(zip(distances, indices)):
+                for distance, idx in zip(row_distances, row_indices):
+                    if idx != -1 and idx < len(metadata):
+                        hits[row].append((float(distance), metadata[idx]))
 
-    async def get_top_candidates(self, query_embedding: np.ndarray, top_k: int = 20):
-        if self.index.ntotal == 0:
-            return []
-        
-        query_np = query_embedding.astype('float32').reshape(1, -1)
-        distances, indices = self.index.search(query_np, top_k)
-        
         candidates = []
-        for i, idx in enumerate(indices[0]):
-            if idx != -1 and idx < len(self.metadata):
-                candidate = self.metadata[idx].copy()
-                candidate['vector_distance'] = float(distances[0][i])
-                candidates.append(candidate)
-        
+        for row_hits in hits:
+            if self.delta is not None and self.delta.ntotal:
+                row_hits.sort(key=lambda hit: hit[0])
+            row_candidates = []
+            for distance, title_obj in row_hits[:top_k]:
+                candidate = title_obj.copy()
+                candidate['vector_distance'] = distance
+                row_candidates.append(candidate)
+            candidates.append(row_candidates)
         return candidates
@@ -0,0 +1,133 @@
+import bisect
+import numpy as np
+from app.retrieval.packed_tables import PackedKeys, PackedList, TitleTable
+
+class CanonicalTitleIndex:
+    """
+    Index over space-agnostic canonical titles for the concatenation / containment check.
+    - Exact hits: hashed key table of the canonical strings.
+    - Candidate contained in query: the same key table probed with every substring of the query
+      longer than MIN_CONTAINMENT_LEN (one vectorised hash pass over the query).
+    - Query contained in candidate: sorted suffix array of catalogue canonicals (prefix search via bisect),
+      stored as (slot, offset) pairs in two int32 arrays instead of suffix string copies.
+    Every distinct canonical takes the next slot, so when several titles match, the lowest slot is
+    the one added first (same as a linear scan in catalogue order). The key table, canonicals and
+    titles are packed tables, mapped (not unpickled) from a snapshot.
+    Readers take `view` (suffix arrays, pending list) once; a rebuild replaces it in one
+    assignment, so a concurrent lookup sees either the old or the new state, never a mix.
+    """
+    MIN_CONTAINMENT_LEN = 12  # Containment only counts for canonicals strictly longer than this
+    REBUILD_THRESHOLD = 256   # Pending long canonicals scanned linearly until the next rebuild
+
+    def __init__(self):
+        self.exact = PackedKeys()       # canonical -> slot of the earliest title with that form
+        self.canonicals = PackedList()  # slot -> canonical, append-only
+        self.titles = TitleTable()      # slot -> earliest title object
+        # (suffix owners, suffix offsets, pending): suffix i is canonicals[owners[i]][offsets[i]:];
+        # pending holds the slots of long canonicals added since the rebuild
+        self.view = (np.zeros(0, dtype=np.int32), np.zeros(0, dtype=np.int32), [])
+        self.total_titles = 0
+
+    def build_index(self, titles: list):
+        self.exact = PackedKeys()
+        self.canonicals = PackedList()
+        self.titles = TitleTable()
+        self.total_titles = 0
+        long_slots = []
+        for title_obj in titles:
+            slot = self._register(title_obj)
+            if slot is not None and len(self.canonicals[slot]) > self.MIN_CONTAINMENT_LEN:
+                long_slots.append(slot)
+
+        owners, offsets = self._suffix_pairs(long_slots)
+        self.view = (owners, offsets, [])
+
+    def add_title(self, title_obj: dict):
+        """Incrementally indexes a newly accepted title."""
+        slot = self._register(title_obj)
+        if slot is None or len(self.canonicals[slot]) <= self.MIN_CONTAINMENT_LEN:
+            return
+        pending = self.view[2]
+        pending.append(slot)
+        if len(pending) >= self.REBUILD_THRESHOLD:
+            self._rebuild()
+
+    def find_match(self, query_canonical: str):
+        """
+        Returns the earliest indexed title whose canonical form equals the query, is a long
+        substring of the query, or (for long queries) contains the query. None if no clash.
+        """
+        owners, offsets, pending = self.view
+        matches = set()
+        slot = self.exact.get(query_canonical)
+        if slot is not None:
+            matches.add(slot)
+
+        # 1. Catalogue canonical contained in the query: every long substring looked up at once
+        length, min_len = len(query_canonical), self.MIN_CONTAINMENT_LEN
+        spans = [(start, end) for start in range(length - min_len) for end in range(start + min_len + 1, length + 1)]
+        matches.update(slot for _, _, slot in self.exact.find_spans(query_canonical, spans))
+
+        # 2. Query contained in a catalogue canonical (prefix of one of its suffixes)
+        if length > min_len:
+            prefix = self._prefix_key(owners, offsets, length)
+            pos = bisect.bisect_left(range(len(owners)), query_canonical, key=prefix)
+            while pos < len(owners) and prefix(pos) == query_canonical:
+                matches.add(int(owners[pos]))
+                pos += 1
+
+            # Long canonicals added since the last rebuild (the key table above covers direction 1)
+            for slot in pending:
+                if query_canonical in self.canonicals[slot]:
+                    matches.add(slot)
+
+        if not matches:
+            return None
+        return self.titles[min(matches)]
+
+    def _register(self, title_obj: dict):
+        # Titles shorter than 2 characters never take part in the check
+        if len(title_obj.get("title", "")) < 2:
+            return None
+        canonical = title_obj.get("canonical_title", "")
+        self.total_titles += 1
+        if canonical in self.exact:
+            return None  # Earlier title with the same canonical form already wins every match
+        slot = self.exact[canonical] = len(self.canonicals)
+        self.canonicals.append(canonical)
+        self.titles.append(title_obj)
+        return slot
+
+    def _prefix_key(self, owners: np.ndarray, offsets: np.ndarray, length: int):
+        canonicals = self.canonicals
+        def prefix(i: int) -> str:
+            offset = int(offsets[i])
+            return canonicals[owners[i]][offset:offset + length]
+        return prefix
+
+    def _suffix_pairs(self, slots) -> tuple:
+        """Sorted (owner, offset) arrays of the long suffixes of canonicals[slots]."""
+        canonicals = self.canonicals
+        pairs = [
+            (slot, offset)
+            for slot in slots
+            for offset in range(len(canonicals[slot]) - self.MIN_CONTAINMENT_LEN)
+        ]
+        pairs.sort(key=lambda pair: canonicals[pair[0]][pair[1]:])
+        owners = np.fromiter((p for p, _ in pairs), dtype=np.int32, count=len(pairs))
+        offsets = np.fromiter((o for _, o in pairs), dtype=np.int32, count=len(pairs))
+        return owners, offsets
+
+    def _rebuild(self):
+        # Merge the pending canonicals' sorted suffixes into the suffix array, then publish it
+        # (with a fresh pending list) in one assignment
+        owners, offsets, pending = self.view
+        new_owners, new_offsets = self._suffix_pairs(pending)
+        canonicals = self.canonicals
+        suffix = lambda i: canonicals[owners[i]][int(offsets[i]):]
+        at = np.fromiter(
+            (bisect.bisect_left(range(len(owners)), canonicals[o][int(f):], key=suffix)
+             for o, f in zip(new_owners, new_offsets)),
+            dtype=np.int64, count=len(new_owners)
+        )
+        self.view = (np.insert(owners, at, new_owners), np.insert(offsets, at, new_offsets), [])
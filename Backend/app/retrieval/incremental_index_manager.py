@@ -12,20 +12,24 @@ class IncrementalIndexManager:
         Dynamically updates indexes with a new approved title.
         """
         try:
-            # 1. Update Token Index
-            self.token_index.build_index([title_obj]) # build_index clear()s, so we need to fix it or add an append method
-            # For demo, we'll assume we have an append_to_index method
-            if hasattr(self.token_index, 'append_title'):
-                self.token_index.append_title(title_obj)
-            
+            # 1. Update Token Index (delta segment; an existing id is replaced)
+            self.token_index.add_title(title_obj)
+
             # 2. Update FAISS Index
             if 'embedding' in title_obj:
-                embedding = np.array([title_obj['embedding']]).astype('float32')
-                self.ann_index.index.add(embedding)
-                self.ann_index.metadata.append(title_obj)
-                
+                self.ann_index.add(np.asarray(title_obj['embedding'], dtype='float32'), title_obj)
+
             self.logger.info(f"Dynamically indexed new title: {title_obj.get('title')}")
             return True
         except Exception as e:
             self.logger.error(f"Failed to incrementally update index: {str(e)}")
             return False
+
+    def retire_title(self, title_id) -> bool:
+        """
+        Removes a title from token retrieval (tombstoned until the next compaction).
+        """
+        removed = self.token_index.remove_title(title_id)
+        if removed:
+            self.logger.info(f"Retired title id {title_id} from the token index.")
+        return removed
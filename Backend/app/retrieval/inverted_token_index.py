@@ -1,52 +1,215 @@
 import math
-from collections import defaultdict, Counter
+import numpy as np
+from app.retrieval.packed_tables import PackedKeys, PackedList, TitleTable
+from app.retrieval.postings_store import PostingsStore, SegmentedIndex
 
-class InvertedTokenIndex:
+class InvertedTokenIndex(SegmentedIndex):
+    """
+    Token -> title postings ranked by length-normalised IDF overlap.
+    Postings live in a segmented PostingsStore (immutable CSR base, small delta for titles added
+    since, tombstones for removed titles), merged by background compaction. Every write is O(title
+    tokens); IDF comes from the live document frequencies, so it stays exact across adds and removes.
+    A query accumulates scores with one bincount over its postings and selects the top-k with
+    argpartition, keeping the (-score, str(id)) order.
+    Titles, ids and the id -> ordinal map are packed tables, mapped (not unpickled) from a snapshot.
+    """
     def __init__(self):
-        self.index = defaultdict(list)
-        self.doc_freq = Counter()
-        self.titles_map = {}
-        self.doc_lengths = {}
+        self._reset()
+
+    def _reset(self):
+        self.ordinals = PackedKeys()  # title id -> document ordinal (live titles)
         self.total_docs = 0
+        self.store = PostingsStore()
+
+        # Per document ordinal; a re-added or removed title keeps its tombstoned ordinal
+        self.doc_ids = PackedList()
+        self.doc_titles = TitleTable()
+        self.doc_lengths = np.zeros(0, dtype=np.int32)  # Grown geometrically; first num_docs entries valid
+        self.num_docs = 0
+        self.id_rank = np.zeros(0, dtype=np.int32)      # Rank of str(id), valid for ordinals < ranked_docs
+        self.ranked_ids = np.zeros(0, dtype=str)         # str(id) in rank order
+        self.ranked_docs = 0
+
+    def build_index(self, titles: list, token_sets: list = None):
+        """
+        `token_sets` (optional, parallel to `titles`) replaces the titles' normalized_title tokens.
+        A title id listed twice keeps its last entry.
+        """
+        self._reset()
+        titles, token_sets = self.latest_titles(titles, token_sets)
+        self.store.build(self._register(title_obj, tokens) for title_obj, tokens in zip(titles, token_sets))
+        self.id_rank, self.ranked_ids = _id_ranks(self.doc_ids)
+        self.ranked_docs = self.num_docs
+
+    @property
+    def titles_map(self) -> "TitlesById":
+        """title id -> title object (live titles)."""
+        return TitlesById(self)
+
+    @staticmethod
+    def latest_titles(titles: list, token_sets: list = None) -> tuple:
+        """(titles, token_sets) keeping the last entry of every title id, in catalogue order."""
+        if token_sets is None:
+            token_sets = [None] * len(titles)
+        latest = {title_obj.get('id'): i for i, title_obj in enumerate(titles)}
+        if len(latest) < len(titles):
+            keep = sorted(latest.values())
+            titles, token_sets = [titles[i] for i in keep], [token_sets[i] for i in keep]
+        return titles, token_sets
+
+    def add_title(self, title_obj: dict, tokens=None):
+        """Incrementally indexes a newly accepted title (delta segment); an existing id is replaced."""
+        if title_obj.get('id') in self.ordinals:
+            self.remove_title(title_obj.get('id'))
+        self.store.add(*self._register(title_obj, tokens))
+
+    def remove_title(self, title_id, tokens=None) -> bool:
+        """
+        Retires a title (tombstone until the next compaction). `tokens` must match the tokens it was
+        indexed under when they were overridden at add / build time. Returns False for unknown ids.
+        """
+        ordinal = self.ordinals.pop(title_id, None)
+        if ordinal is None:
+            return False
+        title_obj = self.doc_titles[ordinal]
+        tokens = set(title_obj.get('normalized_title', '').split() if tokens is None else tokens)
+        self.store.remove(ordinal, tokens)
+        self.total_docs -= 1
+        return True
+
+    def freeze_segments(self):
+        # Titles added from here on stay unranked (placed by binary search) until the compaction installs.
+        # doc_ids is append-only, so its first num_docs entries are the frozen ids.
+        return self.store.freeze(), self.doc_ids, self.num_docs
+
+    def build_segments(self, frozen):
+        frozen_store, doc_ids, num_docs = frozen
+        return self.store.build_segments(frozen_store), _id_ranks([doc_ids[o] for o in range(num_docs)])
+
+    def install_segments(self, built):
+        segments, (id_rank, ranked_ids) = built
+        self.store.install(segments)
+        self.id_rank, self.ranked_ids, self.ranked_docs = id_rank, ranked_ids, len(id_rank)
+
+    async def filter_by_tokens(self, query_tokens: list, token_cache: dict = None) -> list:
+        """
+        Returns matching titles ranked by length-normalised IDF overlap.
+        `token_cache` (optional) memoises per-token (idf, postings) across calls that share tokens,
+        e.g. a batch of suggestion candidates.
+        """
+        titles, _ = await self.top_candidates(query_tokens, None, token_cache=token_cache)
+        return titles
+
+    async def top_candidates(self, query_tokens: list, k: int = None, token_cache: dict = None) -> tuple:
+        """
+        Returns (the `k` best matching titles in filter_by_tokens order, number of titles matched).
+        With k=None every match is returned.
+        """
+        matched, scores = self._score(query_tokens, token_cache)
+        total = len(matched)
+        if total == 0:
+            return [], 0
+
+        # Top-k by score; every title tied with the k-th score stays in for the id tie-break
+        selected = None
+        if k is not None and k < total:
+            kth = np.partition(-scores, k - 1)[k - 1]
+            selected = np.flatnonzero(-scores <= kth)
+            matched, scores = matched[selected], scores[selected]
+
+        # Sort by match score (descending), then by ID string (ascending) for deterministic stability
+        if matched.max() < self.ranked_docs:
+            ranked = matched[np.lexsort((self.id_rank[matched], -scores))]
+        else:
+            ranked = matched[np.lexsort((self._tie_keys(matched), -scores))]
+        if k is not None:
+            ranked = ranked[:k]
+        return self.doc_titles.take(ranked), total
 
-    def build_index(self, titles: list):
-        self.index.clear()
-        self.doc_freq.clear()
-        self.titles_map.clear()
-        self.doc_lengths.clear()
-        self.total_docs = len(titles)
-        
-        for title_obj in titles:
-            title_id = title_obj.get('id')
-            normalized_title = title_obj.get('normalized_title', '')
-            self.titles_map[title_id] = title_obj
-            
-            tokens = set(normalized_title.split())
-            self.doc_lengths[title_id] = len(tokens)
-            
-            for token in tokens:
-                self.index[token].append(title_id)
-                self.doc_freq[token] += 1
-
-    async def filter_by_tokens(self, query_tokens: list) -> list:
-        candidate_scores = defaultdict(float)
+    def _score(self, query_tokens: list, token_cache: dict = None) -> tuple:
         # Process unique tokens to prevent double-counting frequency
+        postings_parts = []
+        weight_parts = []
         for token in set(query_tokens):
-            if token in self.index:
-                # IDF weighting: rare tokens confer higher score
-                df = self.doc_freq[token]
-                # log(1 + N/df) gives higher score to rare tokens
-                idf = math.log1p(self.total_docs / max(1, df))
-                for cid in self.index[token]:
-                    candidate_scores[cid] += idf
-        
-        def get_score(cid):
-            raw_score = candidate_scores[cid]
-            # Length penalty: divides the raw TF-IDF score by the number of tokens in the document.
-            # This mathematically guarantees that an exact match rises above compound matches (e.g. 'Bharat' > 'Nav Bharat')
-            return raw_score / max(1, self.doc_lengths.get(cid, 1))
+            entry = token_cache.get(token) if token_cache is not None else None
+            if entry is None:
+                tid = self.store.key_id(token)
+                if tid is None:
+                    continue
+                # IDF weighting: log(1 + N/df) over live titles gives higher score to rare tokens
+                idf = math.log1p(self.total_docs / max(1, self.store.counts[tid]))
+                entry = (idf, self.store.postings_of(tid))
+                if token_cache is not None:
+                    token_cache[token] = entry
+            idf, postings = entry
+            postings_parts.append(postings)
+            weight_parts.append(np.full(len(postings), idf))
+        if not postings_parts:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
 
-        # Sort by match score (descending), then by ID string (ascending) for deterministic stability
-        sorted_cids = sorted(candidate_scores.keys(), key=lambda cid: (-get_score(cid), str(cid)))
-        
-        return [self.titles_map[cid] for cid in sorted_cids if cid in self.titles_map]
+        # Scatter-add: bincount sums each title's weights in query-token order, like the scalar loop did
+        matched, inverse = np.unique(np.concatenate(postings_parts), return_inverse=True)
+        raw_scores = np.bincount(inverse, weights=np.concatenate(weight_parts), minlength=len(matched))
+
+        # Length penalty: divides the raw TF-IDF score by the number of tokens in the document.
+        # This mathematically guarantees that an exact match rises above compound matches (e.g. 'Bharat' > 'Nav Bharat')
+        return matched, raw_scores / np.maximum(1.0, self.doc_lengths[matched])
+
+    def _tie_keys(self, matched: np.ndarray) -> np.ndarray:
+        # Titles added since the last compaction have no id rank yet: each goes between the ranks
+        # its id string falls between (binary search), ordered by id string among themselves
+        keys = np.empty(len(matched), dtype=np.float64)
+        ranked = matched < self.ranked_docs
+        keys[ranked] = self.id_rank[matched[ranked]]
+        unranked = np.flatnonzero(~ranked)
+        id_strings = [str(self.doc_ids[o]) for o in matched[unranked]]
+        order = sorted(range(len(unranked)), key=id_strings.__getitem__)
+        positions = np.searchsorted(self.ranked_ids, np.asarray(id_strings, dtype=str)) if len(self.ranked_ids) else np.zeros(len(unranked))
+        offsets = np.empty(len(unranked))
+        offsets[order] = (np.arange(len(unranked)) + 1) / (len(unranked) + 1)
+        keys[unranked] = positions - 1 + offsets
+        return keys
+
+    def _register(self, title_obj: dict, tokens=None) -> tuple:
+        title_id = title_obj.get('id')
+        tokens = set(title_obj.get('normalized_title', '').split() if tokens is None else tokens)
+        ordinal = self.num_docs
+        self.num_docs += 1
+        self.ordinals[title_id] = ordinal
+        self.total_docs += 1
+        self.doc_ids.append(title_id)
+        self.doc_titles.append(title_obj)
+        if self.num_docs > len(self.doc_lengths):
+            self.doc_lengths = np.resize(self.doc_lengths, max(1024, 2 * len(self.doc_lengths)))
+        self.doc_lengths[ordinal] = len(tokens)
+        return ordinal, tokens
+
+
+class TitlesById:
+    """Read-only title id -> title object view of an index's live titles."""
+    __slots__ = ("index",)
+
+    def __init__(self, index: InvertedTokenIndex):
+        self.index = index
+
+    def __len__(self) -> int:
+        return len(self.index.ordinals)
+
+    def __iter__(self):
+        return iter(self.index.ordinals)
+
+    def __contains__(self, title_id) -> bool:
+        return title_id in self.index.ordinals
+
+    def get(self, title_id, default=None):
+        ordinal = self.index.ordinals.get(title_id)
+        return default if ordinal is None else self.index.doc_titles[ordinal]
+
+
+def _id_ranks(doc_ids: list) -> tuple:
+    # (rank of str(id) per ordinal, id strings in rank order): the score tie-break of top_candidates
+    id_strings = [str(title_id) for title_id in doc_ids]
+    order = sorted(range(len(doc_ids)), key=id_strings.__getitem__)
+    id_rank = np.empty(len(doc_ids), dtype=np.int32)
+    id_rank[order] = np.arange(len(doc_ids))
+    return id_rank, np.asarray([id_strings[o] for o in order], dtype=str)
@@ -0,0 +1,94 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from app.retrieval.inverted_token_index import InvertedTokenIndex
+from app.preprocessing.normalization_pipeline import NormalizationPipeline
+from app.preprocessing.transliteration_normalizer import TransliterationNormalizer
+
+_normalizers = None  # (NormalizationPipeline, TransliterationNormalizer), created once per process
+
+
+def field_tokens(text: str) -> tuple:
+    """
+    (flat, roman) tokens of a title or query as typed:
+      roman - normalized tokens of its ITRANS romanization (Latin text is only normalized)
+      flat  - the roman tokens after phoneme flattening
+    """
+    global _normalizers
+    if _normalizers is None:
+        _normalizers = (NormalizationPipeline(), TransliterationNormalizer())
+    normalizer, transliterator = _normalizers
+    roman = normalizer.normalize(transliterator.romanize(text))
+    return transliterator.flatten(roman).split(), roman.split()
+
+
+def _title_forms(texts: list) -> list:
+    # Latin-script titles get no roman tokens: their raw field already holds them
+    forms = []
+    for text in texts:
+        flat, roman = field_tokens(text)
+        forms.append((flat, [] if text.isascii() else roman))
+    return forms
+
+
+class MultiFieldTokenIndex(InvertedTokenIndex):
+    """
+    Token index over three forms of every title, each field with its own postings:
+      - raw:   normalized_title tokens (this index itself, the regular token channel)
+      - flat:  phoneme-flattened tokens, native scripts romanized first ("भारत" -> "barata")
+      - roman: ITRANS tokens of Devanagari / Odia titles, so Latin-script queries reach them
+    Field forms are computed once per title at build time (in spawned worker processes for large
+    catalogues: builds also run inside the live, multi-threaded server during an admin rebuild, where
+    forking is unsafe), so a query costs one postings lookup per field. Each field ranks like the raw
+    token channel.
+    """
+    FIELDS = ("flat", "roman")
+    PARALLEL_MIN_TITLES = 20000  # Below this, starting workers costs more than it saves
+    CHUNK_SIZE = 5000
+
+    def __init__(self, workers: int = 0):
+        self.workers = workers or os.cpu_count() or 1
+        self.fields = {field: InvertedTokenIndex() for field in self.FIELDS}
+        super().__init__()
+
+    def build_index(self, titles: list, token_sets: list = None):
+        # Fields index the same deduplicated titles as the raw field
+        titles, token_sets = self.latest_titles(titles, token_sets)
+        super().build_index(titles, token_sets)
+        forms = self._compute_forms([title_obj.get("title", "") for title_obj in titles])
+        for i, field in enumerate(self.FIELDS):
+            docs = [(title_obj, tokens[i]) for title_obj, tokens in zip(titles, forms) if tokens[i]]
+            self.fields[field].build_index([doc[0] for doc in docs], [doc[1] for doc in docs])
+
+    def add_title(self, title_obj: dict, tokens=None):
+        """Incrementally indexes a newly accepted title in every field; an existing id is replaced."""
+        if title_obj.get("id") in self.ordinals:
+            self.remove_title(title_obj.get("id"))
+        super().add_title(title_obj, tokens)
+        forms = _title_forms([title_obj.get("title", "")])[0]
+        for field, field_tokens_ in zip(self.FIELDS, forms):
+            if field_tokens_:
+                self.fields[field].add_title(title_obj, field_tokens_)
+
+    def remove_title(self, title_id, tokens=None) -> bool:
+        """Retires a title from every field (field tokens are recomputed from its text)."""
+        title_obj = self.titles_map.get(title_id)
+        if title_obj is None:
+            return False
+        forms = _title_forms([title_obj.get("title", "")])[0]
+        for field, field_tokens_ in zip(self.FIELDS, forms):
+            if field_tokens_:
+                self.fields[field].remove_title(title_id, field_tokens_)
+        return super().remove_title(title_id, tokens)
+
+    async def field_candidates(self, field: str, query_tokens: list, k: int) -> list:
+        """The `k` best titles of one field for already-normalized query tokens (see field_tokens)."""
+        titles, _ = await self.fields[field].top_candidates(query_tokens, k)
+        return titles
+
+    def _compute_forms(self, texts: list) -> list:
+        if self.workers <= 1 or len(texts) < self.PARALLEL_MIN_TITLES:
+            return _title_forms(texts)
+        chunks = [texts[i:i + self.CHUNK_SIZE] for i in range(0, len(texts), self.CHUNK_SIZE)]
+        with ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            return [forms for chunk in pool.map(_title_forms, chunks) for forms in chunk]
@@ -0,0 +1,289 @@
+import json
+import numpy as np
+
+_HASH_BASE = 1099511628211  # Odd multiplier of the polynomial string hash (the 64-bit FNV prime)
+_HASH_MASK = (1 << 64) - 1
+_MISSING = object()
+
+
+def string_hash(text: str) -> int:
+    """Polynomial hash of the code points of `text` mod 2**64 (same value as substring_hashes())."""
+    h = 0
+    for ch in text:
+        h = (h * _HASH_BASE + ord(ch)) & _HASH_MASK
+    return h
+
+
+def substring_hashes(text: str, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """string_hash(text[start:end]) of every span, from one pass of prefix hashes (uint64 wraps mod 2**64)."""
+    prefix, power = [0], [1]
+    for ch in text:
+        prefix.append((prefix[-1] * _HASH_BASE + ord(ch)) & _HASH_MASK)
+        power.append((power[-1] * _HASH_BASE) & _HASH_MASK)
+    prefix = np.array(prefix, dtype=np.uint64)
+    power = np.array(power, dtype=np.uint64)
+    return prefix[ends] - prefix[starts] * power[ends - starts]
+
+
+def _pack_records(items: list):
+    # (int64 offsets, uint8 UTF-8 JSON records); None when an item does not survive a JSON round trip
+    records = []
+    for item in items:
+        try:
+            record = json.dumps(item, ensure_ascii=False, separators=(",", ":"))
+            if json.loads(record) != item:  # Tuples, non-str dict keys, NaN
+                return None
+            records.append(record.encode("utf-8"))
+        except (TypeError, ValueError):
+            return None
+    offsets = np.zeros(len(records) + 1, dtype=np.int64)
+    np.cumsum([len(record) for record in records], out=offsets[1:])
+    return offsets, np.frombuffer(b"".join(records), dtype=np.uint8)
+
+
+class PackedList:
+    """
+    Append-only list of JSON values (title objects, title ids, strings).
+    Pickled (index snapshot) as one UTF-8 JSON record per item in two flat arrays, which the
+    snapshot maps instead of unpickling; a packed item is decoded on first access. Items appended
+    since stay objects until the next pickle; if any item would not round-trip through JSON, the
+    whole list is pickled as objects.
+    """
+    def __init__(self, items=()):
+        self.packed = None        # (int64 record offsets, uint8 UTF-8 JSON records)
+        self.items = list(items)  # Items after the packed ones
+        self.decoded = {}         # Packed position -> item decoded so far
+
+    def __len__(self) -> int:
+        return self._packed_len() + len(self.items)
+
+    def __getitem__(self, position):
+        item = self.decoded.get(position, _MISSING)
+        if item is not _MISSING:
+            return item
+        position = int(position)
+        if position < 0:
+            position += len(self)
+        packed = self._packed_len()
+        if position >= packed:
+            return self.items[position - packed]
+        offsets, blob = self.packed
+        record = blob[offsets[position]:offsets[position + 1]].tobytes().decode("utf-8")
+        item = self.decoded[position] = json.loads(record)
+        return item
+
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
+
+    def __getstate__(self):
+        items = list(self)
+        state = self.__dict__.copy()
+        state["decoded"] = {}
+        state["packed"] = _pack_records(items)
+        state["items"] = [] if state["packed"] is not None else items
+        return state
+
+    def append(self, item):
+        self.items.append(item)
+
+    def take(self, positions) -> list:
+        """Items at `positions` (e.g. an array of ordinals)."""
+        positions = np.asarray(positions, dtype=np.int64).tolist()
+        if self.packed is None:
+            items = self.items
+            return [items[position] for position in positions]
+        decoded = self.decoded
+        items = [decoded.get(position, _MISSING) for position in positions]
+        for i, item in enumerate(items):
+            if item is _MISSING:
+                items[i] = self[positions[i]]
+        return items
+
+    def _packed_len(self) -> int:
+        return len(self.packed[0]) - 1 if self.packed is not None else 0
+
+
+class TitleTable(PackedList):
+    """PackedList of title objects that tracks the largest integer title id (logged ids go above it)."""
+    def __init__(self, titles=()):
+        super().__init__(titles)
+        self.max_id = max((t["id"] for t in self.items if isinstance(t.get("id"), int)), default=0)
+
+    def append(self, title_obj: dict):
+        super().append(title_obj)
+        if isinstance(title_obj.get("id"), int):
+            self.max_id = max(self.max_id, title_obj["id"])
+
+
+class PackedKeys:
+    """
+    Dict-like mapping of str keys (or int keys) to int values: key ids, canonical forms, title id ordinals.
+    Pickled as the keys' 64-bit hashes (int keys: the keys) in sorted order, with the values and the
+    keys in the same order, all mapped by an index snapshot: a lookup is a binary search plus one key
+    comparison. Keys set or removed since stay in a dict / set over the packed entries until the
+    next pickle. Keys of mixed types are pickled as a plain dict.
+    """
+    def __init__(self):
+        self.packed = None    # (sorted uint64 hashes | int64 keys, int64 values, PackedList of str keys | None)
+        self.recent = {}      # Key -> value set since packing (shadows its packed entry)
+        self.removed = set()  # Packed keys removed since packing
+        self.size = 0
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, key) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __getitem__(self, key) -> int:
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value: int):
+        if key not in self:
+            self.size += 1
+        self.recent[key] = value
+        self.removed.discard(key)
+
+    def __iter__(self):
+        return (key for key, _ in self.items())
+
+    def __getstate__(self):
+        entries = dict(self.items())
+        state = self.__dict__.copy()
+        state.update(packed=self._pack(entries), recent={}, removed=set())
+        if state["packed"] is None:
+            state["recent"] = entries
+        return state
+
+    def get(self, key, default=None):
+        value = self.recent.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.packed is None or key in self.removed:
+            return default
+        value = self._packed_get(key)
+        return default if value is None else value
+
+    def pop(self, key, default=None):
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        self.size -= 1
+        self.recent.pop(key, None)
+        if self.packed is not None and self._packed_get(key) is not None:
+            self.removed.add(key)
+        return value
+
+    def items(self):
+        if self.packed is not None:
+            hashes, values, keys = self.packed
+            for row in range(len(values)):
+                key = int(hashes[row]) if keys is None else keys[row]
+                if key not in self.recent and key not in self.removed:
+                    yield key, int(values[row])
+        yield from list(self.recent.items())
+
+    def find_spans(self, text: str, spans: list) -> list:
+        """(start, end, value) of every (start, end) span of `text` whose substring is a key, in span order."""
+        if not spans:
+            return []
+        candidates = set()
+        if self.packed is not None and self.packed[2] is not None and len(self.packed[1]):
+            hashes = self.packed[0]
+            starts, ends = np.array(spans, dtype=np.int64).T
+            targets = substring_hashes(text, starts, ends)
+            rows = np.minimum(np.searchsorted(hashes, targets), len(hashes) - 1)
+            candidates.update(np.flatnonzero(hashes[rows] == targets).tolist())
+        if self.recent:
+            candidates.update(i for i, (start, end) in enumerate(spans) if text[start:end] in self.recent)
+
+        found = []
+        for i in sorted(candidates):
+            start, end = spans[i]
+            value = self.get(text[start:end])  # Confirms hash hits, skips removed keys
+            if value is not None:
+                found.append((start, end, value))
+        return found
+
+    def _packed_get(self, key):
+        hashes, values, keys = self.packed
+        if keys is None:
+            if type(key) is not int or not -2 ** 63 <= key < 2 ** 63:
+                return None
+            row = int(hashes.searchsorted(key))
+            return int(values[row]) if row < len(hashes) and hashes[row] == key else None
+        if type(key) is not str:
+            return None
+        target = string_hash(key)
+        row = int(hashes.searchsorted(np.uint64(target)))
+        while row < len(hashes) and int(hashes[row]) == target:
+            if keys[row] == key:
+                return int(values[row])
+            row += 1
+        return None
+
+    @staticmethod
+    def _pack(entries: dict):
+        if all(type(key) is int and -2 ** 63 <= key < 2 ** 63 for key in entries):
+            keys = sorted(entries)
+            return np.array(keys, dtype=np.int64), np.array([entries[k] for k in keys], dtype=np.int64), None
+        if all(type(key) is str for key in entries):
+            pairs = sorted((string_hash(key), key) for key in entries)
+            return (
+                np.array([h for h, _ in pairs], dtype=np.uint64),
+                np.array([entries[key] for _, key in pairs], dtype=np.int64),
+                PackedList(key for _, key in pairs),
+            )
+        return None
+
+
+class PackedGroups:
+    """
+    Mapping of str keys to appendable lists of ints (SymSpell deletes -> token ids, phrases -> title
+    ordinals). Keys map to rows through a PackedKeys; pickled, the rows are one CSR pair of arrays
+    (mapped by an index snapshot), and values appended since stay per-row lists.
+    """
+    def __init__(self):
+        self.rows = PackedKeys()  # Key -> row
+        self.packed = None        # (int64 indptr, int64 values) of the packed rows
+        self.recent = {}          # Row -> values appended since packing
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __contains__(self, key) -> bool:
+        return key in self.rows
+
+    def __getstate__(self):
+        groups = [self._values(row) for row in range(len(self.rows))]
+        indptr = np.zeros(len(groups) + 1, dtype=np.int64)
+        np.cumsum([len(group) for group in groups], out=indptr[1:])
+        values = np.fromiter((value for group in groups for value in group), dtype=np.int64, count=int(indptr[-1]))
+        state = self.__dict__.copy()
+        state.update(packed=(indptr, values), recent={})
+        return state
+
+    def get(self, key, default=()):
+        row = self.rows.get(key)
+        return default if row is None else self._values(row)
+
+    def append(self, key, value: int):
+        row = self.rows.get(key)
+        if row is None:
+            row = self.rows[key] = len(self.rows)
+        self.recent.setdefault(row, []).append(value)
+
+    def find_spans(self, text: str, spans: list) -> list:
+        """(start, end, values) of every span of `text` whose substring is a key, in span order."""
+        return [(start, end, self._values(row)) for start, end, row in self.rows.find_spans(text, spans)]
+
+    def _values(self, row: int) -> list:
+        values = []
+        if self.packed is not None and row + 1 < len(self.packed[0]):
+            indptr, packed = self.packed
+            values = packed[indptr[row]:indptr[row + 1]].tolist()
+        return values + self.recent.get(row, [])
@@ -0,0 +1,86 @@
+import math
+import numpy as np
+from metaphone import doublemetaphone
+from app.retrieval.packed_tables import PackedKeys, TitleTable
+from app.retrieval.postings_store import PostingsStore, SegmentedIndex
+
+class PhoneticTokenIndex(SegmentedIndex):
+    """
+    Sound-alike retrieval channel: per-token Double Metaphone codes (primary and secondary) -> titles.
+    A query token matches a title when they share any code, so spelling variants such as
+    "Kashmeeri" / "Kashmiri" or "Jaagran" / "Jagran" are retrieved without an exact token hit.
+    Titles are ranked like the token channel: IDF of each matched query token (over the titles
+    sharing one of its codes), divided by the title's token count; ties keep catalogue order.
+    """
+    def __init__(self):
+        self.store = PostingsStore()
+        self.titles = TitleTable()                        # ordinal -> title object
+        self.ordinals = PackedKeys()                      # title id -> ordinal (live titles)
+        self.doc_lengths = np.zeros(0, dtype=np.int32)    # Grown geometrically; first len(titles) valid
+
+    def build_index(self, titles: list):
+        self.titles = TitleTable()
+        self.ordinals = PackedKeys()
+        self.doc_lengths = np.zeros(0, dtype=np.int32)
+        self.store.build(self._register(title_obj) for title_obj in titles)
+
+    def add_title(self, title_obj: dict):
+        """Incrementally indexes a newly accepted title; an existing id is replaced."""
+        self.remove_title(title_obj.get("id"))
+        self.store.add(*self._register(title_obj))
+
+    def remove_title(self, title_id) -> bool:
+        """Retires a title (tombstone until the next compaction); False for unknown ids."""
+        ordinal = self.ordinals.pop(title_id, None)
+        if ordinal is None:
+            return False
+        self.store.remove(ordinal, self._codes(self.titles[ordinal]))
+        return True
+
+    def top_candidates(self, query_tokens: list, k: int) -> list:
+        """Titles sharing a phonetic code with the query tokens, best first (at most `k`)."""
+        if k <= 0:
+            return []
+        total_docs = len(self.ordinals)
+        postings_parts = []
+        weight_parts = []
+        for codes in {self.token_codes(t) for t in query_tokens}:
+            parts = [self.store.get(c) for c in codes]
+            parts = [p for p in parts if len(p)]
+            if not parts:
+                continue
+            # One hit per title and query token, whichever of its codes matched
+            postings = np.unique(np.concatenate(parts)) if len(parts) > 1 else parts[0]
+            postings_parts.append(postings)
+            weight_parts.append(np.full(len(postings), math.log1p(total_docs / len(postings))))
+        if not postings_parts:
+            return []
+
+        matched, inverse = np.unique(np.concatenate(postings_parts), return_inverse=True)
+        scores = np.bincount(inverse, weights=np.concatenate(weight_parts), minlength=len(matched))
+        scores /= np.maximum(1.0, self.doc_lengths[matched])
+        if len(matched) > k:
+            kth = np.partition(-scores, k - 1)[k - 1]
+            keep = -scores <= kth
+            matched, scores = matched[keep], scores[keep]
+        order = np.lexsort((matched, -scores))[:k]
+        return self.titles.take(matched[order])
+
+    @staticmethod
+    def token_codes(token: str) -> frozenset:
+        return frozenset(code for code in doublemetaphone(token) if code)
+
+    def _register(self, title_obj: dict) -> tuple:
+        ordinal = len(self.titles)
+        self.titles.append(title_obj)
+        self.ordinals[title_obj.get("id")] = ordinal
+        if ordinal >= len(self.doc_lengths):
+            self.doc_lengths = np.resize(self.doc_lengths, max(1024, 2 * len(self.doc_lengths)))
+        self.doc_lengths[ordinal] = len(set(title_obj.get("normalized_title", "").split()))
+        return ordinal, self._codes(title_obj)
+
+    def _codes(self, title_obj: dict) -> set:
+        codes = set()
+        for token in set(title_obj.get("normalized_title", "").split()):
+            codes.update(self.token_codes(token))
+        return codes
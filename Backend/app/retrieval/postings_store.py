@@ -0,0 +1,175 @@
+import numpy as np
+from app.retrieval.packed_tables import PackedKeys
+
+class PostingsStore:
+    """
+    Key -> document-ordinal postings in segments:
+      - base:   NumPy CSR arrays (key id -> slice of an int32 array), replaced only by compaction
+      - frozen: the delta being compacted in the background (read-only until the new base is installed)
+      - delta:  per-key ordinal lists for documents added since, O(1) appends
+    Deleted documents are tombstoned (ordinal mask) and filtered out of lookups until a compaction
+    drops them. `counts` always holds live document frequencies. Keys map to dense integer ids
+    (a PackedKeys, so a snapshot maps the key table too); postings keep insertion order. Shared by
+    the token, trigram and phonetic retrieval indexes.
+    """
+    COMPACT_THRESHOLD = 1024  # Delta documents or tombstones that make the store due for compaction
+
+    def __init__(self):
+        self.key_ids = PackedKeys()                   # key -> key id
+        self.counts = np.zeros(0, dtype=np.int64)     # key id -> live postings length; grown geometrically
+        self.num_keys = 0
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.postings = np.zeros(0, dtype=np.int32)
+        self.frozen = {}         # key id -> ordinals being compacted
+        self.delta = {}          # key id -> ordinals added since the last freeze
+        self.delta_docs = 0
+        self.dead = np.zeros(0, dtype=bool)   # Tombstones by ordinal; grown geometrically
+        self.pending_deletes = 0              # Tombstones since the last freeze
+        self.compacting_deletes = 0           # Tombstones the running compaction drops
+
+    def __len__(self) -> int:
+        return self.num_keys
+
+    def build(self, doc_keys):
+        """`doc_keys` yields (ordinal, keys) pairs; replaces any previous content."""
+        self.__init__()
+        key_ids = []
+        ordinals = []
+        for ordinal, keys in doc_keys:
+            for key in keys:
+                key_ids.append(self.key_id(key, create=True))
+                ordinals.append(ordinal)
+
+        # Stable sort by key id keeps insertion order inside each postings list
+        key_ids = np.asarray(key_ids, dtype=np.int64)
+        self.postings = np.asarray(ordinals, dtype=np.int32)[np.argsort(key_ids, kind="stable")]
+        self.counts = np.bincount(key_ids, minlength=self.num_keys).astype(np.int64)
+        self.indptr = np.zeros(self.num_keys + 1, dtype=np.int64)
+        np.cumsum(self.counts, out=self.indptr[1:])
+        self.dead = np.zeros(int(self.postings.max()) + 1 if len(self.postings) else 0, dtype=bool)
+
+    def add(self, ordinal: int, keys):
+        """Appends one document to the delta segment."""
+        for key in keys:
+            kid = self.key_id(key, create=True)
+            self.counts[kid] += 1
+            self.delta.setdefault(kid, []).append(ordinal)
+        self.delta_docs += 1
+        self._cover(ordinal)
+
+    def remove(self, ordinal: int, keys):
+        """Tombstones one document (indexed under `keys`); its ordinal must not be reused."""
+        for key in keys:
+            kid = self.key_ids.get(key)
+            if kid is not None:
+                self.counts[kid] -= 1
+        self._cover(ordinal)
+        self.dead[ordinal] = True
+        self.pending_deletes += 1
+
+    def key_id(self, key, create: bool = False):
+        kid = self.key_ids.get(key)
+        if kid is None and create:
+            kid = self.key_ids[key] = self.num_keys
+            self.num_keys += 1
+            if kid >= len(self.counts):
+                self.counts = np.resize(self.counts, max(1024, 2 * len(self.counts)))
+            self.counts[kid] = 0
+        return kid
+
+    def get(self, key) -> np.ndarray:
+        kid = self.key_ids.get(key)
+        return self.postings[:0] if kid is None else self.postings_of(kid)
+
+    def postings_of(self, kid: int) -> np.ndarray:
+        postings = self.postings[self.indptr[kid]:self.indptr[kid + 1]] if kid + 1 < len(self.indptr) else self.postings[:0]
+        added = [segment[kid] for segment in (self.frozen, self.delta) if kid in segment]
+        if added:
+            postings = np.concatenate([postings] + [np.asarray(a, dtype=np.int32) for a in added])
+        if self.pending_deletes or self.compacting_deletes:
+            postings = postings[~self.dead[postings]]
+        return postings
+
+    @property
+    def needs_compaction(self) -> bool:
+        return not self.frozen and max(self.delta_docs, self.pending_deletes) >= self.COMPACT_THRESHOLD
+
+    def freeze(self) -> tuple:
+        """
+        Starts a compaction: the delta becomes the frozen segment and new documents go to a fresh
+        delta. Returns the compaction input for build_segments().
+        """
+        self.frozen, self.delta = self.delta, {}
+        self.delta_docs = 0
+        self.compacting_deletes, self.pending_deletes = self.pending_deletes, 0
+        return self.indptr, self.postings, self.frozen, self.num_keys, self.dead.copy()
+
+    @staticmethod
+    def build_segments(frozen: tuple) -> tuple:
+        """Merges base and frozen postings minus tombstones into new CSR arrays (reads only `frozen`)."""
+        base_indptr, base_postings, delta, num_keys, dead = frozen
+        old_keys = len(base_indptr) - 1
+        base_counts = np.zeros(num_keys, dtype=np.int64)
+        base_counts[:old_keys] = np.diff(base_indptr)
+        delta_counts = np.zeros(num_keys, dtype=np.int64)
+        for kid, added in delta.items():
+            delta_counts[kid] = len(added)
+
+        indptr = np.zeros(num_keys + 1, dtype=np.int64)
+        np.cumsum(base_counts + delta_counts, out=indptr[1:])
+        postings = np.empty(indptr[-1], dtype=np.int32)
+
+        # Base postings keep their offset inside the key's (now wider) slice
+        shift = indptr[:old_keys] - base_indptr[:-1]
+        base_keys = np.repeat(np.arange(old_keys), base_counts[:old_keys])
+        postings[np.arange(len(base_postings)) + shift[base_keys]] = base_postings
+        for kid, added in delta.items():
+            start = indptr[kid] + base_counts[kid]
+            postings[start:start + len(added)] = added
+
+        if dead.any():
+            keep = ~dead[postings]
+            kept_keys = np.repeat(np.arange(num_keys), np.diff(indptr))[keep]
+            postings = postings[keep]
+            indptr = np.zeros(num_keys + 1, dtype=np.int64)
+            np.cumsum(np.bincount(kept_keys, minlength=num_keys), out=indptr[1:])
+        return indptr, postings
+
+    def install(self, segments: tuple):
+        """Ends a compaction: the merged arrays replace the base and frozen segments."""
+        self.indptr, self.postings = segments
+        self.frozen = {}
+        self.compacting_deletes = 0
+
+    def compact(self):
+        """Synchronous compaction of every segment."""
+        self.install(self.build_segments(self.freeze()))
+
+    def _cover(self, ordinal: int):
+        if ordinal >= len(self.dead):
+            dead = np.zeros(max(1024, 2 * len(self.dead), ordinal + 1), dtype=bool)
+            dead[:len(self.dead)] = self.dead
+            self.dead = dead
+
+    def nbytes(self) -> int:
+        return self.indptr.nbytes + self.postings.nbytes + self.dead.nbytes + self.counts.nbytes
+
+
+class SegmentedIndex:
+    """
+    Background compaction protocol of an index built on a PostingsStore (`self.store`), driven by
+    IndexCompactor: freeze_segments() and install_segments() run with readers held back,
+    build_segments() in a worker thread while lookups continue.
+    """
+    @property
+    def needs_compaction(self) -> bool:
+        return self.store.needs_compaction
+
+    def freeze_segments(self):
+        return self.store.freeze()
+
+    def build_segments(self, frozen):
+        return self.store.build_segments(frozen)
+
+    def install_segments(self, built):
+        self.store.install(built)
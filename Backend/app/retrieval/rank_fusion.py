@@ -0,0 +1,51 @@
+class ReciprocalRankFusion:
+    """
+    Merges the ranked candidate lists of several retrieval channels (token IDF, transliterated and
+    romanized fields, trigram, phonetic, ANN) into one list for the scoring stage.
+    A title scores sum(1 / (k + rank)) over the channels that returned it (rank from 1), so titles
+    found by several channels, or ranked high by one, are scored first; duplicates across channels
+    are merged by title id. Ties keep channel order, then rank.
+    """
+    def __init__(self, k: int = 60):
+        self.k = k
+
+    def retrieve(self, channels: list, budget: int) -> tuple:
+        """
+        Fuses the channel lookups. `channels` holds (name, result) pairs, each result being that
+        channel's ranked (already capped) hits, or (hits, matched) when the channel counts more
+        matches than it returns.
+        Returns (fused candidates, per-channel stats with "matched", distinct titles across the
+        returned hits).
+        """
+        ranked_lists, matched = [], {}
+        for name, result in channels:
+            hits, matched[name] = result if isinstance(result, tuple) else (result, len(result))
+            ranked_lists.append((name, hits))
+        fused, stats, distinct = self.fuse(ranked_lists, budget)
+        for name, hits in ranked_lists:
+            stats[name]["matched"] = matched[name]
+        return fused, stats, distinct
+
+    def fuse(self, ranked_lists: list, budget: int) -> tuple:
+        """(name, ranked hits) pairs -> (top `budget` fused candidates, per-channel stats, distinct titles)."""
+        scores = {}
+        candidates = {}
+        sources = {}
+        for name, hits in ranked_lists:
+            for rank, candidate in enumerate(hits, start=1):
+                key = candidate.get("id")
+                if key not in candidates:
+                    candidates[key] = candidate
+                    scores[key] = 0.0
+                    sources[key] = []
+                scores[key] += 1.0 / (self.k + rank)
+                sources[key].append(name)
+
+        # dicts keep first-seen order, and sorted() is stable, so ties keep channel order, then rank
+        fused = sorted(candidates, key=lambda key: -scores[key])[:max(0, budget)]
+
+        stats = {name: {"hits": len(hits), "kept": 0} for name, hits in ranked_lists}
+        for key in fused:
+            for name in sources[key]:
+                stats[name]["kept"] += 1
+        return [candidates[key] for key in fused], stats, len(candidates)
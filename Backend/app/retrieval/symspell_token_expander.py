@@ -0,0 +1,85 @@
+from rapidfuzz.distance import OSA
+from app.retrieval.packed_tables import PackedGroups, PackedKeys, PackedList
+
+class SymSpellTokenExpander:
+    """
+    Symmetric-deletion (SymSpell) dictionary over the catalogue token vocabulary.
+    Every vocabulary token is filed under each string obtained by deleting up to `max_edits`
+    characters; the deletes of a misspelt query token then reach every vocabulary token within
+    that edit distance through a bounded number of dict lookups (verified with OSA distance,
+    i.e. Damerau-Levenshtein without repeated edits of a substring), whatever the vocabulary size.
+    Memory-bounded mode (`prefix_length`) generates deletes from each token's first
+    `prefix_length` characters only, capping entries per token at the cost of more verifications.
+    The vocabulary and the deletes are packed tables, mapped (not unpickled) from a snapshot.
+    """
+    MAX_CORRECTIONS = 3  # Nearest vocabulary tokens kept per misspelt query token
+
+    def __init__(self, max_edits: int = 2, prefix_length: int = 7):
+        self.max_edits = max_edits
+        self.prefix_length = prefix_length or None  # None / 0: deletes over whole tokens
+        self.vocabulary = PackedList()  # token id -> token
+        self.token_ids = PackedKeys()   # token -> token id
+        self.deletes = PackedGroups()   # delete string -> token ids
+
+    def build_index(self, titles: list):
+        self.vocabulary = PackedList()
+        self.token_ids = PackedKeys()
+        self.deletes = PackedGroups()
+        for title_obj in titles:
+            self.add_title(title_obj)
+
+    def add_title(self, title_obj: dict):
+        """Adds the new title's tokens to the vocabulary."""
+        for token in title_obj.get("normalized_title", "").split():
+            if token not in self.token_ids:
+                self._add_token(token)
+
+    def edits_for(self, token: str) -> int:
+        # Short tokens tolerate fewer edits: two edits on a 4-letter word reach half the vocabulary
+        if len(token) <= 3:
+            return 0
+        if len(token) <= 5:
+            return min(1, self.max_edits)
+        return self.max_edits
+
+    def expand(self, tokens: list) -> list:
+        """
+        Nearest vocabulary tokens for the query tokens that are not in the vocabulary
+        (smallest edit distance first, at most MAX_CORRECTIONS each); known tokens are not expanded.
+        """
+        corrections = []
+        for token in dict.fromkeys(tokens):
+            if token in self.token_ids:
+                continue
+            max_edits = self.edits_for(token)
+            if max_edits == 0:
+                continue
+            found = {}
+            for key in self._deletes_of(token, max_edits):
+                for tid in self.deletes.get(key, ()):
+                    if tid in found:
+                        continue
+                    distance = OSA.distance(token, self.vocabulary[tid], score_cutoff=max_edits)
+                    found[tid] = distance
+            matches = sorted((d, self.vocabulary[tid]) for tid, d in found.items() if d <= max_edits)
+            if matches:
+                best = matches[0][0]
+                corrections.extend(t for d, t in matches[:self.MAX_CORRECTIONS] if d == best)
+        return corrections
+
+    def _add_token(self, token: str):
+        tid = self.token_ids[token] = len(self.vocabulary)
+        self.vocabulary.append(token)
+        for key in self._deletes_of(token, self.max_edits):
+            self.deletes.append(key, tid)
+
+    def _deletes_of(self, token: str, max_edits: int) -> set:
+        # The (prefix of the) token itself plus every string up to `max_edits` deletions away
+        if self.prefix_length:
+            token = token[:self.prefix_length]
+        keys = {token}
+        frontier = {token}
+        for _ in range(max_edits):
+            frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+            keys |= frontier
+        return keys
@@ -0,0 +1,155 @@
+import sys
+import unicodedata
+import numpy as np
+from metaphone import doublemetaphone
+from app.preprocessing.normalization_pipeline import NormalizationPipeline
+from app.preprocessing.transliteration_normalizer import TransliterationNormalizer
+from app.intelligence.lexical_similarity_engine import LexicalSimilarityEngine
+from app.intelligence.concept_clusters import get_cluster_roots
+
+class TitleFeatures:
+    """Derived forms of one title used by candidate scoring and conflict highlighting."""
+    __slots__ = (
+        "lower",          # NFKC-normalized, stripped, lowercased title
+        "norm",           # TransliterationNormalizer output
+        "canonical",      # Space-agnostic canonical form
+        "trigrams",       # Character 3-grams (space-stripped)
+        "codes_lower",    # Double Metaphone (primary, secondary) of `lower`
+        "codes_norm",     # Double Metaphone (primary, secondary) of `norm`
+        "word_codes",     # Primary Double Metaphone code per whitespace token
+        "tokens",         # Lowercased whitespace tokens
+        "concept_roots",  # Concept cluster keys reached by `norm`
+    )
+
+    def __init__(self, lower, norm, canonical, trigrams, codes_lower, codes_norm, word_codes, tokens, concept_roots):
+        self.lower = lower
+        self.norm = norm
+        self.canonical = canonical
+        self.trigrams = trigrams
+        self.codes_lower = codes_lower
+        self.codes_norm = codes_norm
+        self.word_codes = word_codes
+        self.tokens = tokens
+        self.concept_roots = concept_roots
+
+
+class TitleFeatureStore:
+    """
+    Per-title feature cache keyed by title id.
+    Features are computed once when the index is built or a title is submitted,
+    so the scoring loop only derives the query side per request.
+    A pickled store (index snapshot) is packed into flat arrays: sorted ids plus one UTF-8 record per
+    title, mapped instead of unpickled, so startup does not re-create every title's objects; a
+    record is decoded on the title's first lookup.
+    """
+    _FIELD_SEP = "\x1f"  # Between the fields of a packed record
+    _ITEM_SEP = "\x1e"   # Before every item of a tuple / set field
+
+    def __init__(self):
+        self.normalizer = NormalizationPipeline()
+        self.transliteration_normalizer = TransliterationNormalizer()
+        self.features = {}   # title id -> features, for titles built or submitted in this process
+        self.packed = None   # (sorted int64 ids, int64 record offsets, uint8 UTF-8 records) from a snapshot
+        self.decoded = {}    # title id -> features decoded from `packed` so far
+
+    def __len__(self) -> int:
+        packed = len(self.packed[0]) if self.packed is not None else 0
+        return packed + sum(1 for title_id in self.features if self._packed_row(title_id) is None)
+
+    def __getstate__(self):
+        features = {}
+        if self.packed is not None:
+            features = {title_id: self._unpack(row) for row, title_id in enumerate(self.packed[0].tolist())}
+        features.update(self.features)
+        state = self.__dict__.copy()
+        state["decoded"] = {}
+        state["packed"] = self._pack(features)
+        state["features"] = {} if state["packed"] is not None else features
+        return state
+
+    def build_index(self, titles: list):
+        self.features.clear()
+        self.packed = None
+        self.decoded = {}
+        for title_obj in titles:
+            self.add_title(title_obj)
+
+    def add_title(self, title_obj: dict):
+        self.features[title_obj.get("id")] = self.extract(title_obj.get("title", ""))
+
+    def get(self, title_obj: dict) -> TitleFeatures:
+        """Stored features for a catalogue title (computed on the fly if it was never indexed)."""
+        title_id = title_obj.get("id")
+        features = self.features.get(title_id) or self.decoded.get(title_id)
+        if features is None:
+            row = self._packed_row(title_id)
+            if row is None:
+                return self.extract(title_obj.get("title", ""))
+            features = self.decoded[title_id] = self._unpack(row)
+        return features
+
+    def extract(self, title: str) -> TitleFeatures:
+        # Interning keeps repeated tokens / codes shared across the whole catalogue
+        intern = sys.intern
+        lower = unicodedata.normalize('NFKC', title).strip().lower()
+        norm = self.transliteration_normalizer.normalize(title)
+        return TitleFeatures(
+            lower=lower,
+            norm=norm,
+            canonical=self.normalizer.canonical_form(title),
+            trigrams=frozenset(intern(g) for g in LexicalSimilarityEngine.ngram_set(title, 3)),
+            codes_lower=tuple(intern(c) for c in doublemetaphone(lower)),
+            codes_norm=tuple(intern(c) for c in doublemetaphone(norm)),
+            word_codes=tuple(intern(doublemetaphone(w)[0]) for w in title.split()),
+            tokens=frozenset(intern(t) for t in title.lower().split()),
+            concept_roots=get_cluster_roots(norm),
+        )
+
+    def _packed_row(self, title_id):
+        if self.packed is None or type(title_id) is not int:
+            return None
+        ids = self.packed[0]
+        row = int(np.searchsorted(ids, title_id))
+        return row if row < len(ids) and ids[row] == title_id else None
+
+    @classmethod
+    def _pack(cls, features: dict):
+        # None when an id is not an int64 or a text contains a separator (features stay objects then)
+        if not all(type(title_id) is int and -2 ** 63 <= title_id < 2 ** 63 for title_id in features):
+            return None
+        ids = sorted(features)
+        records = []
+        for title_id in ids:
+            f = features[title_id]
+            fields = [f.trigrams, f.codes_lower, f.codes_norm, f.word_codes, f.tokens, f.concept_roots]
+            texts = [f.lower, f.norm, f.canonical, *(item for field in fields for item in field)]
+            if any(cls._FIELD_SEP in text or cls._ITEM_SEP in text for text in texts):
+                return None
+            record = cls._FIELD_SEP.join(
+                [f.lower, f.norm, f.canonical] + ["".join(cls._ITEM_SEP + item for item in field) for field in fields]
+            )
+            records.append(record.encode("utf-8"))
+        offsets = np.zeros(len(records) + 1, dtype=np.int64)
+        np.cumsum([len(record) for record in records], out=offsets[1:])
+        blob = np.frombuffer(b"".join(records), dtype=np.uint8)
+        return np.array(ids, dtype=np.int64), offsets, blob
+
+    def _unpack(self, row: int) -> TitleFeatures:
+        intern = sys.intern
+        _, offsets, blob = self.packed
+        record = blob[offsets[row]:offsets[row + 1]].tobytes().decode("utf-8")
+        lower, norm, canonical, *fields = record.split(self._FIELD_SEP)
+        trigrams, codes_lower, codes_norm, word_codes, tokens, roots = (
+            [intern(item) for item in field.split(self._ITEM_SEP)[1:]] for field in fields
+        )
+        return TitleFeatures(
+            lower=lower,
+            norm=norm,
+            canonical=canonical,
+            trigrams=frozenset(trigrams),
+            codes_lower=tuple(codes_lower),
+            codes_norm=tuple(codes_norm),
+            word_codes=tuple(word_codes),
+            tokens=frozenset(tokens),
+            concept_roots=frozenset(roots),
+        )
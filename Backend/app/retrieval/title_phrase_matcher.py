@@ -0,0 +1,56 @@
+from app.retrieval.packed_tables import PackedGroups
+
+class TitlePhraseMatcher:
+    """
+    Word-boundary-aware multi-pattern matcher over catalogue normalized titles.
+    A catalogue title can only occur in the query as a whole-word phrase between two word
+    boundaries, so every boundary-to-boundary span of the query is looked up at once in a hashed
+    pattern table, replacing a per-title substring + regex loop for combination detection.
+    The pattern table is packed, mapped (not unpickled) from a snapshot.
+    """
+    MIN_PATTERN_LEN = 3  # Titles of 1-2 chars are too noisy to count as components
+
+    def __init__(self):
+        self.ordinals = PackedGroups()  # pattern -> catalogue ordinals of titles with that normalized form
+        self.total_titles = 0
+
+    def build_index(self, titles: list):
+        self.ordinals = PackedGroups()
+        self.total_titles = 0
+        for title_obj in titles:
+            self.add_title(title_obj)
+
+    def add_title(self, title_obj: dict):
+        """Incrementally indexes a newly accepted title."""
+        pattern = title_obj["normalized_title"].lower()
+        ordinal = self.total_titles
+        self.total_titles += 1
+        if len(pattern) >= self.MIN_PATTERN_LEN:
+            self.ordinals.append(pattern, ordinal)
+
+    def find_components(self, text: str) -> list:
+        """
+        Returns the existing titles found in `text` as whole-word phrases (regex \\b semantics),
+        one entry per matching catalogue title, in catalogue order.
+        """
+        bounds = [pos for pos in range(len(text) + 1) if self._is_boundary(text, pos)]
+        spans = [
+            (start, end)
+            for i, start in enumerate(bounds)
+            for end in bounds[i + 1:]
+            if end - start >= self.MIN_PATTERN_LEN
+        ]
+        matched = {}
+        for start, end, ordinals in self.ordinals.find_spans(text, spans):
+            matched.setdefault(text[start:end], ordinals)
+
+        hits = [(ordinal, pattern) for pattern, ordinals in matched.items() for ordinal in ordinals]
+        hits.sort()
+        return [pattern for _, pattern in hits]
+
+    @staticmethod
+    def _is_boundary(text: str, pos: int) -> bool:
+        # Same definition as regex \b on str patterns: word chars are alphanumerics and '_'
+        before = pos > 0 and (text[pos - 1].isalnum() or text[pos - 1] == "_")
+        after = pos < len(text) and (text[pos].isalnum() or text[pos] == "_")
+        return before != after
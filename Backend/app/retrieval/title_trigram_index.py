@@ -0,0 +1,74 @@
+import math
+import numpy as np
+from app.retrieval.packed_tables import PackedKeys, TitleTable
+from app.retrieval.postings_store import PostingsStore, SegmentedIndex
+
+class TitleTrigramIndex(SegmentedIndex):
+    """
+    Character trigram postings over space-agnostic canonical titles.
+    Recovers candidates the token channel misses (typos inside a token, glued or split words):
+    a title qualifies when it shares at least `min_shared` distinct trigrams with the query
+    (count filtering, q-gram lemma for up to `max_edits` edits), and the best `k` by shared
+    count are returned (ties keep catalogue order).
+    """
+    Q = 3
+
+    def __init__(self, max_edits: int = 2):
+        self.max_edits = max_edits
+        self.store = PostingsStore()
+        self.titles = TitleTable()    # ordinal -> title object
+        self.ordinals = PackedKeys()  # title id -> ordinal (live titles)
+
+    def build_index(self, titles: list):
+        self.titles = TitleTable()
+        self.ordinals = PackedKeys()
+        self.store.build(self._register(title_obj) for title_obj in titles)
+
+    def add_title(self, title_obj: dict):
+        """Incrementally indexes a newly accepted title; an existing id is replaced."""
+        self.remove_title(title_obj.get("id"))
+        self.store.add(*self._register(title_obj))
+
+    def remove_title(self, title_id) -> bool:
+        """Retires a title (tombstone until the next compaction); False for unknown ids."""
+        ordinal = self.ordinals.pop(title_id, None)
+        if ordinal is None:
+            return False
+        self.store.remove(ordinal, self.trigrams(self.titles[ordinal].get("canonical_title", "")))
+        return True
+
+    def min_shared(self, query_grams: int) -> int:
+        # q-gram lemma: each edit destroys at most Q grams; never accept less than half the query's grams
+        return max(1, query_grams - self.Q * self.max_edits, math.ceil(query_grams / 2))
+
+    def top_candidates(self, query_canonical: str, k: int) -> list:
+        """Titles sharing enough trigrams with `query_canonical`, most shared first (at most `k`)."""
+        grams = self.trigrams(query_canonical)
+        if not grams or k <= 0:
+            return []
+        parts = [self.store.get(g) for g in grams]
+        parts = [p for p in parts if len(p)]
+        threshold = self.min_shared(len(grams))
+        if len(parts) < threshold:
+            return []
+
+        # Count filtering: shared distinct trigrams per title
+        matched, shared = np.unique(np.concatenate(parts), return_counts=True)
+        keep = shared >= threshold
+        matched, shared = matched[keep], shared[keep]
+        if len(matched) > k:
+            kth = np.partition(-shared, k - 1)[k - 1]
+            keep = -shared <= kth
+            matched, shared = matched[keep], shared[keep]
+        order = np.lexsort((matched, -shared))[:k]
+        return self.titles.take(matched[order])
+
+    @classmethod
+    def trigrams(cls, canonical: str) -> set:
+        return {canonical[i:i + cls.Q] for i in range(len(canonical) - cls.Q + 1)}
+
+    def _register(self, title_obj: dict) -> tuple:
+        ordinal = len(self.titles)
+        self.titles.append(title_obj)
+        self.ordinals[title_obj.get("id")] = ordinal
+        return ordinal, self.trigrams(title_obj.get("canonical_title", ""))
@@ -1,8 +1,14 @@
 """
 Offline FAISS index builder.
-Run this ONCE (or whenever Dataset.json changes) to prebuild the index.
-Usage: python build_index.py
+Run this ONCE (or whenever Database.json changes) to prebuild the index.
+Usage: python build_index.py [max_titles] [--type hnsw-flat|hnsw-sq8|ivf-pq] [--pca DIM]
+                             [--nlist N] [--pq-m M] [--report]
+Quantized types (and PCA) also write float16 copies of the vectors; the API re-ranks the top
+ANN_RERANK_K hits on them exactly. --report measures recall@k against exact flat search (stored
+in the metadata too) to pick a memory / recall trade-off.
 """
+import argparse
+import asyncio
 import json
 import os
 import time
@@ -13,72 +19,164 @@ import faiss
 import sys
 sys.path.insert(0, os.path.dirname(__file__))
 
+from app.configuration.system_config import settings
 from app.intelligence.semantic_similarity_engine import SemanticSimilarityEngine
+from app.persistence import index_snapshot
+from app.persistence.title_repository import TitleRepository
+from app.retrieval.ann_vector_search import ANNVectorSearch, INDEX_TYPES, exact_rerank, index_description, recall_at_k
 
-DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
-DATASET_PATH = os.path.join(DATA_DIR, "Dataset.json")
-INDEX_PATH = os.path.join(DATA_DIR, "faiss_index.bin")
-META_PATH = os.path.join(DATA_DIR, "faiss_metadata.json")
+INDEX_PATH = ANNVectorSearch.DEFAULT_INDEX_PATH
+META_PATH = ANNVectorSearch.DEFAULT_METADATA_PATH
+VECTORS_PATH = ANNVectorSearch.DEFAULT_VECTORS_PATH
 
+TRAIN_SAMPLE = 100_000   # Vectors used to train PCA / SQ ranges / IVF centroids / PQ codebooks
+REPORT_K = (1, 10, 20)
 
-def load_titles():
-    titles = []
-    with open(DATASET_PATH, "r", encoding="utf-8") as f:
-        for line in f:
-            if not line.strip():
-                continue
-            row = json.loads(line)
-            title = row.get("title") or row.get("headline") or "Untitled"
-            titles.append({
-                "id": row.get("id", len(titles)),
-                "title": title,
-                "normalized_title": row.get("normalized_title", title.lower())
-            })
-    return titles
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Prebuild the FAISS index for semantic mode.")
+    # Optional title limit for quick test builds (a partial index still loads: validation only
+    # requires every indexed id to exist in the catalogue)
+    parser.add_argument("max_titles", nargs="?", type=int, default=None)
+    parser.add_argument("--type", dest="index_type", choices=list(INDEX_TYPES), default="hnsw-flat")
+    parser.add_argument("--pca", type=int, default=0, help="Reduce vectors to this dimension first (0 = off)")
+    parser.add_argument("--nlist", type=int, default=0, help="IVF lists (0 = ~4 * sqrt(titles))")
+    parser.add_argument("--pq-m", type=int, default=0, help="PQ bytes per vector (0 = dimension / 8)")
+    parser.add_argument("--report", action="store_true", help="Measure recall@k against exact flat search")
+    parser.add_argument("--report-queries", type=int, default=1000)
+    return parser.parse_args()
+
+
+def build_faiss_index(embeddings: np.ndarray, description: str) -> faiss.Index:
+    index = faiss.index_factory(embeddings.shape[1], description)
+    if not index.is_trained:
+        rng = np.random.default_rng(0)
+        sample = embeddings[rng.choice(len(embeddings), min(TRAIN_SAMPLE, len(embeddings)), replace=False)]
+        index.train(sample)
+    index.add(embeddings)
+    return index
+
+
+def set_search_parameters(index: faiss.Index, index_type: str):
+    # Same search breadth as the API (ANNVectorSearch.load)
+    if index_type == "ivf-pq":
+        faiss.ParameterSpace().set_index_parameter(index, "nprobe", settings.ANN_NPROBE)
+    else:
+        faiss.ParameterSpace().set_index_parameter(index, "efSearch", settings.ANN_EF_SEARCH)
+
+
+def recall_report(index: faiss.Index, embeddings: np.ndarray, rerank_vectors, queries: int) -> dict:
+    """
+    recall@k of the built index against exact flat search, with and without the float16 re-rank.
+    Queries are catalogue vectors sampled at random (a title always finds itself under flat search,
+    so recall@1 also shows how often quantization loses the exact match).
+    """
+    rng = np.random.default_rng(1)
+    query_vectors = embeddings[rng.choice(len(embeddings), min(queries, len(embeddings)), replace=False)]
+    k = min(max(REPORT_K), len(embeddings))
+
+    flat = faiss.IndexFlatL2(embeddings.shape[1])
+    flat.add(embeddings)
+    _, truth = flat.search(query_vectors, k)
+
+    start = time.time()
+    _, approximate = index.search(query_vectors, k)
+    report = {
+        "queries": len(query_vectors),
+        "ann": {f"recall@{n}": round(recall_at_k(approximate, truth, n), 4) for n in REPORT_K if n <= k},
+        "ann_ms_per_query": round((time.time() - start) * 1000 / len(query_vectors), 3),
+    }
+    if rerank_vectors is not None and settings.ANN_RERANK_K:
+        start = time.time()
+        _, shortlist = index.search(query_vectors, min(max(settings.ANN_RERANK_K, k), index.ntotal))
+        _, reranked = exact_rerank(query_vectors, shortlist, rerank_vectors, k)
+        report["reranked"] = {f"recall@{n}": round(recall_at_k(reranked, truth, n), 4) for n in REPORT_K if n <= k}
+        report["reranked_ms_per_query"] = round((time.time() - start) * 1000 / len(query_vectors), 3)
+        report["rerank_k"] = settings.ANN_RERANK_K
+    return report
 
 
 def main():
-    print(f"Loading titles from {DATASET_PATH}...")
-    titles = load_titles()
-    # TRUNCATE FOR TEST BUILD
-    titles = titles[:1000] 
+    args = parse_args()
+
+    repo = TitleRepository()
+    print(f"Loading titles from {os.path.abspath(repo.json_path)}...")
+    titles = asyncio.run(repo.get_all_titles())
+    if args.max_titles:
+        titles = titles[:args.max_titles]
     print(f"Loaded {len(titles)} titles for build.")
 
     sbert = SemanticSimilarityEngine()
     print(f"Loading model: {sbert.model_name}...")
-    
+
     title_texts = [t["title"] for t in titles]
-    
+
     print(f"Encoding {len(title_texts)} titles in small batches...")
     start = time.time()
-    # Use even smaller batch size for stability in this environment
-    embeddings = sbert.encode_batch(title_texts, batch_size=16) 
+    # Use even smaller batch size for stability in this environment (cached titles skip the model)
+    embeddings = sbert.encode_batch(title_texts, batch_size=16)
     elapsed = time.time() - start
-    
+
     if embeddings is None:
         print("FAILED: Embeddings are None")
         return
 
     print(f"Encoding complete in {elapsed:.1f}s. Shape: {embeddings.shape}")
+    if sbert.embedding_cache:
+        print(f"Embedding cache: {sbert.embedding_cache.stats()}")
+    embeddings = np.ascontiguousarray(embeddings, dtype='float32')
 
-    # Build FAISS HNSW index
+    # Build the FAISS index of the selected type
     dim = embeddings.shape[1]
-    index = faiss.IndexHNSWFlat(dim, 32)
-    index.hnsw.efConstruction = 40
-    index.hnsw.efSearch = 16
-    index.add(embeddings)
-    print(f"FAISS HNSW index built: {index.ntotal} vectors, dim={dim}")
+    description = index_description(args.index_type, dim, len(embeddings), args.pca, args.nlist, args.pq_m)
+    start = time.time()
+    index = build_faiss_index(embeddings, description)
+    set_search_parameters(index, args.index_type)
+    print(f"FAISS index built ({description}): {index.ntotal} vectors, dim={dim}, in {time.time() - start:.1f}s")
 
     # Save index
     faiss.write_index(index, INDEX_PATH)
     print(f"Index saved to {INDEX_PATH}")
 
-    # Save metadata (titles list)
+    # Lossy layouts keep float16 vectors for exact re-ranking of their top hits
+    rerank_vectors = None
+    if args.index_type != "hnsw-flat" or args.pca:
+        rerank_vectors = embeddings.astype('float16')
+        np.save(VECTORS_PATH, rerank_vectors)
+        print(f"Re-rank vectors saved to {VECTORS_PATH}")
+
+    sizes = {
+        "flat_vectors": embeddings.nbytes,
+        "index": os.path.getsize(INDEX_PATH),
+        "rerank_vectors": os.path.getsize(VECTORS_PATH) if rerank_vectors is not None else 0,
+    }
+    print("Size: " + ", ".join(f"{name} {size / (1024 * 1024):.1f} MB" for name, size in sizes.items()))
+
+    report = None
+    if args.report:
+        report = recall_report(index, embeddings, rerank_vectors, args.report_queries)
+        print(f"Recall against exact flat search ({report['queries']} queries): {json.dumps(report)}")
+
+    # Save metadata: catalogue fingerprint + title id per vector (checked by the API before mapping the index)
+    metadata = {
+        "format_version": ANNVectorSearch.METADATA_VERSION,
+        "source": index_snapshot.source_fingerprint(repo.json_path, params=sbert.index_params),
+        "model": sbert.model_name,
+        "dimension": dim,
+        "index_type": args.index_type,
+        "description": description,
+        "pca_dim": args.pca,
+        "rerank_vectors": os.path.basename(VECTORS_PATH) if rerank_vectors is not None else None,
+        "bytes": sizes,
+        "recall": report,
+        "created": time.time(),
+        "ids": [t["id"] for t in titles],
+    }
     with open(META_PATH, "w", encoding="utf-8") as f:
-        json.dump(titles, f, ensure_ascii=False)
+        json.dump(metadata, f, ensure_ascii=False)
     print(f"Metadata saved to {META_PATH}")
 
-    print("Done! The backend will now load this index instantly on startup.")
+    print("Done! Start the backend with SEMANTIC_MODE=true to map this index on startup.")
 
 
 if __name__ == "__main__":
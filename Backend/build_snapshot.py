@@ -0,0 +1,44 @@
+"""
+Offline index snapshot builder.
+Run whenever Database.json (or an index setting) changes; API workers then map the snapshot
+on startup instead of parsing the dataset and rebuilding every index.
+Usage: python build_snapshot.py [output_path]
+"""
+import asyncio
+import os
+import sys
+import time
+
+# Ensure we can import the engine
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app.configuration.system_config import settings
+from app.main import app, build_indexes, snapshot_source
+from app.persistence import index_snapshot
+from app.persistence.title_repository import TitleRepository
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else (settings.INDEX_SNAPSHOT_PATH or index_snapshot.DEFAULT_PATH)
+
+    start = time.time()
+    titles = asyncio.run(TitleRepository().get_all_titles())
+    if not titles:
+        print("FAILED: No titles found")
+        return
+    print(f"Loaded {len(titles)} titles in {time.time() - start:.1f}s.")
+
+    start = time.time()
+    build_indexes(titles)
+    print(f"Indexes built in {time.time() - start:.1f}s.")
+
+    start = time.time()
+    indexes = {name: getattr(app.state, name) for name in index_snapshot.SNAPSHOT_INDEXES}
+    header = index_snapshot.write_snapshot(path, titles, indexes, snapshot_source())
+    size_mb = os.path.getsize(path) / (1024 * 1024)
+    print(f"Snapshot written to {path} in {time.time() - start:.1f}s "
+          f"({size_mb:.1f} MB, {len(header['arrays'])} array sections, format v{header['format_version']}).")
+
+
+if __name__ == "__main__":
+    main()
@@ -12,8 +12,8 @@ import sys
 # Add current dir to sys.path
 sys.path.insert(0, os.path.dirname(__file__))
 
+from app.main import create_indexes, build_indexes
 from app.persistence.title_repository import TitleRepository
-from app.retrieval.inverted_token_index import InvertedTokenIndex
 from app.orchestration.mesh_orchestrator import MeshOrchestrator
 
 async def run_benchmarks():
@@ -26,12 +26,12 @@ async def run_benchmarks():
         print("❌ Error: No titles found in Dataset.json")
         return
 
-    # Initialize Index
-    token_index = InvertedTokenIndex()
-    token_index.build_index(titles)
+    # Initialize Indexes (same set and build steps as the server)
+    indexes = create_indexes()
+    build_indexes(titles, indexes)
     
-    # Initialize Orchestrator (Lexical Mode)
-    orchestrator = MeshOrchestrator(token_index=token_index, sbert_available=False)
+    # Initialize Orchestrator (Lexical Mode, no result cache so repeated titles are re-scored)
+    orchestrator = MeshOrchestrator(sbert_available=False, **indexes)
     
     # --- TEST 1: RECALL ON CONTROLLED VARIANTS ---
     print("\n🎯 Test 1: Measuring Recall on Controlled Variants...")
@@ -0,0 +1,65 @@
+import random
+
+import numpy as np
+
+from app.intelligence.batch_similarity_engine import BatchSimilarityEngine, CONFLICT_FLOOR
+from app.retrieval.title_feature_store import TitleFeatureStore
+
+WORDS = [
+    "prime", "sunrise", "age", "news", "nav", "dispatch", "today", "southern", "samachar", "daily",
+    "bharat", "times", "herald", "express", "morning", "voice", "jan", "sandesh", "prabhat", "khabar",
+]
+
+
+def random_title(rng):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(1, 4))]
+    if rng.random() < 0.3:
+        # Typo: drop or double one character
+        i = rng.randrange(len(words))
+        j = rng.randrange(len(words[i]))
+        words[i] = words[i][:j] + words[i][j + 1:] if rng.random() < 0.5 else words[i][:j] + words[i][j] + words[i][j:]
+    return " ".join(w for w in words if w).title()
+
+
+def report(final, resolved, lexical, phonetic, titles):
+    # Same selection as MeshOrchestrator: argmax best match, top 5 conflicts on rounded scores
+    best = int(np.argmax(final))
+    conflicts = [int(i) for i in np.flatnonzero(resolved & (final > CONFLICT_FLOOR))]
+    conflicts.sort(key=lambda i: -round(float(final[i]), 4))
+    return (
+        (titles[best], round(float(final[best]), 4)),
+        [(titles[i], round(float(final[i]), 4), "Lexical" if lexical[i] > phonetic[i] else "Phonetic") for i in conflicts[:5]],
+    )
+
+
+def test_pruned_scoring_matches_unpruned_baseline():
+    rng = random.Random(9)
+    store = TitleFeatureStore()
+    scorer = BatchSimilarityEngine()
+    for _ in range(300):
+        query = random_title(rng)
+        titles = [random_title(rng) for _ in range(rng.randint(5, 60))]
+        query_features = store.extract(query)
+        features = [store.extract(t) for t in titles]
+        words_count = len(query.split())
+
+        # Pruned: block by block, earlier exact scores seeding the bounds (as in the orchestrator)
+        block_size = rng.randint(4, 32)
+        blocks = []
+        for start in range(0, len(features), block_size):
+            known = np.concatenate([b["final"][b["resolved"]] for b in blocks]) if blocks else None
+            blocks.append(scorer.score(query_features, features[start:start + block_size], words_count, known_finals=known))
+        pruned = {key: np.concatenate([b[key] for b in blocks]) for key in blocks[0] if key != "pruned"}
+
+        # Unpruned baseline: exact phonetic score for every candidate
+        phonetic = np.array([scorer.phonetic_similarity(query_features, f) for f in features])
+        final = BatchSimilarityEngine.combine({
+            "lexical": pruned["lexical"], "phonetic": phonetic,
+            "semantic": pruned["semantic"], "containment": pruned["containment"],
+        }, words_count)
+
+        expected = report(final, np.ones(len(final), dtype=bool), pruned["lexical"], phonetic, titles)
+        actual = report(pruned["final"], pruned["resolved"], pruned["lexical"], pruned["phonetic"], titles)
+        assert actual == expected, query
+        assert np.allclose(pruned["final"][pruned["resolved"]], final[pruned["resolved"]])
+        assert (pruned["final"][~pruned["resolved"]] <= CONFLICT_FLOOR).all()
@@ -0,0 +1,62 @@
+import asyncio
+import random
+
+from app.orchestration.mesh_orchestrator import MeshOrchestrator
+from app.persistence.title_repository import TitleRepository
+from app.retrieval.canonical_title_index import CanonicalTitleIndex
+
+MIN_LEN = CanonicalTitleIndex.MIN_CONTAINMENT_LEN
+
+
+def linear_scan(titles, query):
+    # Reference: the original per-title loop in catalogue order, earliest clash wins
+    for title_obj in titles:
+        if len(title_obj["title"]) < 2:
+            continue
+        canonical = title_obj["canonical_title"]
+        if canonical == query:
+            return title_obj
+        if len(canonical) > MIN_LEN and canonical in query:
+            return title_obj
+        if len(query) > MIN_LEN and query in canonical:
+            return title_obj
+    return None
+
+
+def random_titles(rng, count, start_id=0):
+    words = ["sun", "daily", "times", "news", "bharat", "samachar", "express", "herald", "jan", "voice"]
+    titles = []
+    for i in range(count):
+        canonical = "".join(rng.choice(words) for _ in range(rng.randint(1, 5)))
+        titles.append({"id": start_id + i, "title": canonical, "canonical_title": canonical})
+    return titles
+
+
+def test_find_match_equals_linear_scan_across_rebuilds():
+    rng = random.Random(7)
+    CanonicalTitleIndex.REBUILD_THRESHOLD = 16
+    try:
+        titles = random_titles(rng, 300)
+        index = CanonicalTitleIndex()
+        index.build_index(titles)
+        # Incremental adds cross the rebuild threshold several times
+        for title_obj in random_titles(rng, 100, start_id=300):
+            titles.append(title_obj)
+            index.add_title(title_obj)
+            queries = [t["canonical_title"] for t in random_titles(rng, 5)]
+            queries += [rng.choice(titles)["canonical_title"][1:], "sun" + rng.choice(titles)["canonical_title"]]
+            for query in queries:
+                assert index.find_match(query) is linear_scan(titles, query), query
+    finally:
+        CanonicalTitleIndex.REBUILD_THRESHOLD = 256
+
+
+def test_orchestrator_without_index_still_rejects_concatenation():
+    TitleRepository.set_cache([{"id": 1, "title": "Sandesh Patrika Kestrel", "canonical_title": "sandeshpatrikakestrel"}])
+    try:
+        result = asyncio.run(MeshOrchestrator().verify("SandeshPatrika Kestrel Weekly"))
+        assert result.decision == "Reject"
+        assert result.metadata["best_match"] == "Sandesh Patrika Kestrel"
+        assert result.metadata["dominant_signal"] == "Space Bypass / Concatenation"
+    finally:
+        TitleRepository.clear_cache()
@@ -0,0 +1,83 @@
+import asyncio
+import contextlib
+from types import SimpleNamespace
+
+import numpy as np
+
+from app.main import create_indexes, build_indexes
+from app.orchestration.change_log_follower import ChangeLogFollower
+from app.persistence.title_change_log import TitleChangeLog
+from app.persistence.title_repository import TitleRepository
+
+
+class GateProbe:
+    """Stands in for the executor gate (exclusive()) and the FAISS side, recording what ran under the gate."""
+    def __init__(self):
+        self.held = False
+        self.encoded_under_gate = []
+        self.added = []
+        self.semantic = SimpleNamespace(encode=self.encode)
+
+    @contextlib.asynccontextmanager
+    async def exclusive(self):
+        self.held = True
+        try:
+            yield
+        finally:
+            self.held = False
+
+    def encode(self, title):
+        self.encoded_under_gate.append(self.held)
+        return np.ones(4, dtype=np.float32)
+
+    def add(self, embedding, title_obj):
+        self.added.append(title_obj["title"])
+
+    @property
+    def ntotal(self):
+        return len(self.added)
+
+
+def worker_state(titles, probe):
+    indexes = create_indexes()
+    build_indexes(titles, indexes)
+    return SimpleNamespace(
+        index_generation=0, verification_executor=probe, ann_index=probe,
+        sbert_available=True, orchestrator=probe, **indexes,
+    )
+
+
+def test_two_followers_allocate_distinct_ids_and_converge(tmp_path):
+    titles = [{"id": i, "title": t, "normalized_title": t.lower(), "canonical_title": t.lower().replace(" ", "")}
+              for i, t in enumerate(["Daily Bharat News", "Morning Herald"], start=1)]
+    TitleRepository.set_cache(list(titles))
+    try:
+        path = str(tmp_path / "changes.db")
+        probes = [GateProbe(), GateProbe()]
+        followers = [
+            ChangeLogFollower(state=worker_state(titles, probe), change_log=TitleChangeLog(path))
+            for probe in probes
+        ]
+        # The second worker started from an older catalogue: ids still continue the shared log
+        followers[0].base_id, followers[1].base_id = 2, 1
+
+        async def submit_all():
+            entries = []
+            for i in range(6):
+                follower = followers[i % 2]
+                entries.append(await follower.append(f"Zephyr Gazette {i}", f"zephyr gazette {i}", f"zephyrgazette{i}"))
+            for follower in followers:
+                await follower.sync()
+            return entries
+
+        entries = asyncio.run(submit_all())
+        assert [e["title_id"] for e in entries] == [3, 4, 5, 6, 7, 8]
+        for follower, probe in zip(followers, probes):
+            assert follower.applied_seq == entries[-1]["seq"]
+            assert follower.state.index_generation == 6
+            assert set(follower.state.token_index.titles_map) >= {e["title_id"] for e in entries}
+            # Embeddings are computed before the gate is taken; only index mutations run under it
+            assert probe.encoded_under_gate == [False] * 6
+            assert probe.added == [e["title"] for e in entries]
+    finally:
+        TitleRepository.clear_cache()
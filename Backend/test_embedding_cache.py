@@ -0,0 +1,49 @@
+import numpy as np
+
+from app.persistence.embedding_cache import EmbeddingCache
+
+MODEL = "test/mini-model"
+
+
+def vectors(seed, count, dimension=8):
+    return np.random.default_rng(seed).standard_normal((count, dimension)).astype(np.float32)
+
+
+def assert_cached(cache, texts, expected):
+    found = cache.get_many(texts)
+    assert all(f is not None for f in found)
+    assert np.allclose(np.stack(found), expected, atol=1e-2)  # float16 on disk
+
+
+def test_rows_appended_by_one_worker_are_read_by_another(tmp_path):
+    writer = EmbeddingCache(MODEL, str(tmp_path), lru_size=0)
+    reader = EmbeddingCache(MODEL, str(tmp_path), lru_size=0)
+    assert reader.get_many(["Daily News"]) == [None]
+
+    writer.put_many(["Daily News", "Sun Times"], vectors(1, 2))
+    # The reader refreshes on its next miss and maps the new rows
+    assert_cached(reader, ["Sun Times", "Daily News"], vectors(1, 2)[::-1])
+    assert reader.stats()["disk_hits"] == 2 and reader.stats()["disk_rows"] == 2
+
+    # Rows already on disk are not appended twice, whichever worker writes them
+    reader.put_many(["Daily News", "Jan Sandesh"], vectors(2, 2))
+    assert_cached(writer, ["Daily News", "Jan Sandesh"], [vectors(1, 2)[0], vectors(2, 2)[1]])
+    assert writer.stats()["disk_rows"] == 3
+
+
+def test_append_trims_torn_key_and_unreferenced_vectors(tmp_path):
+    cache = EmbeddingCache(MODEL, str(tmp_path), lru_size=0)
+    cache.put_many(["a", "b"], vectors(3, 2))
+
+    # A crash mid-append: vector bytes without keys, and a partial final key
+    with open(cache.vectors_path, "ab") as f:
+        f.write(b"\1" * 24)
+    with open(cache.keys_path, "ab") as f:
+        f.write(b"\2" * (EmbeddingCache.KEY_BYTES // 2))
+
+    other = EmbeddingCache(MODEL, str(tmp_path), lru_size=0)
+    other.put_many(["c", "d"], vectors(4, 2))
+
+    fresh = EmbeddingCache(MODEL, str(tmp_path), lru_size=0)
+    assert fresh.stats()["disk_rows"] == 4
+    assert_cached(fresh, ["a", "b", "c", "d"], np.concatenate([vectors(3, 2), vectors(4, 2)]))
@@ -0,0 +1,70 @@
+import asyncio
+import re
+from types import SimpleNamespace
+
+from app.main import app, build_generation
+from app.orchestration.change_log_follower import ChangeLogFollower
+from app.orchestration.index_rebuilder import IndexRebuilder
+from app.orchestration.verification_cache import VerificationCache
+from app.persistence.title_change_log import TitleChangeLog
+from app.persistence.title_repository import TitleRepository
+
+
+def title(title_id, text):
+    return {
+        "id": title_id,
+        "title": text,
+        "normalized_title": text.lower(),
+        "canonical_title": re.sub(r"[^a-z0-9]", "", text.lower()),
+    }
+
+
+def test_rebuild_swaps_in_new_generation_with_logged_titles(tmp_path, monkeypatch):
+    dataset = [title(1, "Daily Bharat News"), title(2, "Quokka Ledger")]
+    monkeypatch.setattr(TitleRepository, "read_titles", lambda self: [dict(t) for t in dataset])
+    TitleRepository.set_cache([dict(t) for t in dataset])
+    state = SimpleNamespace(index_generation=0, index_epoch=0)
+    # Orchestrators of every generation share the result cache, invalidated by the generation swap
+    monkeypatch.setattr(app.state, "result_cache", VerificationCache(generation=lambda: state.index_generation))
+    try:
+        for name, value in build_generation(list(dataset)).items():
+            setattr(state, name, value)
+        change_log = TitleChangeLog(str(tmp_path / "changes.db"))
+        state.change_log_follower = ChangeLogFollower(state=state, change_log=change_log)
+        state.change_log_follower.base_id = 2
+        rebuilder = IndexRebuilder(state, build_generation, change_log)
+
+        queries = ("Kestrel Sandesh", "Odisha Samachar Patrika", "Zephyr Quokka Gazette", "Quokka Ledger")
+
+        async def decisions():
+            return {q: (await state.orchestrator.verify(q)).decision for q in queries}
+
+        async def scenario():
+            await state.change_log_follower.append("Zephyr Quokka Gazette", "zephyr quokka gazette", "zephyrquokkagazette")
+            before = await decisions()
+            # The dataset on disk changes: one title replaced, one added
+            dataset[1:] = [title(2, "Kestrel Sandesh"), title(3, "Odisha Samachar Patrika")]
+            old_orchestrator, generation = state.orchestrator, state.index_generation
+            assert await rebuilder.rebuild()
+            assert state.orchestrator is not old_orchestrator
+            assert state.index_generation == generation + 1 and state.index_epoch == 1
+            return before, await decisions()
+
+        before, after = asyncio.run(scenario())
+        assert before == {
+            "Kestrel Sandesh": "Accept", "Odisha Samachar Patrika": "Accept",
+            "Zephyr Quokka Gazette": "Reject", "Quokka Ledger": "Reject",
+        }
+        assert after == {
+            "Kestrel Sandesh": "Reject",
+            "Odisha Samachar Patrika": "Reject",
+            "Zephyr Quokka Gazette": "Reject",  # Logged before the rebuild, replayed into the new generation
+            "Quokka Ledger": "Accept",          # Gone from the dataset
+        }
+        assert rebuilder.stats()["status"] == "idle" and rebuilder.runs == 1
+        assert [t["title"] for t in TitleRepository._titles_cache] == [
+            "Daily Bharat News", "Kestrel Sandesh", "Odisha Samachar Patrika", "Zephyr Quokka Gazette",
+        ]
+        assert state.change_log_follower.base_id == 3
+    finally:
+        TitleRepository.clear_cache()
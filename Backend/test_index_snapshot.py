@@ -0,0 +1,88 @@
+import asyncio
+from collections import OrderedDict
+
+import pytest
+
+from app.main import build_indexes, create_indexes
+from app.persistence import index_snapshot
+from app.retrieval.title_feature_store import TitleFeatureStore, TitleFeatures
+
+TITLES = ["Daily Bharat News", "Morning Herald", "ओडिशा समाचार", "Jan Sandesh Times", "", "A"]
+
+
+def test_feature_store_round_trips_through_snapshot(tmp_path):
+    titles = [{"id": i, "title": t} for i, t in enumerate(TITLES * 200)]
+    store = TitleFeatureStore()
+    store.build_index(titles)
+    path = str(tmp_path / "snapshot.bin")
+    index_snapshot.write_snapshot(path, titles, {"feature_store": store}, source={})
+
+    _, indexes, header = index_snapshot.load_snapshot(path, source={})
+    loaded = indexes["feature_store"]
+    # Features are packed into mapped sections, not unpickled per title
+    assert loaded.packed is not None and not loaded.features and header["arrays"]
+    assert len(loaded) == len(store)
+    for title_obj in titles:
+        expected, actual = store.get(title_obj), loaded.get(title_obj)
+        assert all(getattr(actual, field) == getattr(expected, field) for field in TitleFeatures.__slots__)
+
+    # Titles submitted after the load shadow their packed record
+    loaded.add_title({"id": 3, "title": "Zephyr Gazette"})
+    loaded.add_title({"id": 10_000, "title": "Quokka Times"})
+    assert loaded.get({"id": 3}).lower == "zephyr gazette"
+    assert loaded.get({"id": 10_000}).lower == "quokka times"
+    assert len(loaded) == len(store) + 1
+
+
+def catalogue_title(title_id, text):
+    return {"id": title_id, "title": text, "normalized_title": text.lower(), "canonical_title": text.lower().replace(" ", "")}
+
+
+def lookups(indexes, query):
+    lower, canonical = query.lower(), query.lower().replace(" ", "")
+    hits, matched = asyncio.run(indexes["token_index"].top_candidates(lower.split(), 10))
+    match = indexes["canonical_index"].find_match(canonical)
+    return (
+        [t["id"] for t in hits], matched,
+        [t["id"] for t in indexes["trigram_index"].top_candidates(canonical, 10)],
+        [t["id"] for t in indexes["phonetic_index"].top_candidates(lower.split(), 10)],
+        indexes["fuzzy_expander"].expand(lower.split()),
+        match and match["id"],
+        indexes["phrase_matcher"].find_components(lower),
+    )
+
+
+def test_indexes_round_trip_as_mapped_tables(tmp_path):
+    texts = ["Daily Bharat News", "Jan Sandesh Times", "ओडिशा समाचार", "Kestrel Samachar Patrika Weekly", "Bharat"]
+    titles = [catalogue_title(i, f"{t} {i // len(texts)}" if i >= len(texts) else t) for i, t in enumerate(texts * 100)]
+    built = create_indexes()
+    build_indexes(titles, built)
+    built = {name: built[name] for name in index_snapshot.SNAPSHOT_INDEXES}
+    path = str(tmp_path / "snapshot.bin")
+    index_snapshot.write_snapshot(path, titles, built, source={})
+
+    loaded_titles, loaded, _ = index_snapshot.load_snapshot(path, source={})
+    # Titles, key tables and vocabularies are mapped and decoded on lookup
+    assert loaded_titles.packed is not None and not loaded_titles.items and loaded_titles.max_id == len(titles) - 1
+    assert loaded["token_index"].doc_titles.packed is not None and loaded["canonical_index"].exact.packed is not None
+    assert loaded["fuzzy_expander"].deletes.packed is not None and loaded["phrase_matcher"].ordinals.rows.packed is not None
+    assert loaded_titles[7] == titles[7] and len(loaded["token_index"].titles_map) == len(titles)
+
+    queries = ["Daily Bharat News", "Bharat Samachar", "Jan Sandseh", "kestrelsamacharpatrika", "Daily Bharat News Jan Sandesh Times"]
+    for query in queries:
+        assert lookups(loaded, query) == lookups(built, query), query
+
+    # Writes after loading land on top of the mapped tables
+    for indexes in (built, loaded):
+        indexes["token_index"].remove_title(3)
+        for name in ("token_index", "canonical_index", "trigram_index", "phonetic_index", "fuzzy_expander", "phrase_matcher"):
+            indexes[name].add_title(catalogue_title(10_000, "Zephyr Bharat Gazette"))
+    for query in queries + ["Zephyr Gazette", "Zephyr Bharat Gazette Daily Bharat News"]:
+        assert lookups(loaded, query) == lookups(built, query), query
+
+
+def test_snapshot_referencing_other_classes_is_rejected(tmp_path):
+    path = str(tmp_path / "snapshot.bin")
+    index_snapshot.write_snapshot(path, [], {"feature_store": OrderedDict()}, source={})
+    with pytest.raises(index_snapshot.IndexSnapshotError, match="collections.OrderedDict"):
+        index_snapshot.load_snapshot(path, source={})
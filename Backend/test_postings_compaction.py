@@ -0,0 +1,105 @@
+import asyncio
+import random
+from types import SimpleNamespace
+
+from app.monitoring import metrics
+from app.orchestration.index_compactor import IndexCompactor
+from app.retrieval.multi_field_token_index import MultiFieldTokenIndex, field_tokens
+from app.retrieval.phonetic_token_index import PhoneticTokenIndex
+from app.retrieval.postings_store import PostingsStore
+from app.retrieval.title_trigram_index import TitleTrigramIndex
+
+WORDS = [
+    "bharat", "samachar", "times", "herald", "express", "morning", "jan", "sandesh", "prabhat", "khabar",
+    "दैनिक", "समाचार", "भारत", "ओडिशा", "news", "voice", "daily", "sun", "patrika", "dispatch",
+]
+
+
+def random_title(rng, title_id):
+    text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 4)))
+    return {"id": title_id, "title": text.title(), "normalized_title": text, "canonical_title": text.replace(" ", "")}
+
+
+def create_state(titles):
+    state = SimpleNamespace(
+        token_index=MultiFieldTokenIndex(workers=1), trigram_index=TitleTrigramIndex(), phonetic_index=PhoneticTokenIndex()
+    )
+    for index in (state.token_index, state.trigram_index, state.phonetic_index):
+        index.build_index(titles)
+    return state
+
+
+def lookups(state, queries):
+    results = []
+    for query in queries:
+        tokens = query.lower().split()
+        flat, _ = field_tokens(query)
+        hits, matched = asyncio.run(state.token_index.top_candidates(tokens, 20))
+        results.append((
+            [t["id"] for t in hits], matched,
+            [t["id"] for t in asyncio.run(state.token_index.field_candidates("flat", flat, 20))],
+            [t["id"] for t in state.trigram_index.top_candidates("".join(tokens), 20)],
+            [t["id"] for t in state.phonetic_index.top_candidates(tokens, 20)],
+        ))
+    return results
+
+
+def test_postings_equal_fresh_build_after_adds_removes_and_compactions():
+    rng = random.Random(13)
+    PostingsStore.COMPACT_THRESHOLD = 32
+    try:
+        catalogue = [random_title(rng, i) for i in range(400)]
+        state = create_state(catalogue)
+        compactor = IndexCompactor(state)
+        queries = [random_title(rng, None)["title"] for _ in range(40)]
+        next_id, frozen = len(catalogue), None
+        for step in range(600):
+            r = rng.random()
+            if r < 0.45:
+                title_obj = random_title(rng, next_id)
+                next_id += 1
+                catalogue.append(title_obj)
+            elif r < 0.8:
+                title_obj = catalogue.pop(rng.randrange(len(catalogue)))
+                for index in (state.token_index, state.trigram_index, state.phonetic_index):
+                    assert index.remove_title(title_obj["id"])
+                title_obj = None
+            else:
+                # Resubmitted id: replaces the indexed title
+                old = catalogue.pop(rng.randrange(len(catalogue)))
+                title_obj = random_title(rng, old["id"])
+                catalogue.append(title_obj)
+            if title_obj is not None:
+                for index in (state.token_index, state.trigram_index, state.phonetic_index):
+                    index.add_title(title_obj)
+
+            # Compaction phases interleaved with writes: freeze, keep writing, then merge and install
+            if frozen is None and step % 50 == 0:
+                frozen = [(index, index.freeze_segments()) for _, index in compactor.targets()]
+            elif frozen is not None and step % 50 == 30:
+                for index, segments in frozen:
+                    index.install_segments(index.build_segments(segments))
+                frozen = None
+
+            if step % 100 == 99:
+                assert lookups(state, queries) == lookups(create_state(catalogue), queries), step
+    finally:
+        PostingsStore.COMPACT_THRESHOLD = 1024
+
+
+def test_index_gauges_count_live_titles_only():
+    rng = random.Random(5)
+    catalogue = [random_title(rng, i) for i in range(50)]
+    state = create_state(catalogue)
+    for index in (state.token_index, state.trigram_index, state.phonetic_index):
+        assert index.remove_title(7)
+    state.trigram_index.add_title(random_title(rng, 3))  # Replaced id: its old ordinal is tombstoned
+
+    metrics.update_index_gauges(SimpleNamespace(
+        token_index=state.token_index, trigram_index=state.trigram_index, phonetic_index=state.phonetic_index,
+        canonical_index=SimpleNamespace(exact=()), fuzzy_expander=SimpleNamespace(vocabulary=()),
+        phrase_matcher=SimpleNamespace(ordinals=()), feature_store=(), result_cache=SimpleNamespace(entries=()),
+        sbert_available=False, index_generation=0,
+    ))
+    for index in ("token_index", "trigram_index", "phonetic_index"):
+        assert metrics.INDEX_SIZE.labels(index)._value.get() == 49, index
@@ -0,0 +1,20 @@
+from app.retrieval.rank_fusion import ReciprocalRankFusion
+
+
+def hits(*ids, matched=None):
+    result = [{"id": i} for i in ids]
+    return (result, matched) if matched is not None else result
+
+
+def test_retrieve_counts_distinct_titles_after_dedup():
+    channels = [
+        ("token", hits(1, 2, 3, matched=40)),
+        ("trigram", hits(3, 4, 1)),
+        ("phonetic", hits(4, 5)),
+    ]
+    fused, stats, distinct = ReciprocalRankFusion().retrieve(channels, budget=3)
+    # Titles found by several channels are counted once; matches a channel did not return are not
+    assert distinct == 5
+    assert [c["id"] for c in fused] == [4, 1, 3]
+    assert stats["token"] == {"hits": 3, "kept": 2, "matched": 40}
+    assert stats["trigram"]["kept"] == 3
@@ -0,0 +1,68 @@
+import asyncio
+import re
+
+from app.configuration.system_config import settings
+from app.main import create_indexes, build_indexes
+from app.orchestration.mesh_orchestrator import MeshOrchestrator
+from app.orchestration.verification_cache import VerificationCache
+from app.persistence.title_repository import TitleRepository
+
+
+def title(title_id, text):
+    return {
+        "id": title_id,
+        "title": text,
+        "normalized_title": text.lower(),
+        "canonical_title": re.sub(r"[^a-z0-9]", "", text.lower()),
+    }
+
+
+def test_generation_bump_invalidates_cached_results():
+    titles = [title(i, t) for i, t in enumerate(["Daily Bharat News", "Morning Herald", "Odisha Samachar"])]
+    TitleRepository.set_cache(titles)
+    try:
+        indexes = create_indexes()
+        build_indexes(titles, indexes)
+        generation = [0]
+        cache = VerificationCache(generation=lambda: generation[0])
+        orchestrator = MeshOrchestrator(result_cache=cache, **indexes)
+
+        assert asyncio.run(orchestrator.verify("Zephyr Quokka Gazette")).decision == "Accept"
+
+        # The same title is accepted into the catalogue: same generation still serves the cached result
+        submitted = title(99, "Zephyr Quokka Gazette")
+        TitleRepository.add_to_cache(submitted)
+        for index in indexes.values():
+            index.add_title(submitted)
+        assert asyncio.run(orchestrator.verify("Zephyr Quokka Gazette")).decision == "Accept"
+        assert cache.stats()["hits"] == 1
+
+        # A new generation makes it unreachable and the title is now a duplicate
+        generation[0] += 1
+        result = asyncio.run(orchestrator.verify("Zephyr Quokka Gazette"))
+        assert result.decision == "Reject"
+        assert [c.title for c in result.conflicts][:1] == ["Zephyr Quokka Gazette"]
+        assert cache.stats()["hits"] == 1
+    finally:
+        TitleRepository.clear_cache()
+
+
+def test_debug_stage_timings_are_not_cached(monkeypatch):
+    titles = [title(i, t) for i, t in enumerate(["Daily Bharat News", "Odisha Samachar"])]
+    TitleRepository.set_cache(titles)
+    monkeypatch.setattr(settings, "DEBUG", True)
+    try:
+        indexes = create_indexes()
+        build_indexes(titles, indexes)
+        cache = VerificationCache(generation=lambda: 0)
+        orchestrator = MeshOrchestrator(result_cache=cache, **indexes)
+
+        first = asyncio.run(orchestrator.verify("Zephyr Quokka Gazette"))
+        second = asyncio.run(orchestrator.verify("Zephyr Quokka Gazette"))
+        assert cache.stats()["hits"] == 1
+        # Each call reports its own stages; the cache hit only went through the cache lookup
+        assert "compliance" in first.metadata["stage_timings_ms"]
+        assert list(second.metadata["stage_timings_ms"]) == ["cache"]
+        assert all("stage_timings_ms" not in entry[2].metadata for entry in cache.entries.values())
+    finally:
+        TitleRepository.clear_cache()